@@ -0,0 +1,88 @@
+"""
+Benchmark the vectorized `haversine` against the scalar `math` loop it
+replaced, and the chunked pairwise matrix mode.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_haversine [--rows 200000] [--points 5000] [--repeat 3]
+"""
+# <--- python stuff --->
+import argparse
+import time
+from math import asin, cos, radians, sin, sqrt
+
+# <--- data stuff --->
+import numpy as np
+import pandas as pd
+
+# <--- custom --->
+from src.testers import EARTH_RADIUS_KM, haversine, haversine_matrix, iter_haversine_matrix
+
+
+def scalar_haversine(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """
+    Reference implementation: one pair at a time with `math`.
+    """
+    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    return 2 * asin(sqrt(a)) * EARTH_RADIUS_KM
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "lon1": rng.uniform(-180, 180, args.rows), "lat1": rng.uniform(-90, 90, args.rows),
+        "lon2": rng.uniform(-180, 180, args.rows), "lat2": rng.uniform(-90, 90, args.rows),
+    })
+
+    def apply_loop():
+        return df.apply(lambda row: scalar_haversine(row.lon1, row.lat1, row.lon2, row.lat2), axis=1)
+
+    def vectorized():
+        return haversine(df.lon1, df.lat1, df.lon2, df.lat2)
+
+    expected, actual = apply_loop(), vectorized()
+    if not np.allclose(expected, actual, rtol=1e-12, atol=1e-9):
+        raise SystemExit(f"[!] Max difference {np.abs(expected - actual).max()} km")
+
+    loop_time = best_of(apply_loop, 1)
+    vector_time = best_of(vectorized, args.repeat)
+    print(f"[*] {args.rows} pairs, identical results")
+    print(f"[*] scalar .apply loop: {loop_time:8.3f}s")
+    print(f"[*] vectorized:         {vector_time:8.3f}s ({loop_time / vector_time:.0f}x faster)")
+
+    lon, lat = rng.uniform(-180, 180, args.points), rng.uniform(-90, 90, args.points)
+    sample = rng.integers(0, args.points, 100)
+    matrix = haversine_matrix(lon, lat, chunk_size=args.chunk_size)
+    for i in sample:
+        if not np.isclose(matrix[i, sample[0]], scalar_haversine(lon[i], lat[i], lon[sample[0]], lat[sample[0]])):
+            raise SystemExit(f"[!] Matrix mismatch at row {i}")
+
+    matrix_time = best_of(lambda: haversine_matrix(lon, lat, chunk_size=args.chunk_size), args.repeat)
+    nearest_time = best_of(lambda: [np.partition(block, 1, axis=1)[:, 1] for _, block in
+                                    iter_haversine_matrix(lon, lat, chunk_size=args.chunk_size)], args.repeat)
+    block_mb = args.chunk_size * args.points * 8 / 1e6
+    print(f"[*] {args.points}x{args.points} matrix ({matrix.nbytes / 1e6:.0f} MB): {matrix_time:.3f}s")
+    print(f"[*] nearest neighbour per point, streamed in {block_mb:.0f} MB blocks: {nearest_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
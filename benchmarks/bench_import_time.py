@@ -0,0 +1,79 @@
+"""
+Measure how long importing each helper module takes, and fail if one goes
+over its budget or pulls in a heavy dependency it should only load lazily.
+
+Each import runs in a fresh interpreter under `python -X importtime`.
+Run from the repository root:
+
+    python -m benchmarks.bench_import_time [--repeat 5] [--scale 1.0]
+"""
+# <--- python stuff --->
+import argparse
+import subprocess
+import sys
+from typing import Dict, Set, Tuple
+
+
+LAZY = {"bs4", "markdown", "markdown2", "canvasapi", "dotenv"}
+# pandas loads pyarrow itself when it is installed
+LIGHT = LAZY | {"pandas", "pyarrow"}
+
+# module -> (budget in ms, top-level packages it must not import)
+BUDGETS: Dict[str, Tuple[float, Set[str]]] = {
+    "src.client_helpers": (25, LIGHT),
+    "src.link_helpers": (25, LIGHT | {"requests"}),
+    "src.http_helpers": (300, LIGHT),
+    "src.git_helpers": (350, LIGHT),
+    "src.graphql_helpers": (350, LIGHT),
+    "src.canvas_helpers": (1300, LAZY),
+    "src.rt_helpers": (1300, LAZY),
+}
+
+
+def import_profile(module: str) -> Tuple[float, Set[str]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        Tuple[float, Set[str]]: Cumulative import time in ms, and the
+            top-level packages that were imported along the way.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    cumulative, packages = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, total, name = line.split("|")
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(total) / 1000
+    return cumulative, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, for slow machines.")
+    args = parser.parse_args()
+
+    failures = []
+    for module, (budget, forbidden) in BUDGETS.items():
+        profiles = [import_profile(module) for _ in range(args.repeat)]
+        best = min(ms for ms, _ in profiles)
+        loaded = sorted(forbidden & profiles[0][1])
+        limit = budget * args.scale
+        status = "ok" if best <= limit and not loaded else "FAIL"
+        print(f"[*] {module:<22} {best:8.1f} ms  (budget {limit:6.0f} ms)  {status}")
+        if best > limit:
+            failures.append(f"{module} took {best:.1f} ms, budget {limit:.0f} ms")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} eagerly")
+
+    if failures:
+        raise SystemExit("[!] " + "\n[!] ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
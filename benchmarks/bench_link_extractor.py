@@ -0,0 +1,110 @@
+"""
+Benchmark the streaming first-link extractor against the BeautifulSoup
+tree parse it replaced, and check both agree on a fixture corpus.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_link_extractor [--bodies 500] [--repeat 3]
+"""
+# <--- python stuff --->
+import argparse
+import random
+import time
+from typing import List, Optional
+
+# <--- text processing stuff --->
+from bs4 import BeautifulSoup
+
+# <--- custom --->
+from src.link_helpers import first_github_links
+
+
+def soup_first_github_link(html: Optional[str]) -> Optional[str]:
+    """
+    Reference implementation: the full-tree parse `get_git_repo_url` used to do.
+    """
+    if html is not None and len(html) > 0:
+        soup = BeautifulSoup(html, features="html.parser")
+        urls = [node.get("href") for node in soup.find_all("a")]
+        if len(urls) > 0 and str(urls[0]).startswith("https://github.com/"):
+            return urls[0]
+    return None
+
+
+def lesson_body(rng: random.Random, paragraphs: int) -> str:
+    """
+    Build a synthetic Canvas lesson body: a GitHub banner link (or another
+    first link, or none), followed by a long run of prose, code and tables.
+    """
+    words = "data science pandas model regression feature matrix vector loss &amp; gradient".split()
+    head = rng.choice([
+        '<p><a class="github" href="https://github.com/learn-co-curriculum/dsc-lesson-{n}">GitHub</a></p>',
+        '<p><a href="https://github.com/learn-co-curriculum/dsc-lesson-{n}/blob/main/README.md" '
+        'target="_blank">Repo</a></p>',
+        '<header><a href="https://learning.flatironschool.com/courses/{n}">Canvas</a></header>'
+        '<a href="https://github.com/learn-co-curriculum/dsc-lesson-{n}">late</a>',
+        '<p>No link here &lt;a href="https://github.com/x/y"&gt;</p>',
+        '<!-- <a href="https://github.com/commented/out"> --><a href=https://github.com/unquoted/r{n}>x</a>',
+        '<a name="top"></a><a href="https://github.com/learn-co-curriculum/dsc-{n}">x</a>',
+        '<script>var s = "<a href=\'https://github.com/in/script\'>";</script>'
+        '<a href="https://github.com/after/script-{n}">x</a>',
+        '<a href="https://github.com/o/r?x=1&amp;y={n}">entities</a>',
+        '',
+    ]).format(n=rng.randint(1, 10 ** 6))
+    body = [head]
+    for _ in range(paragraphs):
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(20, 80)))
+        body.append(rng.choice([
+            f"<p>{sentence}</p>",
+            f"<pre><code class=\"language-python\">import pandas as pd\ndf = pd.read_csv('{sentence[:20]}')</code></pre>",
+            "<table>" + "".join(f"<tr><td>{w}</td><td>{len(w)}</td></tr>" for w in sentence.split()[:10]) + "</table>",
+            f"<ul><li>{sentence[:60]}</li><li><a href=\"https://github.com/later/link\">later</a></li></ul>",
+        ]))
+    return "".join(body)
+
+
+def fixture_corpus(count: int, seed: int = 0) -> List[Optional[str]]:
+    """
+    Deterministic corpus of lesson bodies of varying length, plus empty and
+    missing bodies.
+    """
+    rng = random.Random(seed)
+    corpus = [lesson_body(rng, rng.randint(5, 200)) for _ in range(count)]
+    corpus += [None, "", "None", "<a>no href</a>", "<a href=''>empty</a>"]
+    return corpus
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bodies", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = fixture_corpus(args.bodies)
+    expected = [soup_first_github_link(html) for html in corpus]
+    actual = first_github_links(corpus)
+    mismatches = [n for n, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    if mismatches:
+        raise SystemExit(f"[!] {len(mismatches)} mismatches, first at body #{mismatches[0]}: "
+                         f"{expected[mismatches[0]]!r} != {actual[mismatches[0]]!r}")
+
+    megabytes = sum(len(html or "") for html in corpus) / 1e6
+    soup_time = best_of(lambda: [soup_first_github_link(html) for html in corpus], args.repeat)
+    stream_time = best_of(lambda: first_github_links(corpus), args.repeat)
+
+    print(f"[*] {len(corpus)} bodies, {megabytes:.1f} MB, identical results")
+    print(f"[*] BeautifulSoup tree:  {soup_time:8.3f}s")
+    print(f"[*] streaming extractor: {stream_time:8.3f}s ({soup_time / stream_time:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
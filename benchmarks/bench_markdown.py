@@ -0,0 +1,136 @@
+"""
+Benchmark the iterative `convert_to_markdown` against the recursive
+version it replaced, on long lesson pages, and check both agree where the
+old version's output was correct.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_markdown [--sizes 100 400 1600 6400] [--repeat 3]
+"""
+# <--- python stuff --->
+import argparse
+import random
+import time
+
+# <--- text processing stuff --->
+from bs4 import BeautifulSoup, Tag
+
+# <--- custom --->
+from src.markdown_helpers import convert_to_markdown
+
+
+def recursive_extract_text_from_element(element: Tag) -> str:
+    """
+    Reference implementation: each element re-emits every following sibling.
+    """
+    text = ""
+    if isinstance(element, Tag):
+        if element.name == "h3":
+            text += f"## {str(element.string)}\n\n"
+        elif element.name == "h4":
+            text += f"### {str(element.string)}\n\n"
+        else:
+            if element.name in ["p"]:
+                text += str(element.string) + "\n\n"
+            elif element.name in ["em", "strong"]:
+                text += f"**{str(element.string)}** \n\n"
+            elif element.name == "ul":
+                text += "".join([recursive_extract_text_from_element(li) for li in element.find_all("li")])
+            elif element.name == "ol":
+                text += "".join([recursive_extract_text_from_element(li) for li in element.find_all("li")])
+            elif element.name == "li":
+                if element.find("code"):
+                    text += "- `" + str(element.find("code").string) + "`\n"
+                else:
+                    text += "- " + str(element.string) + "\n"
+            elif element.name == "code":
+                text += f"`{str(element.string)}`"
+            else:
+                element_ = str(element).replace("None", "")
+                text += str(element_) + "\n\n"
+
+        if element.next_sibling and element.next_sibling.name not in ["h3", "h4"]:
+            text += recursive_extract_text_from_element(element.next_sibling)
+
+    return text
+
+
+def recursive_convert_to_markdown(title: str, html_page: str) -> str:
+    """
+    Reference implementation of `convert_to_markdown`.
+    """
+    markdown = f"# {title}\n\n"
+    soup = BeautifulSoup(html_page, "html.parser")
+    sections = soup.find_all("h3")
+    for section in sections:
+        cleaned_text = f"## {str(section.string)}\n\n"
+        next_element = section.next_sibling
+        while next_element and next_element.name != "h3":
+            cleaned_text += recursive_extract_text_from_element(next_element)
+            next_element = next_element.next_sibling
+        markdown += cleaned_text + "\n"
+    return markdown
+
+
+def lesson_page(rng: random.Random, siblings: int, separator: str = "", section: int = 400) -> str:
+    """
+    Build a lesson page of `<h3>` sections of `section` elements each
+    (an `<h4>` every 100), holding `siblings` elements in total. With `separator=""` the siblings are adjacent, as
+    in minified Canvas HTML; with `"\\n"` they are separated by whitespace,
+    where the old converter did not repeat itself.
+    """
+    words = "data science pandas model regression feature matrix vector loss gradient".split()
+    blocks = []
+    for n in range(siblings):
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(5, 30)))
+        if n % section == 0:
+            blocks.append(f"<h3>Section {n // section}</h3>")
+        elif n % 100 == 0:
+            blocks.append(f"<h4>{sentence[:20].strip()}</h4>")
+        blocks.append(rng.choice([
+            f"<p>{sentence}</p>",
+            f"<em>{sentence[:30].strip()}</em>",
+            f"<code>{sentence[:10].strip()}</code>",
+            f"<table><tr><td>{sentence[:15].strip()}</td></tr></table>",
+        ]))
+    return separator.join(blocks)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 400, 1600, 6400])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--section", type=int, default=400, help="Elements per <h3> section.")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    # whitespace-separated pages: the old converter was correct on these
+    for n in range(200):
+        page = lesson_page(rng, rng.randint(1, 300), separator="\n")
+        if recursive_convert_to_markdown("T", page) != convert_to_markdown("T", page):
+            raise SystemExit(f"[!] Output differs on whitespace-separated page #{n}")
+    print("[*] 200 whitespace-separated pages, identical results")
+
+    for size in args.sizes:
+        page = lesson_page(rng, size, section=args.section)
+        iterative = best_of(lambda: convert_to_markdown("T", page), args.repeat)
+        try:
+            recursive = best_of(lambda: recursive_convert_to_markdown("T", page), args.repeat)
+            old = f"{recursive:8.3f}s ({len(recursive_convert_to_markdown('T', page)) / 1e6:6.1f} MB out)"
+        except RecursionError:
+            old = "RecursionError"
+        new = f"{iterative:8.3f}s ({len(convert_to_markdown('T', page)) / 1e6:6.1f} MB out)"
+        print(f"[*] {size:>6} siblings, {len(page) / 1e6:5.2f} MB: recursive {old} | iterative {new}")
+
+
+if __name__ == "__main__":
+    main()
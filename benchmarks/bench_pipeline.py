@@ -0,0 +1,188 @@
+"""
+Benchmark the report pipelines end to end against the local Canvas and
+GitHub stand-ins (see `benchmarks/standins.py`), at several corpus sizes.
+
+Times `generate_canvas_report`, `process_repo_urls`, `build_github_df` and
+`get_reading_times`, then the same reading times from the concurrent
+`reading_time_pipeline`, and reports wall time, requests per second and peak
+(Python) memory per stage. Save a run with `--json` and pass it back as
+`--baseline` to fail on wall time regressions. With `--mirrors`, the
+repositories are read from local git mirrors of the corpus instead of the
+GitHub stand-ins.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline [--sizes 25 100 400] [--latency 0.02] [--workers 8] [--mirrors]
+                                        [--json run.json] [--baseline run.json --tolerance 0.25]
+"""
+# <--- python stuff --->
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+import warnings
+from typing import Callable, Dict, List
+
+# <--- custom --->
+from benchmarks import standins
+
+
+def served_requests(urls: Dict[str, str]) -> int:
+    """
+    Requests the stand-ins have served so far.
+    """
+    total = 0
+    for url in urls.values():
+        with urllib.request.urlopen(f"{url}/_stats") as response:
+            total += json.load(response)["requests"]
+    return total
+
+
+def measure(fn: Callable, urls: Dict[str, str], memory: bool) -> tuple:
+    """
+    Run a stage with its output silenced.
+
+    Returns:
+        tuple: The stage's result and its wall time, request count and peak
+            traced memory in MB (None without `memory`).
+    """
+    before = served_requests(urls)
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    wall = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, {"wall": wall, "requests": served_requests(urls) - before, "peak_mb": peak}
+
+
+def reset_state() -> None:
+    """
+    Forget what earlier runs learnt (README branches, rendered READMEs), so
+    every size starts cold.
+    """
+    from src import readme_helpers, render_helpers
+    readme_helpers._resolver = None
+    render_helpers._rendered.clear()
+
+
+def run_size(lessons: int, urls: Dict[str, str], workers: int, memory: bool, workdir: str) -> Dict[str, dict]:
+    import pandas as pd
+    from src.canvas_helpers import generate_canvas_report, process_repo_urls
+    from src.rt_helpers import build_github_df, get_reading_times, reading_time_pipeline
+
+    reset_state()
+    courses = list(range(1, -(-lessons // standins.Corpus(0).lessons_per_course) + 1))
+    results = {}
+
+    os.chdir(workdir)
+    path, results["generate_canvas_report"] = measure(
+        lambda: generate_canvas_report(courses, standins.OWNER, "bench", "standin", max_workers=workers),
+        urls, memory)
+    report = pd.read_csv(path)
+    links = [url if isinstance(url, str) else None for url in report["git_url"]]
+
+    _, results["process_repo_urls"] = measure(
+        lambda: process_repo_urls(links, standins.OWNER, "standin", max_workers=workers), urls, memory)
+    df, results["build_github_df"] = measure(
+        lambda: build_github_df(links, max_workers=workers, markdown=True), urls, memory)
+    _, results["get_reading_times"] = measure(lambda: get_reading_times(df), urls, memory)
+
+    # fetches, parses and estimates everything again, from cold
+    reset_state()
+    _, results["reading_time_pipeline"] = measure(
+        lambda: asyncio.run(reading_time_pipeline(links, lambda chunk: None, fetch_workers=workers)), urls, memory)
+    return results
+
+
+def check_baseline(runs: Dict[str, Dict[str, dict]], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    Compare wall times with a saved run.
+
+    Returns:
+        List[str]: One message per stage slower than the baseline by more
+            than `tolerance` (a fraction).
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["runs"]
+    regressions = []
+    for size, stages in runs.items():
+        for stage, result in stages.items():
+            before = baseline.get(size, {}).get(stage)
+            if before and result["wall"] > before["wall"] * (1 + tolerance):
+                regressions.append(f"{stage} at {size} lessons: {before['wall']:.2f}s -> {result['wall']:.2f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 100, 400])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every response")
+    parser.add_argument("--rate-limit", type=int, default=None, help="GitHub requests allowed per window")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--fixtures", default=None, help="recorded responses, see benchmarks/standins.py")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows every stage)")
+    parser.add_argument("--mirrors", action="store_true", help="read repositories from local git mirrors")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--baseline", default=None, help="results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures) as f:
+            fixtures = json.load(f)
+    # one corpus serves every size: smaller sizes read its first courses
+    process, urls = standins.start(max(args.sizes), args.latency, args.rate_limit, args.rate_window, fixtures)
+    # set before `src` is imported, which reads its base URLs at import time
+    os.environ.update(standins.environment(urls))
+    os.environ["DSC_NO_CACHE"] = "1"
+    warnings.filterwarnings("ignore", message="Canvas may respond unexpectedly when making requests to HTTP URLs")
+    cwd = os.getcwd()
+
+    runs = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            if args.mirrors:
+                mirror_dir = os.path.join(workdir, "mirrors")
+                standins.write_mirrors(standins.Corpus(max(args.sizes)), mirror_dir)
+                os.environ["DSC_GIT_MIRRORS"] = mirror_dir
+            for lessons in sorted(args.sizes):
+                print(f"[*] {lessons} lessons, {args.latency * 1000:.0f} ms latency, {args.workers} workers")
+                runs[str(lessons)] = run_size(lessons, urls, args.workers, not args.no_memory, workdir)
+                for stage, result in runs[str(lessons)].items():
+                    rate = result["requests"] / result["wall"] if result["wall"] else 0.0
+                    peak = f"{result['peak_mb']:8.1f} MB" if result["peak_mb"] is not None else ""
+                    print(f"    {stage:24s} {result['wall']:8.2f}s {result['requests']:7d} req "
+                          f"{rate:8.1f} req/s {peak}")
+    finally:
+        os.chdir(cwd)
+        process.terminate()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "runs": runs}, f, indent=2)
+        print(f"[*] Results saved to '{args.json}'")
+    if args.baseline:
+        regressions = check_baseline(runs, args.baseline, args.tolerance)
+        for message in regressions:
+            print(f"[!] Regression: {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"[*] No stage more than {args.tolerance:.0%} slower than '{args.baseline}'")
+
+
+if __name__ == "__main__":
+    main()
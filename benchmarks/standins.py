@@ -0,0 +1,529 @@
+"""
+Local stand-ins for the Canvas, GitHub REST and raw-content endpoints the
+report pipelines call, serving a synthetic (or recorded) corpus with
+configurable latency and rate limit headers.
+
+Point the pipelines at them through `CANVAS_INSTANCE`, `GITHUB_API_URL`
+and `GITHUB_RAW_URL`. To serve them on their own:
+
+    python -m benchmarks.standins [--lessons 400] [--latency 0.02] [--rate-limit 5000]
+
+The same corpus can be written out as bare git repositories, for the local
+mirror backend (`DSC_GIT_MIRRORS`), with `--write-mirrors DIR`, and as one
+Canvas course export archive per course, with `--write-exports DIR`.
+
+Recorded responses can be served instead of the synthetic ones with
+`--fixtures responses.json`, a file of the form
+`{"canvas" | "api" | "raw": {"/path?query": {"status": 200, "json": ..., "text": ..., "headers": {...}}}}`.
+"""
+# <--- api stuff --->
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+# <--- python stuff --->
+import argparse
+import hashlib
+import multiprocessing
+import os
+import random
+import subprocess
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+OWNER = "learn-co-curriculum"
+ROLES = ("canvas", "api", "raw")
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+GITHUB_PER_PAGE = 30
+
+
+class Corpus:
+    """
+    Deterministic synthetic curriculum: courses of lessons, most of which
+    link to a repository, some repositories shared between lessons and a
+    few missing on GitHub.
+    """
+
+    def __init__(self, lessons: int, lessons_per_course: int = 20, seed: int = 0):
+        """
+        Args:
+            lessons (int): Canvas pages and assignments in total.
+            lessons_per_course (int): Items per course (a quarter of them assignments).
+            seed (int): Random seed; the same arguments always build the same corpus.
+        """
+        rng = random.Random(seed)
+        self.lessons_per_course = lessons_per_course
+        self.courses: Dict[int, Dict[str, list]] = {}
+        self.repos: Dict[str, dict] = {}
+
+        for index in range(lessons):
+            course_id = 1 + index // lessons_per_course
+            course = self.courses.setdefault(course_id, {"pages": [], "assignments": []})
+            repo = self._repo(rng, index)
+            link = f'<p><a href="https://github.com/{OWNER}/{repo}">GitHub</a></p>' if repo else ""
+            body = link + "".join(f"<p>{self._sentence(rng)}</p>" for _ in range(rng.randint(2, 12)))
+            updated_at = f"2023-{1 + index % 12:02d}-{1 + index % 28:02d}T12:00:00Z"
+            item_id = course_id * 1000 + len(course["pages"]) + len(course["assignments"])
+            if index % 4 == 3:
+                course["assignments"].append({"id": item_id, "course_id": course_id, "name": f"Assignment {item_id}",
+                                              "updated_at": updated_at, "description": body})
+            else:
+                course["pages"].append({"page_id": item_id, "url": f"lesson-{item_id}", "title": f"Lesson {item_id}",
+                                        "updated_at": updated_at, "body": body})
+
+    @staticmethod
+    def _sentence(rng: random.Random) -> str:
+        words = "data science pandas model regression feature matrix vector loss gradient".split()
+        return " ".join(rng.choice(words) for _ in range(rng.randint(10, 60)))
+
+    def _repo(self, rng: random.Random, index: int) -> Optional[str]:
+        roll = rng.random()
+        if roll < 0.1:
+            return None
+        if roll < 0.25 and self.repos:
+            # a lesson reusing an earlier lesson's repository
+            return rng.choice(list(self.repos))
+        name = f"dsc-lesson-{index}"
+        self.repos[name] = self._repo_data(rng, index, missing=roll > 0.97)
+        return name
+
+    def _repo_data(self, rng: random.Random, index: int, missing: bool) -> dict:
+        if missing:
+            return {"missing": True}
+        default = rng.choice(["master", "main"])
+        branches = [default] + (["curriculum", "solution"] if rng.random() < 0.4 else [])
+        readme = [f"# Lesson {index}", ""]
+        for _ in range(rng.randint(3, 20)):
+            readme += [f"## {self._sentence(rng)[:30]}", "", self._sentence(rng), ""]
+            if rng.random() < 0.5:
+                readme += ["```python", "import pandas as pd", f"df = pd.read_csv('lesson_{index}.csv')",
+                           "df.describe()", "```", ""]
+        return {
+            "missing": False,
+            "default_branch": default,
+            "branches": {branch: f"2024-{1 + (index + n) % 12:02d}-01T00:00:00Z" for n, branch in enumerate(branches)},
+            "dot_canvas": {default} if index % 2 == 0 else set(),
+            "readme": "\n".join(readme),
+        }
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server playing one of the `ROLES`.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, role: str, corpus: Corpus, latency: float = 0.0, rate_limit: Optional[int] = None,
+                 rate_window: float = 60.0, fixtures: Optional[dict] = None):
+        """
+        Args:
+            role (str): "canvas", "api" (GitHub REST) or "raw" (raw content).
+            corpus (Corpus): Content to serve.
+            latency (float): Seconds added to every response.
+            rate_limit (Optional[int]): Requests allowed per `rate_window`,
+                advertised in `X-RateLimit-*` headers (`X-Rate-Limit-Remaining`
+                for Canvas); once spent, GitHub roles answer 403 until the
+                window resets. None sends no rate limit headers.
+            rate_window (float): Rate limit window in seconds.
+            fixtures (Optional[dict]): Recorded responses by path and query.
+        """
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.role = role
+        self.corpus = corpus
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.fixtures = fixtures or {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.window_start = time.time()
+        self.window_count = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def spend(self) -> Tuple[int, int, int]:
+        """
+        Count a request against the rate limit window.
+
+        Returns:
+            Tuple[int, int, int]: Requests served so far, remaining requests
+                in the window and the window's reset time.
+        """
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.rate_window:
+                self.window_start, self.window_count = now, 0
+            self.requests += 1
+            self.window_count += 1
+            remaining = (self.rate_limit - self.window_count) if self.rate_limit is not None else 0
+            return self.requests, remaining, int(self.window_start + self.rate_window) + 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/_stats":
+            with self.server.lock:
+                return self.reply(200, json.dumps({"requests": self.server.requests}), "application/json")
+
+        served, remaining, reset = self.server.spend()
+        headers = {}
+        if self.server.rate_limit is not None:
+            if self.server.role == "canvas":
+                headers["X-Rate-Limit-Remaining"] = str(max(remaining, 0))
+            elif self.server.role == "api":
+                headers.update({"X-RateLimit-Limit": str(self.server.rate_limit),
+                                "X-RateLimit-Remaining": str(max(remaining, 0)),
+                                "X-RateLimit-Reset": str(reset)})
+                if remaining < 0:
+                    return self.reply(403, '{"message": "API rate limit exceeded"}', "application/json", headers)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        fixture = self.server.fixtures.get(self.server.role, {}).get(self.path)
+        if fixture is not None:
+            body = json.dumps(fixture["json"]) if "json" in fixture else fixture.get("text", "")
+            headers.update(fixture.get("headers", {}))
+            return self.reply(fixture.get("status", 200), body, headers.pop("Content-Type", "application/json"), headers)
+
+        route = {"canvas": self.canvas, "api": self.github_api, "raw": self.github_raw}[self.server.role]
+        status, body, extra = route(parts.path.strip("/").split("/"), parse_qs(parts.query))
+        headers.update(extra)
+        if isinstance(body, str):
+            return self.reply(status, body, "text/plain; charset=utf-8", headers)
+        return self.reply(status, json.dumps(body), "application/json", headers)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.spend()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.role != "api" or urlsplit(self.path).path.strip("/") != "graphql":
+            return self.reply(404, '{"message": "Not Found"}', "application/json")
+        variables = json.loads(body or b"{}").get("variables") or {}
+        return self.reply(200, json.dumps({"data": self.github_graphql(variables)}), "application/json")
+
+    def reply(self, status: int, body: str, content_type: str, headers: Optional[dict] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    # <--- canvas --->
+    def canvas(self, path: List[str], query: dict):
+        not_found = (404, {"errors": [{"message": "The specified resource does not exist."}]}, {})
+        if path[:3] != ["api", "v1", "courses"] or len(path) < 4 or not path[3].isdigit():
+            return not_found
+        course = self.server.corpus.courses.get(int(path[3]))
+        if course is None:
+            return not_found
+        if len(path) == 4:
+            return 200, {"id": int(path[3]), "name": f"Course {path[3]}"}, {}
+
+        collection, key = {"pages": ("pages", "page_id"), "assignments": ("assignments", "id")}.get(path[4], (None, None))
+        if collection is None:
+            return not_found
+        items = course[collection]
+        if len(path) == 6:
+            match = [item for item in items if str(item[key]) == path[5] or item.get("url") == path[5]]
+            return (200, match[0], {}) if match else not_found
+
+        chunk, headers = self.paginate(items, path, query, DEFAULT_PER_PAGE)
+        if collection == "pages" and "body" not in query.get("include[]", []):
+            chunk = [{name: value for name, value in item.items() if name != "body"} for item in chunk]
+        return 200, chunk, headers
+
+    def paginate(self, items: list, path: List[str], query: dict, default_per_page: int) -> Tuple[list, dict]:
+        # one page of `items` and its `Link` header, as Canvas and GitHub both paginate
+        per_page = min(int(query.get("per_page", [default_per_page])[0]), MAX_PER_PAGE)
+        page = int(query.get("page", ["1"])[0])
+        last = max(1, -(-len(items) // per_page))
+        links = [("current", page), ("first", 1), ("last", last)] + ([("next", page + 1)] if page < last else [])
+        base = f"{self.server.url}/{'/'.join(path)}"
+        link = ", ".join(f'<{base}?{urlencode({**query, "page": n, "per_page": per_page}, doseq=True)}>; rel="{rel}"'
+                         for rel, n in links)
+        return items[(page - 1) * per_page:page * per_page], {"Link": link}
+
+    # <--- github --->
+    def github_repo(self, owner: str, name: str) -> Optional[dict]:
+        repo = self.server.corpus.repos.get(name)
+        return repo if owner == OWNER and repo is not None and not repo["missing"] else None
+
+    def github_api(self, path: List[str], query: dict):
+        not_found = (404, {"message": "Not Found"}, {})
+        if path[0] != "repos" or len(path) < 3:
+            return not_found
+        repo = self.github_repo(path[1], path[2])
+        if repo is None:
+            return not_found
+        if len(path) == 3:
+            return 200, {"name": path[2], "default_branch": repo["default_branch"],
+                         "pushed_at": max(repo["branches"].values())}, {}
+        if path[3] != "branches":
+            return not_found
+        if len(path) == 4:
+            # GitHub lists branches by name
+            return 200, *self.paginate([{"name": branch, "commit": {"sha": self.sha(path[2], branch)}}
+                                        for branch in sorted(repo["branches"])], path, query, GITHUB_PER_PAGE)
+        branch = "/".join(path[4:])
+        if branch not in repo["branches"]:
+            return (404, {"message": "Branch not found"}, {})
+        date = repo["branches"][branch]
+        return 200, {"name": branch, "commit": {"sha": self.sha(path[2], branch),
+                                                "commit": {"author": {"date": date}, "committer": {"date": date}}}}, {}
+
+    def graphql_repository(self, owner: str, name: str) -> Optional[dict]:
+        repo = self.github_repo(owner, name)
+        if repo is None:
+            return None
+
+        def node(branch):
+            # a GitTimestamp keeps the author's UTC offset, unlike the REST API's UTC dates
+            date = datetime.strptime(repo["branches"][branch], "%Y-%m-%dT%H:%M:%S%z")
+            local = date.astimezone(timezone(timedelta(hours=2))).isoformat()
+            return {"name": branch, "target": {"author": {"date": local}}}
+
+        return {
+            "refs": {"nodes": [node(branch) for branch in sorted(repo["branches"])],
+                     "pageInfo": {"hasNextPage": False, "endCursor": None}},
+            "master": {"__typename": "Blob"} if "master" in repo["dot_canvas"] else None,
+            "main": {"__typename": "Blob"} if "main" in repo["dot_canvas"] else None,
+        }
+
+    def github_graphql(self, variables: dict) -> dict:
+        # answers the queries of `graphql_helpers.build_probe_query` from their variables: `r{n}` is the
+        # repository `o{n}`/`n{n}`; no corpus repository has more than one page of branches
+        data = {}
+        n = 0
+        while f"o{n}" in variables:
+            data[f"r{n}"] = self.graphql_repository(variables[f"o{n}"], variables[f"n{n}"])
+            n += 1
+        return data
+
+    def github_raw(self, path: List[str], query: dict):
+        not_found = (404, "404: Not Found", {})
+        if len(path) < 4:
+            return not_found
+        repo = self.github_repo(path[0], path[1])
+        branch, filename = path[2], "/".join(path[3:])
+        if repo is None or branch not in repo["branches"]:
+            return not_found
+        if filename == "README.md" and branch != "solution":
+            return 200, repo["readme"], {}
+        if filename == ".canvas" and branch in repo["dot_canvas"]:
+            return 200, "---\ntags: []\n", {}
+        return not_found
+
+    @staticmethod
+    def sha(repo: str, branch: str) -> str:
+        return hashlib.sha1(f"{repo}@{branch}".encode()).hexdigest()
+
+
+def serve(lessons: int, latency: float, rate_limit: Optional[int], rate_window: float,
+          fixtures: Optional[dict], urls=None) -> Dict[str, StandInServer]:
+    """
+    Start one stand-in server per role, each on its own thread and free port.
+
+    Args:
+        lessons (int): Size of the synthetic corpus.
+        latency (float): Seconds added to every response.
+        rate_limit (Optional[int]): Requests per window, see `StandInServer`.
+        rate_window (float): Rate limit window in seconds.
+        fixtures (Optional[dict]): Recorded responses, see the module docstring.
+        urls (multiprocessing.Queue): If given, receives the base URL per role.
+
+    Returns:
+        Dict[str, StandInServer]: The running servers by role.
+    """
+    corpus = Corpus(lessons)
+    servers = {role: StandInServer(role, corpus, latency, rate_limit, rate_window, fixtures) for role in ROLES}
+    for server in servers.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    if urls is not None:
+        urls.put({role: server.url for role, server in servers.items()})
+    return servers
+
+
+def _serve_forever(*args) -> None:
+    serve(*args)
+    threading.Event().wait()
+
+
+def start(lessons: int, latency: float = 0.0, rate_limit: Optional[int] = None, rate_window: float = 60.0,
+          fixtures: Optional[dict] = None) -> Tuple[multiprocessing.Process, Dict[str, str]]:
+    """
+    Run the stand-ins in a child process, so that serving requests neither
+    shares the benchmarked process's interpreter lock nor counts towards its
+    memory.
+
+    Returns:
+        Tuple[multiprocessing.Process, Dict[str, str]]: The process (terminate
+            it when done) and the base URL per role.
+    """
+    context = multiprocessing.get_context("spawn")
+    urls = context.Queue()
+    process = context.Process(target=_serve_forever, daemon=True,
+                              args=(lessons, latency, rate_limit, rate_window, fixtures, urls))
+    process.start()
+    return process, urls.get(timeout=60)
+
+
+def environment(urls: Dict[str, str]) -> Dict[str, str]:
+    """
+    Environment variables pointing the pipelines at the stand-ins.
+    """
+    return {"CANVAS_INSTANCE": urls["canvas"], "GITHUB_API_URL": urls["api"], "GITHUB_RAW_URL": urls["raw"],
+            "GITHUB_GRAPHQL_URL": f"{urls['api']}/graphql", "CANVAS_TOKEN": "standin", "GITHUB_TOKEN": "standin"}
+
+
+def write_mirrors(corpus: Corpus, root: str) -> int:
+    """
+    Write every repository of a corpus that GitHub "has" as a bare git
+    repository `{root}/{OWNER}/{repo}.git`, with the same branches, commit
+    dates, READMEs and `.canvas` files the stand-ins serve.
+
+    Returns:
+        int: Repositories written.
+    """
+    written = 0
+    for name, repo in corpus.repos.items():
+        if repo["missing"]:
+            continue
+        git_dir = os.path.join(root, OWNER, f"{name}.git")
+        subprocess.run(["git", "init", "--bare", "--quiet", git_dir], check=True)
+        stream = []
+        for branch, date in repo["branches"].items():
+            when = int(datetime.strptime(date, "%Y-%m-%dT%H:%M:%S%z").timestamp())
+            files = {}
+            if branch != "solution":
+                files["README.md"] = repo["readme"]
+            if branch in repo["dot_canvas"]:
+                files[".canvas"] = "---\ntags: []\n"
+            message = f"{branch}\n".encode()
+            stream += [f"commit refs/heads/{branch}\n".encode(),
+                       f"author Stand-in <standin@example.com> {when} +0000\n".encode(),
+                       f"committer Stand-in <standin@example.com> {when} +0000\n".encode(),
+                       f"data {len(message)}\n".encode(), message]
+            for path, text in files.items():
+                data = text.encode("utf-8")
+                stream += [f"M 100644 inline {path}\n".encode(), f"data {len(data)}\n".encode(), data, b"\n"]
+            stream.append(b"\n")
+        subprocess.run(["git", f"--git-dir={git_dir}", "fast-import", "--quiet"], input=b"".join(stream), check=True)
+        subprocess.run(["git", f"--git-dir={git_dir}", "symbolic-ref", "HEAD", f"refs/heads/{repo['default_branch']}"],
+                       check=True)
+        written += 1
+    return written
+
+
+def write_export(corpus: Corpus, course_id: int, path: str) -> None:
+    """
+    Write a course of a corpus as a Canvas course export (IMS Common
+    Cartridge) archive, laid out as Canvas does: pages in `wiki_content/`,
+    each assignment in a folder of its own with its settings, and every
+    item listed in `imsmanifest.xml`.
+    """
+    def document(title: str, body: str) -> str:
+        return (f'<html>\n<head>\n<meta http-equiv="Content-Type" content="text/html; charset=utf-8">\n'
+                f'<title>{escape(title)}</title>\n</head>\n<body>\n{body}\n</body>\n</html>')
+
+    def key(kind: str, item_id: int) -> str:
+        return "g" + hashlib.md5(f"{kind}_{item_id}".encode()).hexdigest()
+
+    course = corpus.courses[course_id]
+    resources = []
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for page in course["pages"]:
+            href = f"wiki_content/{page['url']}.html"
+            archive.writestr(href, document(page["title"], page["body"]))
+            resources.append(f'<resource identifier="{key("wiki_page", page["page_id"])}" type="webcontent" '
+                             f'href="{href}"><file href="{href}"/></resource>')
+        group = key("assignment_group", course_id)
+        for position, assignment in enumerate(course["assignments"], start=1):
+            identifier = key("assignment", assignment["id"])
+            href = f"{identifier}/assignment-{assignment['id']}.html"
+            archive.writestr(href, document(f"Assignment: {assignment['name']}", assignment["description"]))
+            archive.writestr(f"{identifier}/assignment_settings.xml", (
+                f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<assignment xmlns="http://canvas.instructure.com/xsd/cccv1p0" identifier="{identifier}">\n'
+                f'  <title>{escape(assignment["name"])}</title>\n'
+                f'  <assignment_group_identifierref>{group}</assignment_group_identifierref>\n'
+                f'  <workflow_state>published</workflow_state>\n  <position>{position}</position>\n'
+                f'</assignment>\n'))
+            resources.append(f'<resource identifier="{identifier}" '
+                             f'type="associatedcontent/imscc_xmlv1p1/learning-application-resource" href="{href}">'
+                             f'<file href="{href}"/><file href="{identifier}/assignment_settings.xml"/></resource>')
+        archive.writestr("course_settings/assignment_groups.xml", (
+            f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<assignmentGroups xmlns="http://canvas.instructure.com/xsd/cccv1p0">\n'
+            f'  <assignmentGroup identifier="{group}"><title>Assignments</title><position>1</position>'
+            f'</assignmentGroup>\n</assignmentGroups>\n'))
+        archive.writestr("imsmanifest.xml", (
+            f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<manifest identifier="{key("course", course_id)}" '
+            f'xmlns="http://www.imsglobal.org/xsd/imsccv1p1/imscp_v1p1">\n'
+            '  <organizations/>\n  <resources>\n    ' + "\n    ".join(resources) + '\n  </resources>\n'
+            '</manifest>\n'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--fixtures", default=None)
+    parser.add_argument("--write-mirrors", default=None, metavar="DIR",
+                        help="write the corpus's repositories as bare git repositories to DIR and exit")
+    parser.add_argument("--write-exports", default=None, metavar="DIR",
+                        help="write a Canvas course export archive per course to DIR and exit")
+    args = parser.parse_args()
+
+    if args.write_exports:
+        corpus = Corpus(args.lessons)
+        os.makedirs(args.write_exports, exist_ok=True)
+        for course_id in corpus.courses:
+            write_export(corpus, course_id, os.path.join(args.write_exports, f"course-{course_id}.imscc"))
+        print(f"[*] {len(corpus.courses)} course exports written to '{args.write_exports}'")
+        return
+
+    if args.write_mirrors:
+        count = write_mirrors(Corpus(args.lessons), args.write_mirrors)
+        print(f"[*] {count} repositories written to '{args.write_mirrors}'")
+        print(f"export DSC_GIT_MIRRORS={os.path.abspath(args.write_mirrors)}")
+        return
+
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures) as f:
+            fixtures = json.load(f)
+    servers = serve(args.lessons, args.latency, args.rate_limit, args.rate_window, fixtures)
+    corpus = servers["canvas"].corpus
+    print(f"[*] {args.lessons} lessons in courses 1-{len(corpus.courses)}, {len(corpus.repos)} repositories")
+    for name, value in environment({role: server.url for role, server in servers.items()}).items():
+        print(f"export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# <--- data stuff --->
+import json
+import sqlite3
+
+# <--- python stuff --->
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "dsc_api_tools", "http_cache.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def cache_key(method: str, url: str, accept: Optional[str] = None, authorization: Optional[str] = None) -> str:
+    """
+    Build the cache key for a request.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Absolute URL, including the query string.
+        accept (str): `Accept` header, since GitHub varies the body on it.
+        authorization (str): `Authorization` header, so a response fetched
+            with one token is never served to a request made with another.
+            Only its digest goes into the key.
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    credential = hashlib.sha256(authorization.encode()).hexdigest() if authorization else ""
+    return hashlib.sha256(f"{method.upper()} {url} {accept or ''} {credential}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded, least-recently-used store of HTTP responses in SQLite.
+
+    Entries keep the validators (`ETag`, `Last-Modified`) needed to send
+    conditional requests, and the time they were last confirmed fresh.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path (str): SQLite file, created with its directory if missing.
+            max_bytes (int): Total body size kept before the least recently
+                used entries are evicted.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up an entry and mark it as recently used.
+
+        Args:
+            key (str): Key from `cache_key`.
+
+        Returns:
+            Optional[dict]: The entry, or None if it is not cached.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        url, status, headers, body, etag, last_modified, stored_at = row
+        return {"url": url, "status": status, "headers": json.loads(headers), "body": body,
+                "etag": etag, "last_modified": last_modified, "stored_at": stored_at}
+
+    def put(self, key: str, url: str, status: int, headers: dict, body: bytes) -> None:
+        """
+        Store (or replace) an entry, then evict down to `max_bytes`.
+
+        Args:
+            key (str): Key from `cache_key`.
+            url (str): Request URL.
+            status (int): Response status code.
+            headers (dict): Response headers.
+            body (bytes): Response body.
+        """
+        now = time.time()
+        headers = dict(headers)
+        lowered = {name.lower(): value for name, value in headers.items()}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, lowered.get("etag"),
+                 lowered.get("last-modified"), now, now, len(body)))
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str) -> None:
+        """
+        Mark an entry as just revalidated (e.g. after a 304).
+
+        Args:
+            key (str): Key from `cache_key`.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """
+        Drop least recently used entries until the cache fits `max_bytes`.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove every entry.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -1,60 +1,146 @@
 # <--- api stuff --->
 import os
-import requests
-from dotenv import load_dotenv
-load_dotenv()
-
-# <--- text processing stuff --->
-import re
-import markdown
-import markdown2
-from bs4 import BeautifulSoup
 
 # <--- data stuff --->
 import pandas as pd
 import csv
-from datetime import datetime
-from typing import List, Optional, Dict, Tuple
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Dict, Tuple
 
-# <--- canvas stuff --->
-from canvasapi import Canvas
+# <--- python stuff --->
+import ast
+import glob
+import itertools
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
-# <--- canvas credentials --->
-canvas_token = os.environ.get('CANVAS_TOKEN')
-canvas_instance = "https://learning.flatironschool.com"
-canvas = Canvas(canvas_instance, canvas_token)
-headers = {"Authorization": f"Bearer {canvas_token}"}
+# <--- canvas stuff --->
+from src.client_helpers import (CANVAS_INSTANCE, CANVAS_PER_PAGE, canvas_headers, get_canvas, getenv,
+                                iter_paginated)
 
 # <--- custom --->
-from src.markdown_helpers import *
-from src.git_helpers import *
-from src.pandas_helpers import *
-
-
-def generate_canvas_report(courses: pd.DataFrame, owner: str, repo_name: str, git_token: str) -> None:
+from src.git_helpers import (canonical_repo_url, check_for_dot_canvas_branches, fan_out, get_branch_updates,
+                             get_branches, get_git_repo_url, get_github_details, get_repo_pushed_at, repo_key)
+from src.metrics_helpers import report_metrics
+from src.pandas_helpers import extract_dict_values
+from src.export_helpers import read_course_export
+from src.graphql_helpers import graphql_process_repo_urls
+from src import mirror_helpers
+from src.shard_helpers import ROW_COLUMN, check_shards, shard_path, shard_rows
+from src.report_helpers import (CANVAS_REPORT_FIELDS, check_format, read_canvas_report, report_extension,
+                                write_parquet, write_parquet_chunks)
+
+def __getattr__(name):
+    # the Canvas client and credentials used to be built at import time;
+    # they are now built on first access
+    if name == "canvas":
+        return get_canvas()
+    if name == "canvas_instance":
+        return CANVAS_INSTANCE
+    if name == "canvas_token":
+        return getenv("CANVAS_TOKEN")
+    if name == "headers":
+        return canvas_headers()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# <--- report layout --->
+COURSE_CONTENT_COLUMNS = ["phase", "course_number", "canvas_page_id", "canvas_page_title",
+                          "canvas_page_url", "canvas_updated_at", "git_url"]
+PROBE_COLUMNS = ["git_master_branch_dot_canvas", "git_main_branch_dot_canvas", "git_repo_all_branches_updates"]
+PARTIAL_REPORT = "canvas_report.partial.csv"
+# Rows of a course retrieved ahead of the caller
+COURSE_PREFETCH = 256
+# Probe results a streamed report keeps for repositories linked again later
+RECENT_PROBES = 1024
+# dtype of a column of strings, as `get_course_content` builds its dates: `object`, or `str` from pandas 3 on
+STRING_DTYPE = pd.Series([""]).dtype
+
+
+@report_metrics
+def generate_canvas_report(courses: pd.DataFrame, owner: str, repo_name: str, git_token: str,
+                           use_graphql: bool = False, incremental: bool = False, max_workers: int = 1,
+                           stream: bool = False, resume: bool = False, checkpoint_every: int = 50,
+                           output_format: str = "csv", shard: Optional[Tuple[int, int]] = None,
+                           exports: Optional[Dict[int, str]] = None) -> None:
     """
-    Generate a Canvas report and save it as a CSV file.
+    Generate a Canvas report and save it as a CSV or Parquet file.
 
     Args:
         courses (pd.DataFrame): DataFrame containing course data.
         owner (str): Owner of the repository.
         repo_name (str): Name of the repository.
         git_token (str): GitHub API token for authentication.
+        use_graphql (bool): Probe repositories with batched GraphQL queries.
+        incremental (bool): Start from the most recent report in
+            `canvas_reports/` and only re-probe rows that changed in Canvas or
+            whose repository was pushed since that report was written.
+        max_workers (int): Repositories probed concurrently over REST.
+        stream (bool): Write each row to a partial report as soon as its
+            lesson is probed (see `stream_canvas_report`), instead of
+            building the whole report in memory.
+        resume (bool): Stream, skipping rows already in the partial report
+            left by an interrupted run.
+        checkpoint_every (int): Rows between flushes of the partial report to disk.
+        output_format (str): "csv", or "parquet" for a compressed file with
+            the fixed schema of `report_helpers.CANVAS_REPORT_FIELDS`
+            (requires pyarrow).
+        shard (Optional[Tuple[int, int]]): (i, n) to probe only the i-th of
+            n partitions of the repositories (see `shard_helpers.shard_of`)
+            and write their rows, unexpanded, to a partial CSV report for
+            `merge_canvas_reports`. Every shard reads the whole course
+            list, which costs a few requests per course.
+        exports (Optional[Dict[int, str]]): Canvas course export archives
+            by course number, read instead of crawling `courses` through
+            the API (see `get_export_content`). Page ids and update times,
+            which exports do not carry, come from the most recent report
+            in `canvas_reports/` if there is one.
 
     Returns:
         None
     """
+    check_format(output_format)
+
     # Step 0: Check and create 'canvas_reports' directory if it doesn't exist
     reports_dir = "canvas_reports"
     if not os.path.exists(reports_dir):
         os.makedirs(reports_dir)
 
+    if stream or resume:
+        if shard is not None:
+            raise ValueError("Sharded reports cannot be streamed")
+        if incremental or use_graphql or exports:
+            raise ValueError("Streaming reports probe over REST and cannot be combined with incremental or GraphQL "
+                             "mode or course exports")
+        filepath = stream_canvas_report(courses, git_token, reports_dir, resume=resume,
+                                        checkpoint_every=checkpoint_every, max_workers=max_workers,
+                                        output_format=output_format)
+        print(f"{output_format.upper()} report '{os.path.basename(filepath)}' saved successfully.")
+        return filepath
+
     # Step 1: Retrieve course content
-    df = get_course_content(courses)
+    previous_path = find_latest_report(reports_dir) if incremental or exports else None
+    previous = read_canvas_report(previous_path) if previous_path else None
+    if exports:
+        df = get_export_content(exports, previous=previous)
+    else:
+        df = get_course_content(courses, previous=previous)
+    if shard is not None:
+        df[ROW_COLUMN] = range(len(df))
+        df = df.iloc[shard_rows(df["git_url"], shard)].reset_index(drop=True)
+        print(f"[*] Shard {shard[0]}/{shard[1]}: {len(df)} rows")
 
     # Step 2: Process repository URLs
-    repo_urls = df["git_url"]
-    master, main, branches, updates = process_repo_urls(repo_urls, owner, git_token)
+    if previous is None or not incremental:
+        repo_urls = df["git_url"]
+        master, main, branches, updates = process_repo_urls(repo_urls, owner, git_token, use_graphql=use_graphql,
+                                                            max_workers=max_workers)
+    else:
+        print(f"[*] Updating from previous report '{previous_path}'")
+        since = datetime.fromtimestamp(os.path.getmtime(previous_path), tz=timezone.utc)
+        master, main, updates = reprobe_changed_rows(df, previous, since, owner, git_token, use_graphql,
+                                                     max_workers)
 
     # Step 3: Assign processed data to DataFrame columns
     df["git_master_branch_dot_canvas"] = master
@@ -62,100 +148,474 @@ def generate_canvas_report(courses: pd.DataFrame, owner: str, repo_name: str, gi
 #     df["git_repo_all_branches"] = branches
     df["git_repo_all_branches_updates"] = updates
 
+    if shard is not None:
+        # branch columns are only known once every shard is in, see `merge_canvas_reports`
+        filepath = shard_path(reports_dir, "canvas_report", shard)
+        df.to_csv(filepath, index=False)
+        print(f"Shard report '{os.path.basename(filepath)}' saved successfully.")
+        return filepath
+
     # Step 4: Extract values from nested dictionaries in a DataFrame column
     df = extract_dict_values(df, "git_repo_all_branches_updates")
 
-    # Step 5: Generate timestamp
+    # Step 5: Generate timestamped filename
+    filepath = report_filepath(reports_dir, output_format)
+
+    # Step 6: Save DataFrame to file
+    if output_format == "parquet":
+        write_parquet(df, filepath, CANVAS_REPORT_FIELDS)
+    else:
+        df.to_csv(filepath, index=False)
+
+    print(f"{output_format.upper()} report '{os.path.basename(filepath)}' saved successfully.")
+    return filepath
+
+
+def merge_canvas_reports(paths: List[str], output_format: str = "csv", reports_dir: str = "canvas_reports") -> str:
+    """
+    Combine the partial reports of every shard into one Canvas report, with
+    the rows in course order and branch columns as an unsharded run writes
+    them.
+
+    Args:
+        paths (List[str]): One partial report per shard, from
+            `generate_canvas_report(shard=...)`, in any order.
+        output_format (str): "csv" or "parquet".
+        reports_dir (str): Directory the report is written to.
+
+    Returns:
+        str: Path of the merged report.
+
+    Raises:
+        ValueError: If the shards are incomplete (see `shard_helpers.check_shards`).
+    """
+    check_format(output_format)
+    paths = check_shards(paths)
+
+    # read as text, so values are written back exactly as each shard wrote them
+    df = pd.concat([pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths], ignore_index=True)
+    df = df.sort_values(ROW_COLUMN, key=lambda rows: rows.astype(int), kind="stable")
+    df = df.drop(columns=ROW_COLUMN).reset_index(drop=True)
+    df["git_repo_all_branches_updates"] = [ast.literal_eval(updates) for updates in df["git_repo_all_branches_updates"]]
+    df = extract_dict_values(df, "git_repo_all_branches_updates")
+
+    os.makedirs(reports_dir, exist_ok=True)
+    filepath = report_filepath(reports_dir, output_format)
+    if output_format == "parquet":
+        write_parquet(df, filepath, CANVAS_REPORT_FIELDS)
+    else:
+        df.to_csv(filepath, index=False)
+
+    print(f"{output_format.upper()} report '{os.path.basename(filepath)}' merged from {len(paths)} shards.")
+    return filepath
+
+
+def report_filepath(reports_dir: str = "canvas_reports", output_format: str = "csv") -> str:
+    """
+    Build the timestamped path of a new Canvas report.
+
+    Args:
+        reports_dir (str): Directory the report is written to.
+        output_format (str): "csv" or "parquet".
+
+    Returns:
+        str: Path of the report file.
+    """
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     timestamp_short = timestamp[:9]
+    return os.path.join(reports_dir, f"canvas_report_{timestamp_short}{report_extension(output_format)}")
+
 
-    # Step 6: Save DataFrame to CSV file
-    filename = f"canvas_report_{timestamp_short}.csv"
-    filepath = os.path.join(reports_dir, filename)
-    df.to_csv(filepath, index=False)
+def stream_canvas_report(courses: list, git_token: str, reports_dir: str = "canvas_reports",
+                         resume: bool = False, checkpoint_every: int = 50, max_workers: int = 1,
+                         output_format: str = "csv") -> str:
+    """
+    Generate a Canvas report row by row, with checkpoints.
+
+    Lessons are probed as they come out of Canvas and written, in order, to
+    `canvas_report.partial.csv` in `reports_dir`. The file is flushed to disk
+    every `checkpoint_every` rows. Memory does not grow with the report: at
+    most `2 * max_workers` rows wait on their probes, a probe is dropped once
+    the last row waiting on it is written (only the last `RECENT_PROBES`
+    results are kept), and course content is read ahead only as far as
+    `iter_course_content` goes. Once every course is done,
+    the partial report is expanded into the usual per-branch columns and the
+    final report is written.
 
-    print(f"CSV report '{filename}' saved successfully.")
+    Args:
+        courses (list): A list of course numbers.
+        git_token (str): Git token for authentication.
+        reports_dir (str): Directory for the partial and final reports.
+        resume (bool): Keep the rows of an existing partial report and skip
+            those lessons instead of starting over.
+        checkpoint_every (int): Rows between flushes to disk.
+        max_workers (int): Repositories probed concurrently.
+        output_format (str): "csv" or "parquet".
+
+    Returns:
+        str: Path of the final report.
+    """
+    partial_path = os.path.join(reports_dir, PARTIAL_REPORT)
+    done = load_partial_report(partial_path) if resume else set()
+    if done:
+        print(f"[*] Resuming: {len(done)} rows already in '{partial_path}'")
+
+    # a repository is probed once for all the rows waiting on it, and the
+    # results of the last `RECENT_PROBES` repositories are kept for reuse
+    probes: Dict[object, Future] = {}
+    waiting: Dict[object, int] = {}
+    recent: "OrderedDict[object, tuple]" = OrderedDict()
+    in_flight = deque()
+    written = 0
+
+    with open(partial_path, "a" if resume else "w", newline="") as f, \
+            ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        writer = csv.writer(f, lineterminator="\n")
+        if f.tell() == 0:
+            writer.writerow(COURSE_CONTENT_COLUMNS + PROBE_COLUMNS)
+
+        def write_oldest():
+            nonlocal written
+            row, key = in_flight.popleft()
+            master, main, _, updates = probes[key].result()
+            waiting[key] -= 1
+            if not waiting[key]:
+                recent[key] = probes.pop(key).result()
+                del waiting[key]
+                if len(recent) > RECENT_PROBES:
+                    recent.popitem(last=False)
+            writer.writerow(row + [master, main, updates])
+            written += 1
+            if written % checkpoint_every == 0:
+                checkpoint(f)
+                print(f"[*] Checkpoint: {len(done) + written} rows written")
+
+        for row in iter_course_content(courses):
+            if (str(row[1]), str(row[2])) in done:
+                continue
+            url = row[6]
+            key = repo_key(url) or url
+            if key not in probes:
+                if key in recent:
+                    probes[key] = Future()
+                    probes[key].set_result(recent.pop(key))
+                else:
+                    probes[key] = pool.submit(probe_repo_url, canonical_repo_url(url) or url, git_token)
+                waiting[key] = 0
+            waiting[key] += 1
+            in_flight.append((row, key))
+            while len(in_flight) > 2 * max(1, max_workers) or (in_flight and probes[in_flight[0][1]].done()):
+                write_oldest()
+
+        while in_flight:
+            write_oldest()
+        checkpoint(f)
+
+    filepath = report_filepath(reports_dir, output_format)
+    if output_format == "parquet":
+        chunks = pd.read_csv(partial_path, dtype=str, keep_default_na=False, chunksize=10000)
+        write_parquet_chunks(chunks, filepath, CANVAS_REPORT_FIELDS)
+    else:
+        finalize_partial_report(partial_path, filepath)
+    os.remove(partial_path)
     return filepath
 
 
-def get_course_content(courses: list) -> pd.DataFrame:
+def checkpoint(f) -> None:
+    """
+    Flush a file's buffers all the way to disk.
+    """
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def load_partial_report(partial_path: str) -> set:
+    """
+    Read the rows already written by an interrupted streaming run.
+
+    A row cut off by the interruption is dropped (the file is rewritten
+    without it), so the run can append to a clean file. Rows are only
+    written whole, so the last one is cut off unless the file ends with a
+    newline, even if the cut fell inside its quoted branch updates and left
+    it every column; rows whose branch updates do not parse are dropped too.
+
+    Args:
+        partial_path (str): Path of the partial report.
+
+    Returns:
+        set: (course_number, canvas_page_id) of completed rows, as strings.
+    """
+    if not os.path.exists(partial_path):
+        return set()
+    header = COURSE_CONTENT_COLUMNS + PROBE_COLUMNS
+    with open(partial_path, "rb") as f:
+        f.seek(max(f.seek(0, os.SEEK_END) - 1, 0))
+        complete = f.read(1) in (b"\n", b"")
+    with open(partial_path, newline="") as f:
+        rows = list(csv.reader(f))
+    if rows and not complete:
+        rows.pop()
+    rows = [header] + [row for row in rows if len(row) == len(header) and row != header and _parses(row[-1])]
+
+    temp_path = partial_path + ".tmp"
+    with open(temp_path, "w", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerows(rows)
+        checkpoint(f)
+    os.replace(temp_path, partial_path)
+    return {(row[1], row[2]) for row in rows[1:]}
+
+
+def _parses(literal: str) -> bool:
+    try:
+        ast.literal_eval(literal)
+    except (ValueError, SyntaxError):
+        return False
+    return True
+
+
+def finalize_partial_report(partial_path: str, filepath: str) -> None:
+    """
+    Expand a partial report's branch updates into one column per branch,
+    as `extract_dict_values` does, reading the file twice instead of
+    loading it.
+
+    Args:
+        partial_path (str): Path of the partial report.
+        filepath (str): Path of the final report.
+    """
+    keys = {}
+    with open(partial_path, newline="") as f:
+        for row in csv.DictReader(f):
+            updates = ast.literal_eval(row["git_repo_all_branches_updates"])
+            if isinstance(updates, dict):
+                keys.update(dict.fromkeys(updates))
+
+    with open(partial_path, newline="") as f, open(filepath, "w", newline="") as out:
+        reader = csv.reader(f)
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(next(reader) + [str(key) for key in keys])
+        for row in reader:
+            updates = ast.literal_eval(row[-1])
+            if not isinstance(updates, dict):
+                updates = {}
+            writer.writerow(row + [updates.get(key) for key in keys])
+
+
+def find_latest_report(reports_dir: str = "canvas_reports") -> Optional[str]:
+    """
+    Find the most recently written Canvas report.
+
+    Args:
+        reports_dir (str): Directory containing `canvas_report_*.csv` or
+            `canvas_report_*.parquet` files.
+
+    Returns:
+        Optional[str]: Path of the newest report, or `None` if there is none.
+    """
+    reports = (glob.glob(os.path.join(reports_dir, "canvas_report_*.csv"))
+               + glob.glob(os.path.join(reports_dir, "canvas_report_*.parquet")))
+    return max(reports, key=os.path.getmtime) if reports else None
+
+
+def get_course_content(courses: list, max_workers: int = 8,
+                       previous: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Retrieves course content from Canvas API and returns a DataFrame.
 
+    Page bodies are requested from the list endpoint (`include[]=body`) and
+    assignment descriptions come back with the assignment list, so a single
+    item is only fetched on its own when Canvas leaves its body out. Courses
+    and those fallback fetches run concurrently.
+
     Args:
         courses (list): A list of course numbers.
+        max_workers (int): Maximum number of concurrent Canvas requests.
+        previous (pd.DataFrame): An earlier report. Rows whose
+            `canvas_updated_at` is unchanged keep its `git_url` instead of
+            re-parsing the body.
 
     Returns:
         pd.DataFrame: A DataFrame containing course content information.
     """
-    # Initialize lists to store data
-    page_ids, repo_urls, updated_at = [], [], []
-    page_titles, page_urls = [], []
-    course_numbers, phases, canvas_types = [], [], []
-
-    for n, course_number in enumerate(courses):
-        # Get course object from Canvas API
-        course = canvas.get_course(course_number)
-        
-        # Retrieve pages from the course
-        pages = course.get_pages()
-        page_count = len([p for p in pages])
-        print(f"[*] Retrieving {(page_count)} pages from Course #{course_number}")
-        for page in pages:
-            p = course.get_page(page.page_id)
-            
-            # Store page data
-            phases.append(n)
-            course_numbers.append(course_number)
-            canvas_types.append("page")
-            updated_at.append(p.updated_at)
-            page_ids.append(p.page_id)
-            page_titles.append(p.title)
-            page_urls.append(p.url)
-            repo_urls.append(get_git_repo_url(str(p.body)))
-
-        # Retrieve assignments from the course
-        assignments = course.get_assignments()
-        assign_count = len([a for a in assignments])
-        print(f"[*] Retrieving {(assign_count)} assignments from Course #{course_number}")
-        for assignment in assignments:
-            a = course.get_assignment(assignment.id)
-            
-            # Store assignment data
-            phases.append(n)
-            course_numbers.append(course_number)
-            canvas_types.append("assignment")
-            updated_at.append(a.updated_at)
-            page_ids.append(a.id)
-            page_titles.append(a.name)
-            page_urls.append(False)
-            repo_urls.append(get_git_repo_url(str(a.description)))
+    return pd.DataFrame(list(iter_course_content(courses, max_workers, previous)), columns=COURSE_CONTENT_COLUMNS)
 
-    # Create a list of data for the DataFrame
-    canvas_data = [phases, course_numbers, page_ids, page_titles, page_urls, updated_at, repo_urls]
 
-    # Define column names for the DataFrame
-    cols = ["phase", "course_number", "canvas_page_id", "canvas_page_title",
-            "canvas_page_url", "canvas_updated_at", "git_url"]
+def get_export_content(exports: Dict[int, str], previous: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Read course content from Canvas course export archives instead of the
+    Canvas API, with the columns and row order of `get_course_content`.
 
-    # Create an empty DataFrame with the defined columns
-    canvas_page_df = pd.DataFrame(columns=cols)
+    An export carries neither the Canvas ids of its pages and assignments
+    nor their update times, so `canvas_page_id` and `canvas_updated_at`
+    are taken from `previous`, matching pages by their URL and assignments
+    by their title, and left empty for items it does not have.
 
-    # Assign data to DataFrame columns
-    for n, col in enumerate(cols):
-        canvas_page_df[col] = canvas_data[n]
+    Args:
+        exports (Dict[int, str]): Export archive (`.imscc`/`.zip`) per course
+            number, in course order.
+        previous (pd.DataFrame): An earlier report of the same courses.
 
-    return canvas_page_df
+    Returns:
+        pd.DataFrame: A DataFrame containing course content information.
+
+    Raises:
+        ValueError: If a file is not a Canvas course export.
+    """
+    known = {}
+    if previous is not None:
+        columns = ["course_number", "canvas_page_id", "canvas_page_title", "canvas_page_url", "canvas_updated_at"]
+        for course_number, page_id, title, url, updated_at in previous[columns].itertuples(index=False):
+            page = isinstance(url, str) and url != "False"
+            # ids read back as floats if some are missing, e.g. in a report of exports alone
+            known.setdefault((course_number, "page" if page else "assignment", url if page else title),
+                             (int(page_id) if pd.notna(page_id) else None,
+                              updated_at if isinstance(updated_at, str) else None))
+
+    rows = []
+    for phase, (course_number, path) in enumerate(exports.items()):
+        pages, assignments = read_course_export(path)
+        print(f"[*] Read {len(pages)} pages and {len(assignments)} assignments of Course #{course_number} "
+              f"from '{path}'")
+        for page in pages:
+            page_id, updated_at = known.get((course_number, "page", page["url"]), (None, None))
+            rows.append([phase, course_number, page_id, page["title"], page["url"], updated_at, page["git_url"]])
+        for assignment in assignments:
+            item_id, updated_at = known.get((course_number, "assignment", assignment["title"]), (None, None))
+            rows.append([phase, course_number, item_id, assignment["title"], False, updated_at, assignment["git_url"]])
+    df = pd.DataFrame(rows, columns=COURSE_CONTENT_COLUMNS)
+    # ids stay integers with some (or all) missing, and dates are typed like
+    # `get_course_content`'s ISO strings even when none are known
+    df["canvas_page_id"] = df["canvas_page_id"].astype("Int64")
+    df["canvas_updated_at"] = df["canvas_updated_at"].astype(STRING_DTYPE)
+    return df
+
+
+def iter_course_content(courses: list, max_workers: int = 8,
+                        previous: Optional[pd.DataFrame] = None) -> Iterator[list]:
+    """
+    Yield course content rows item by item, in the order of
+    `get_course_content`, while later courses are still being retrieved.
+
+    Up to `max_workers` courses are retrieved at once, each at most
+    `COURSE_PREFETCH` rows ahead of the caller, so memory does not grow
+    with the size of the courses.
+
+    Args:
+        courses (list): A list of course numbers.
+        max_workers (int): Maximum number of concurrent Canvas requests.
+        previous (pd.DataFrame): An earlier report (see `get_course_content`).
 
+    Yields:
+        list: One row of `COURSE_CONTENT_COLUMNS`.
+    """
+    known = {}
+    if previous is not None:
+        for row in previous[["course_number", "canvas_page_id", "canvas_updated_at", "git_url"]].itertuples(index=False):
+            git_url = row.git_url if isinstance(row.git_url, str) else None
+            known[(row.course_number, row.canvas_page_id)] = (str(row.canvas_updated_at), git_url)
+
+    max_workers = max(1, int(max_workers))
+    # stops the courses started ahead if the caller stops reading
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers=max_workers) as item_pool:
+        def start(n):
+            return iter_paginated(_iter_course_rows(n, courses[n], item_pool, known), prefetch=COURSE_PREFETCH,
+                                  cancel=cancel)
+
+        try:
+            started = deque(start(n) for n in range(min(max_workers, len(courses))))
+            for n in range(len(courses)):
+                yield from started.popleft()
+                if n + max_workers < len(courses):
+                    started.append(start(n + max_workers))
+        finally:
+            cancel.set()
+
+
+def _iter_course_rows(phase: int, course_number: int, item_pool: ThreadPoolExecutor,
+                      known: Optional[Dict[Tuple[int, int], Tuple[str, Optional[str]]]] = None) -> Iterator[list]:
+    """
+    Retrieve the page and assignment rows for a single course, yielding each
+    as soon as it and the rows before it are ready.
 
-def process_repo_urls(repo_urls: List[Optional[str]], owner: str, git_token: str) -> Tuple[List[bool], List[bool], List[List[str]], List[Dict[str, List[str]]]]:
+    Args:
+        phase (int): Position of the course in the program.
+        course_number (int): Canvas course number.
+        item_pool (ThreadPoolExecutor): Pool used to fetch items whose body
+            was not returned by the list endpoint, at most
+            `CANVAS_PER_PAGE` items ahead of the last row yielded.
+        known (Dict[Tuple[int, int], Tuple[str, Optional[str]]]): Previously
+            seen (updated_at, git_url) by (course_number, item id).
+
+    Yields:
+        list: One row per page, then one row per assignment.
+    """
+    # Get course object from Canvas API
+    course = get_canvas().get_course(course_number)
+
+    def progress(kind):
+        return lambda count: print(f"[*] Retrieved {count} {kind} from Course #{course_number}")
+
+    # Walk the pages (with bodies) and assignments (with descriptions) at once,
+    # each list a page ahead of the rows being built from it
+    pages = iter_paginated(course.get_pages(include=["body"], per_page=CANVAS_PER_PAGE), progress=progress("pages"))
+    assignments = iter_paginated(course.get_assignments(per_page=CANVAS_PER_PAGE), progress=progress("assignments"))
+
+    known = known or {}
+
+    def repo_url(item_id, updated_at, body):
+        updated_before, git_url = known.get((course_number, item_id), (None, None))
+        return git_url if updated_before == str(updated_at) else get_git_repo_url(str(body))
+
+    def page_row(p):
+        return [phase, course_number, p.page_id, p.title, p.url, p.updated_at, repo_url(p.page_id, p.updated_at, p.body)]
+
+    def assignment_row(a):
+        return [phase, course_number, a.id, a.name, False, a.updated_at, repo_url(a.id, a.updated_at, a.description)]
+
+    def finish(row):
+        if isinstance(row, Future):
+            item = row.result()
+            return page_row(item) if hasattr(item, "page_id") else assignment_row(item)
+        return row
+
+    # items the list left the body out of are fetched on their own, alongside
+    rows = itertools.chain(
+        (page_row(page) if hasattr(page, "body") else item_pool.submit(course.get_page, page.page_id)
+         for page in pages),
+        (assignment_row(a) if hasattr(a, "description") else item_pool.submit(course.get_assignment, a.id)
+         for a in assignments))
+    pending = deque()
+    for row in rows:
+        pending.append(row)
+        while pending and (len(pending) > CANVAS_PER_PAGE or not isinstance(pending[0], Future) or pending[0].done()):
+            yield finish(pending.popleft())
+    while pending:
+        yield finish(pending.popleft())
+
+
+def process_repo_urls(repo_urls: List[Optional[str]], owner: str, git_token: str,
+                      use_graphql: bool = False, batch_size: int = 25,
+                      max_workers: int = 1) -> Tuple[List[bool], List[bool], List[List[str]], List[Dict[str, List[str]]]]:
     """
     Process repository URLs to check for dot canvas, retrieve branches, and branch updates.
 
+    With `use_graphql`, `batch_size` repositories are probed per GraphQL
+    request instead of making 4+B REST calls per repository. Otherwise up to
+    `max_workers` repositories are probed in parallel; the shared HTTP client
+    throttles all of them against GitHub's rate limit headers, and results
+    keep the order of `repo_urls`. Either way, links to the same repository
+    (`/blob/main/README.md`, trailing slashes, `.git`, ...) are probed once.
+    With local git mirrors (`mirror_helpers.configure_mirrors`), every
+    repository is read from its mirror and `use_graphql` is ignored.
+
     Args:
         repo_urls (List[Optional[str]]): List of repository URLs.
         owner (str): Owner of the repository.
         git_token (str): Git token for authentication.
+        use_graphql (bool): Probe with batched GraphQL queries.
+        batch_size (int): Repositories per GraphQL request.
+        max_workers (int): Repositories probed concurrently over REST.
 
     Returns:
         Tuple[List[bool], List[bool], List[List[str]], List[Dict[str, List[str]]]]: Tuple containing:
@@ -164,41 +624,118 @@ def process_repo_urls(repo_urls: List[Optional[str]], owner: str, git_token: str
             - List of branches in each repository.
             - List of branch updates for each repository.
     """
-    master_branch_canvas_checks = []
-    main_branch_canvas_checks = []
-    branches_in_repo = []
-    branch_updates = []
-
-    for url in repo_urls:
-        if url is not None:
-            # Check for dot canvas in master branch
-            master_branch_canvas_checks.append(check_for_dot_canvas(url, "master"))
-            # Check for dot canvas in main branch
-            main_branch_canvas_checks.append(check_for_dot_canvas(url, "main"))
-        else:
-            master_branch_canvas_checks.append(False)
-            main_branch_canvas_checks.append(False)
-
-           
-        if url is not None:
-            # Retrieve branches in the repository
-            repo_name, owner = get_github_details(url)
-            branches = get_branches(owner, repo_name, git_token)
-            branches_in_repo.append(branches)
-
-            # Retrieve branch updates for each branch in the repository
-            
-            if branches != False:
-                repo_branch_update_data = {}
-                for branch in branches:
-                    repo_branch_update_data[branch] = get_branch_updates(owner, repo_name, branch)
-                branch_updates.append(repo_branch_update_data)
-                print(f"[*] {url} complete!")
-            else:
-                repo_branch_update_data = {False}
-                branch_updates.append(repo_branch_update_data)
-        else:
-            repo_branch_update_data = {False}
-            branch_updates.append(repo_branch_update_data)
-
-    return master_branch_canvas_checks, main_branch_canvas_checks, branches_in_repo, branch_updates
\ No newline at end of file
+    if use_graphql and not mirror_helpers.enabled():
+        return graphql_process_repo_urls(list(repo_urls), git_token, batch_size)
+
+    # Each unique repository is probed once, however many rows link to it
+    results = fan_out(repo_urls, lambda url: probe_repo_url(url, git_token), max_workers)
+
+    master_branch_canvas_checks = [master for master, _, _, _ in results]
+    main_branch_canvas_checks = [main for _, main, _, _ in results]
+    branches_in_repo = [branches for url, (_, _, branches, _) in zip(repo_urls, results) if url is not None]
+    branch_updates = [updates for _, _, _, updates in results]
+
+    return master_branch_canvas_checks, main_branch_canvas_checks, branches_in_repo, branch_updates
+
+
+def probe_repo_url(url: Optional[str], git_token: str) -> Tuple[bool, bool, list, Dict[str, List[str]]]:
+    """
+    Check a single repository for dot canvas, branches and branch updates.
+
+    Args:
+        url (Optional[str]): Repository URL.
+        git_token (str): Git token for authentication.
+
+    Returns:
+        Tuple[bool, bool, list, Dict[str, List[str]]]: Master and main branch
+            canvas checks, branches (False if unavailable) and branch updates.
+    """
+    # a lesson without a link is None, or NaN once it has been in a string column
+    if not isinstance(url, str):
+        return False, False, False, {False}
+
+    # Check for dot canvas in master and main branch
+    master, main = check_for_dot_canvas_branches(url, ["master", "main"])
+
+    # Retrieve branches in the repository
+    repo_name, owner = get_github_details(url)
+    branches = get_branches(owner, repo_name, git_token)
+    if branches == False:
+        return master, main, branches, {False}
+
+    # Retrieve branch updates for each branch in the repository
+    repo_branch_update_data = {}
+    for branch in branches:
+        repo_branch_update_data[branch] = get_branch_updates(owner, repo_name, branch)
+    print(f"[*] {url} complete!")
+    return master, main, branches, repo_branch_update_data
+
+
+def reprobe_changed_rows(df: pd.DataFrame, previous: pd.DataFrame, since: datetime, owner: str, git_token: str,
+                         use_graphql: bool = False,
+                         max_workers: int = 1) -> Tuple[List[bool], List[bool], List[Dict[str, List[str]]]]:
+    """
+    Re-probe only the rows that changed since a previous report and carry the
+    others forward.
+
+    A row is re-probed if its (course_number, canvas_page_id) is new, its
+    `canvas_updated_at` or `git_url` changed, or its repository was pushed
+    after `since`.
+
+    Args:
+        df (pd.DataFrame): Current course content from `get_course_content`.
+        previous (pd.DataFrame): The previous report.
+        since (datetime): When the previous report was written (timezone aware).
+        owner (str): Owner of the repository.
+        git_token (str): Git token for authentication.
+        use_graphql (bool): Probe with batched GraphQL queries.
+        max_workers (int): Repositories probed concurrently over REST.
+
+    Returns:
+        Tuple[List[bool], List[bool], List[Dict[str, List[str]]]]: Master and
+            main branch canvas checks and branch updates, aligned with `df`.
+    """
+    prior = {}
+    for row in previous.drop_duplicates(["course_number", "canvas_page_id"], keep="last").to_dict("records"):
+        prior[(row["course_number"], row["canvas_page_id"])] = row
+
+    pushed_at = {}
+
+    def pushed_since(url):
+        key = repo_key(url) or url
+        if key not in pushed_at:
+            repo_name, repo_owner = get_github_details(url)
+            pushed = get_repo_pushed_at(repo_owner, repo_name)
+            pushed_at[key] = pushed is None or pd.Timestamp(pushed) > pd.Timestamp(since)
+        return pushed_at[key]
+
+    master, main, updates, stale = [], [], [], []
+    rows = df[["course_number", "canvas_page_id", "canvas_updated_at", "git_url"]].itertuples(index=False)
+    for n, (course_number, page_id, updated_at, url) in enumerate(rows):
+        url = url if isinstance(url, str) else None
+        row = prior.get((course_number, page_id))
+        if row is not None:
+            prior_url = row["git_url"] if isinstance(row["git_url"], str) else None
+            prior_updates = row.get("git_repo_all_branches_updates")
+            unchanged = (str(row["canvas_updated_at"]) == str(updated_at) and prior_url == url
+                         and isinstance(prior_updates, str) and not (url and pushed_since(url)))
+            if unchanged:
+                master.append(bool(row["git_master_branch_dot_canvas"]))
+                main.append(bool(row["git_main_branch_dot_canvas"]))
+                updates.append(ast.literal_eval(prior_updates))
+                continue
+        stale.append(n)
+        master.append(False)
+        main.append(False)
+        updates.append({False})
+
+    print(f"[*] Re-probing {len(stale)} of {len(df)} rows")
+    if stale:
+        stale_urls = [df["git_url"].iloc[n] for n in stale]
+        stale_urls = [url if isinstance(url, str) else None for url in stale_urls]
+        new_master, new_main, _, new_updates = process_repo_urls(stale_urls, owner, git_token, use_graphql=use_graphql,
+                                                                 max_workers=max_workers)
+        for n, m, mn, u in zip(stale, new_master, new_main, new_updates):
+            master[n], main[n], updates[n] = m, mn, u
+
+    return master, main, updates
@@ -0,0 +1,189 @@
+# <--- python stuff --->
+import argparse
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+# <--- custom --->
+from src import http_helpers, metrics_helpers, mirror_helpers
+from src.client_helpers import getenv
+from src.shard_helpers import parse_shard
+
+
+# <--- course info --->
+DEFAULT_COURSES = [6933, 6679, 6680, 6681, 6682]
+
+# <--- github info --->
+DEFAULT_OWNER = "learn-co-curriculum"
+DEFAULT_REPO_NAME = "dsc-mathematical-notation"
+
+
+def shard_argument(text: str):
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def export_argument(text: str):
+    course_number, sep, path = text.partition("=")
+    if not sep or not course_number.strip().isdigit() or not path:
+        raise argparse.ArgumentTypeError(f"Invalid export '{text}', expected COURSE=PATH (e.g. 6933=export.imscc)")
+    return int(course_number), path
+
+
+def canvas_report(args: argparse.Namespace, shard=None) -> str:
+    from src.canvas_helpers import generate_canvas_report
+    return generate_canvas_report(args.courses, args.owner, args.repo_name, getenv("GITHUB_TOKEN"),
+                                  use_graphql=args.graphql, incremental=args.incremental, max_workers=args.workers,
+                                  stream=args.stream, resume=args.resume, checkpoint_every=args.checkpoint_every,
+                                  output_format=args.format, shard=shard or args.shard,
+                                  exports=dict(args.exports) if args.exports else None)
+
+
+def reading_times(args: argparse.Namespace, shard=None) -> str:
+    from src.rt_helpers import generate_reading_time_reports
+    return generate_reading_time_reports(args.input, output_format=args.format, content_store=args.content_store,
+                                         shard=shard or args.shard, max_workers=args.workers,
+                                         pipeline=args.pipeline, parse_workers=args.parse_workers,
+                                         queue_size=args.queue_size)
+
+
+def merge(args: argparse.Namespace) -> str:
+    if args.report == "canvas-report":
+        from src.canvas_helpers import merge_canvas_reports
+        return merge_canvas_reports(args.paths, output_format=args.format)
+    from src.rt_helpers import merge_reading_time_reports
+    return merge_reading_time_reports(args.paths, output_format=args.format)
+
+
+def _run_shard(command: str, args: argparse.Namespace, shard) -> str:
+    configure(args)
+    return COMMANDS[command](args, shard)
+
+
+def run_locally(command: str, args: argparse.Namespace) -> str:
+    """
+    Run every shard of a report in its own process, then merge them.
+
+    Args:
+        command (str): "canvas-report" or "reading-times".
+        args (argparse.Namespace): Parsed arguments; `args.processes` is the
+            number of shards.
+
+    Returns:
+        str: Path of the merged report.
+    """
+    count = args.processes
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=count, mp_context=context) as pool:
+        futures = [pool.submit(_run_shard, command, args, (index, count)) for index in range(1, count + 1)]
+        paths = [future.result() for future in futures]
+    return merge(argparse.Namespace(report=command, paths=paths, format=args.format))
+
+
+def configure(args: argparse.Namespace) -> None:
+    """
+    Apply the HTTP cache, mirror and metrics options shared by every command.
+    """
+    # without --no-cache, DSC_NO_CACHE still decides
+    http_helpers.configure_cache(enabled=False if args.no_cache else None, max_age=args.max_age)
+    if args.mirrors:
+        mirror_helpers.configure_mirrors(args.mirrors)
+    if args.metrics_json:
+        metrics_helpers.DEFAULT_EXPORT_PATH = args.metrics_json
+
+
+COMMANDS = {"canvas-report": canvas_report, "reading-times": reading_times}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the `dsc-report` argument parser.
+    """
+    parser = argparse.ArgumentParser(prog="dsc-report", description="Generate curriculum reports from Canvas and GitHub.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Report format; parquet requires pyarrow.")
+    common.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the on-disk HTTP response cache.")
+    common.add_argument("--max-age", type=float, default=None,
+                        help="Serve cached responses younger than this many seconds without revalidating.")
+    common.add_argument("--mirrors", default=None, metavar="DIR",
+                        help="Read repositories from the bare or mirror clones in DIR instead of GitHub "
+                             "(default: $DSC_GIT_MIRRORS).")
+    common.add_argument("--metrics-json", default=None,
+                        help="Also write the network summary to this JSON file (default: $DSC_METRICS_JSON).")
+
+    sharding = argparse.ArgumentParser(add_help=False)
+    group = sharding.add_mutually_exclusive_group()
+    group.add_argument("--shard", type=shard_argument, default=None, metavar="I/N",
+                       help="Only process the I-th of N partitions of the repositories and write a partial "
+                            "report, to combine with `dsc-report merge`.")
+    group.add_argument("--processes", type=int, default=None, metavar="N",
+                       help="Run N shards in parallel processes on this machine and merge them.")
+    sharding.add_argument("--workers", type=int, default=8, help="Repositories requested concurrently.")
+
+    canvas = commands.add_parser("canvas-report", parents=[common, sharding],
+                                 help="Report the GitHub repositories behind Canvas lessons.")
+    canvas.add_argument("--courses", type=int, nargs="+", default=DEFAULT_COURSES, help="Canvas course numbers.")
+    canvas.add_argument("--export", dest="exports", type=export_argument, action="append", metavar="COURSE=PATH",
+                        help="Read a course from its Canvas export archive (.imscc) instead of the API; "
+                             "repeat once per course, in course order (replaces --courses).")
+    canvas.add_argument("--owner", default=DEFAULT_OWNER, help="GitHub organization of the lessons.")
+    canvas.add_argument("--repo-name", default=DEFAULT_REPO_NAME)
+    canvas.add_argument("--graphql", action="store_true", help="Probe repositories with batched GraphQL queries.")
+    canvas.add_argument("--incremental", action="store_true",
+                        help="Only re-probe rows that changed since the latest report.")
+    canvas.add_argument("--stream", action="store_true", help="Write rows to a checkpointed partial report.")
+    canvas.add_argument("--resume", action="store_true", help="Resume an interrupted streamed report.")
+    canvas.add_argument("--checkpoint-every", type=int, default=50, help="Rows between checkpoints when streaming.")
+
+    reading = commands.add_parser("reading-times", parents=[common, sharding],
+                                  help="Estimate lesson reading times from a Canvas report.")
+    reading.add_argument("input", help="Canvas report, .csv or .parquet.")
+    reading.add_argument("--content-store", action="store_true",
+                         help="Keep README bodies in the content store and write only their hashes.")
+    reading.add_argument("--pipeline", action="store_true",
+                         help="Fetch, parse and write READMEs concurrently, with bounded queues between the stages.")
+    reading.add_argument("--parse-workers", type=int, default=1,
+                         help="With --pipeline, READMEs parsed concurrently (in processes when more than 1).")
+    reading.add_argument("--queue-size", type=int, default=64,
+                         help="With --pipeline, lessons held by each queue between two stages.")
+
+    merging = commands.add_parser("merge", parents=[common], help="Combine the partial reports of every shard.")
+    merging.add_argument("report", choices=list(COMMANDS), help="Kind of report the shards are.")
+    merging.add_argument("paths", nargs="+", help="One partial report per shard.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the `dsc-report` command.
+
+    Args:
+        argv (Optional[List[str]]): Arguments (default: `sys.argv[1:]`).
+
+    Returns:
+        int: Exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    configure(args)
+    try:
+        if args.command == "merge":
+            merge(args)
+        elif args.processes:
+            run_locally(args.command, args)
+        else:
+            COMMANDS[args.command](args)
+    except ValueError as e:
+        parser.exit(2, f"[!] {e}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
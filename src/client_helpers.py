@@ -0,0 +1,169 @@
+# <--- api stuff --->
+import os
+import threading
+
+# <--- python stuff --->
+import queue
+from typing import Callable, Iterable, Iterator, Optional
+
+
+# <--- canvas credentials --->
+# Override with a local stand-in, e.g. `http://127.0.0.1:8000` (see benchmarks/standins.py).
+CANVAS_INSTANCE = os.environ.get("CANVAS_INSTANCE", "https://learning.flatironschool.com")
+# largest page Canvas serves for list endpoints
+CANVAS_PER_PAGE = 100
+
+_env_loaded = False
+_canvas = None
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """
+    Load the `.env` file into the environment, the first time it is needed.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Read an environment variable, after loading `.env`.
+
+    Args:
+        name (str): Variable name, e.g. `GITHUB_TOKEN`.
+        default (Optional[str]): Value if the variable is not set.
+
+    Returns:
+        Optional[str]: The value.
+    """
+    load_env()
+    return os.environ.get(name, default)
+
+
+def get_canvas():
+    """
+    Return the shared Canvas client, building it on first use.
+
+    Requires `CANVAS_TOKEN` in the environment or `.env`.
+
+    Returns:
+        canvasapi.Canvas: The client.
+
+    Raises:
+        ValueError: If `CANVAS_TOKEN` is not set.
+    """
+    global _canvas
+    if _canvas is None:
+        with _lock:
+            if _canvas is None:
+                token = getenv("CANVAS_TOKEN")
+                if not token:
+                    raise ValueError("CANVAS_TOKEN is not set; add it to the environment or .env")
+                from canvasapi import Canvas
+                from src.metrics_helpers import instrument_session
+                _canvas = Canvas(CANVAS_INSTANCE, token)
+                # canvasapi builds its own session and takes none from the caller,
+                # so the private one is instrumented; if canvasapi moves it, Canvas
+                # requests go unmeasured (tests/test_client_helpers.py pins it)
+                requester = getattr(_canvas, "_Canvas__requester", None)
+                session = getattr(requester, "_session", None)
+                if session is not None:
+                    instrument_session(session)
+                else:
+                    print("[!] canvasapi's requester session not found; Canvas requests will not be in the metrics")
+    return _canvas
+
+
+def set_canvas(client) -> None:
+    """
+    Replace the shared Canvas client, e.g. with one for another instance.
+
+    Args:
+        client (canvasapi.Canvas): The client, or None to rebuild it on next use.
+    """
+    global _canvas
+    _canvas = client
+
+
+def canvas_headers() -> dict:
+    """
+    Authorization headers for direct Canvas API requests.
+    """
+    return {"Authorization": f"Bearer {getenv('CANVAS_TOKEN')}"}
+
+
+
+def iter_paginated(paginated: Iterable, prefetch: int = CANVAS_PER_PAGE,
+                   progress: Optional[Callable[[int], None]] = None,
+                   progress_every: int = CANVAS_PER_PAGE,
+                   cancel: Optional[threading.Event] = None) -> Iterator:
+    """
+    Walk a canvasapi `PaginatedList` once, fetching its next page in the
+    background while the caller works through the current one.
+
+    The first page is requested straight away, so several lists can be
+    started before any of them is read. Ask for large pages where the list
+    is created, e.g. `course.get_pages(per_page=CANVAS_PER_PAGE)`.
+
+    Args:
+        paginated (Iterable): The list, or any iterable that blocks on I/O.
+        prefetch (int): Items buffered ahead of the caller; one page's worth
+            lets the next request run while the current page is processed.
+        progress (Optional[Callable[[int], None]]): Called with the running
+            total every `progress_every` items, and once at the end.
+        progress_every (int): Items between progress calls.
+        cancel (Optional[threading.Event]): Stops the background fetch once
+            set, for an iterator that may be dropped before it is read.
+
+    Returns:
+        Iterator: The items, in order. Whatever fetching a page raised is
+            raised once the items before it have been read.
+    """
+    done = object()
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        # give up once the caller has stopped reading
+        while not stop.is_set() and not (cancel is not None and cancel.is_set()):
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fetch():
+        try:
+            for item in paginated:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+
+    def drain():
+        count, reported = 0, None
+        try:
+            while True:
+                item, error = buffer.get()
+                if item is done:
+                    if error is not None:
+                        raise error
+                    break
+                count += 1
+                if progress is not None and count % progress_every == 0:
+                    progress(count)
+                    reported = count
+                yield item
+        finally:
+            stop.set()
+        if progress is not None and count != reported:
+            progress(count)
+
+    threading.Thread(target=fetch, daemon=True).start()
+    return drain()
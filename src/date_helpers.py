@@ -0,0 +1,29 @@
+# <--- python stuff --->
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+
+# GitHub's REST API writes every date in UTC, e.g. "2024-01-01T00:00:00Z"
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def iso_utc(value: Union[int, float, str, None]) -> Optional[str]:
+    """
+    Format a date the way GitHub's REST API does.
+
+    Args:
+        value (Union[int, float, str, None]): Unix timestamp, or ISO 8601
+            date with any UTC offset (e.g. a GraphQL `GitTimestamp`).
+
+    Returns:
+        Optional[str]: The date in UTC as `ISO_FORMAT`, or None for None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+    else:
+        stamp = datetime.fromtimestamp(value, timezone.utc)
+    return stamp.astimezone(timezone.utc).strftime(ISO_FORMAT)
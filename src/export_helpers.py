@@ -0,0 +1,164 @@
+# <--- text processing stuff --->
+import io
+import xml.etree.ElementTree as ET
+
+# <--- python stuff --->
+import posixpath
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# <--- custom --->
+from src.link_helpers import CHUNK_SIZE, GITHUB_PREFIX, FirstAnchorParser
+
+
+MANIFEST = "imsmanifest.xml"
+ASSIGNMENT_GROUPS = "course_settings/assignment_groups.xml"
+ASSIGNMENT_SETTINGS = "assignment_settings.xml"
+WIKI_DIR = "wiki_content/"
+
+
+class ExportItemParser(FirstAnchorParser):
+    """
+    Read the `<title>` of an exported page or assignment and the first
+    anchor of its body, stopping there.
+
+    Canvas exports every item as `<html><head>...<title>...</title></head>
+    <body>{the item's body}</body></html>`, and the head holds no anchors,
+    so the first anchor is the first anchor of the body.
+    """
+
+    def reset(self):
+        super().reset()
+        self.title = ""
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        self._in_title = tag == "title"
+        super().handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+
+def _local(tag: str) -> str:
+    # tag name without its XML namespace
+    return tag.rsplit("}", 1)[-1]
+
+
+def _children(element: ET.Element) -> Dict[str, str]:
+    return {_local(child.tag): (child.text or "").strip() for child in element}
+
+
+def _chunks(archive: zipfile.ZipFile, name: str) -> Iterator[str]:
+    with archive.open(name) as raw, io.TextIOWrapper(raw, encoding="utf-8", errors="replace") as text:
+        while True:
+            chunk = text.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def read_item(archive: zipfile.ZipFile, name: str, parser: Optional[ExportItemParser] = None) -> Tuple[str, Optional[str]]:
+    """
+    Read an exported page or assignment straight from the archive, up to
+    the first anchor of its body.
+
+    Args:
+        archive (zipfile.ZipFile): The course export.
+        name (str): The item's HTML file in the archive.
+        parser (ExportItemParser): Parser to reuse.
+
+    Returns:
+        Tuple[str, Optional[str]]: The title, and the first anchor's `href`
+            if it points to GitHub (as `link_helpers.first_github_link`).
+    """
+    parser = parser or ExportItemParser()
+    href = parser.first_href_chunks(_chunks(archive, name))
+    return parser.title.strip(), href if href is not None and href.startswith(GITHUB_PREFIX) else None
+
+
+def _resources(archive: zipfile.ZipFile) -> List[Tuple[Optional[str], List[str]]]:
+    # (href, files) of every resource in the manifest, in manifest order
+    try:
+        with archive.open(MANIFEST) as f:
+            manifest = ET.parse(f).getroot()
+    except KeyError:
+        raise ValueError(f"'{archive.filename}' is not a Canvas course export (no {MANIFEST})")
+    resources = []
+    for element in manifest.iter():
+        if _local(element.tag) == "resource":
+            files = [file.get("href") for file in element if _local(file.tag) == "file" and file.get("href")]
+            resources.append((element.get("href"), files))
+    return resources
+
+
+def _group_positions(archive: zipfile.ZipFile) -> Dict[str, int]:
+    try:
+        with archive.open(ASSIGNMENT_GROUPS) as f:
+            groups = ET.parse(f).getroot()
+    except KeyError:
+        # an export of a course without assignments may have no groups
+        return {}
+    positions = {}
+    for group in groups:
+        fields = _children(group)
+        positions[group.get("identifier")] = int(fields.get("position") or 0)
+    return positions
+
+
+def read_course_export(source) -> Tuple[List[dict], List[dict]]:
+    """
+    Read the pages and assignments of a Canvas course export (an IMS Common
+    Cartridge `.imscc` or `.zip`), one archive member at a time and without
+    extracting anything to disk.
+
+    Pages come in title order and assignments in assignment group, then
+    assignment, position order, the orders the Canvas API lists them in.
+
+    Args:
+        source: Path or binary file object of the export.
+
+    Returns:
+        Tuple[List[dict], List[dict]]: Pages, with `url` (the page's slug),
+            `title` and `git_url`; and assignments, with `title` and `git_url`.
+
+    Raises:
+        ValueError: If the file is not a Canvas course export.
+    """
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"'{source}' is not a Canvas course export ({e})")
+
+    with archive:
+        parser = ExportItemParser()
+        group_positions = _group_positions(archive)
+        pages, assignments = [], []
+        for href, files in _resources(archive):
+            settings = [name for name in files if posixpath.basename(name) == ASSIGNMENT_SETTINGS]
+            if href and href.startswith(WIKI_DIR) and href.endswith(".html"):
+                title, git_url = read_item(archive, href, parser)
+                pages.append({"url": posixpath.basename(href)[:-len(".html")], "title": title, "git_url": git_url})
+            elif settings:
+                html = href if href and href.endswith(".html") else next(
+                    (name for name in files if name.endswith(".html")), None)
+                with archive.open(settings[0]) as f:
+                    fields = _children(ET.parse(f).getroot())
+                git_url = read_item(archive, html, parser)[1] if html else None
+                assignments.append({
+                    "title": fields.get("title", ""),
+                    "git_url": git_url,
+                    "order": (group_positions.get(fields.get("assignment_group_identifierref"), 0),
+                              int(fields.get("position") or 0)),
+                })
+
+    pages.sort(key=lambda page: page["title"].casefold())
+    assignments.sort(key=lambda assignment: assignment["order"])
+    for assignment in assignments:
+        del assignment["order"]
+    return pages, assignments
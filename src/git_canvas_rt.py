@@ -1,23 +1,21 @@
-# api stuff
-import os
-import requests
-
-from dotenv import load_dotenv
-load_dotenv()
-
-from canvasapi import Canvas
 # canvas_api_key = os.environ.get('CANVAS_TOKEN')
 # canvas_instance = "https://learning.flatironschool.com"
 # canvas = Canvas(canvas_instance, canvas_api_key)
 
 # text processing stuff
 import re
-import markdown
-import markdown2
-from bs4 import BeautifulSoup
 
 import pandas as pd
 
+# custom
+from src import http_helpers, mirror_helpers
+from src.client_helpers import CANVAS_PER_PAGE, get_canvas
+from src.link_helpers import first_github_link
+from src.git_helpers import read_mirror_readme
+from src.readme_helpers import candidate_branches, get_resolver, readme_url
+from src.render_helpers import render_markdown, with_markdown_column
+from src.reading_helpers import WORDS_PER_MINUTE, reading_stats_frame
+
 # language model stuff
 # import spacy
 # from spacy.pipeline import EntityRuler
@@ -29,6 +27,7 @@ import pandas as pd
 # HTML Functions
 def process_html(html: str)->(str):
     "Helper function to process HTML for quick text-extraction with BS4."
+    from bs4 import BeautifulSoup
     text = str(''.join(BeautifulSoup(html, "html.parser").findAll(text=True)))
     text = re.sub("\n\n", " ", text)
     text = re.sub("\n", " ", text)
@@ -37,7 +36,7 @@ def process_html(html: str)->(str):
     return text
 
 
-def convert_lesson_text(readme_content:str)->(str, str):
+def convert_lesson_text(readme_content:str, store=None)->(str, str):
     """
     Orchestrates conversion of lesson text into three types:
         - `html` -> (markdown) 
@@ -46,13 +45,18 @@ def convert_lesson_text(readme_content:str)->(str, str):
 
     Input:
     readme_content (str): raw HTML string of lesson README page
+    store (ContentStore): if given, `readme_content` is the content hash
+        of the README in this store
 
     Output:
     html (str): 
     text (str):
     doc (Doc): 
     """
-    markdown2_text = markdown2.markdown(readme_content)
+    if store is not None:
+        # `readme_content` is a content hash; read the README from the store
+        readme_content = store.read_text(readme_content)
+    markdown2_text = render_markdown(readme_content)
     plain_text = process_html(markdown2_text)
     return markdown2_text, plain_text
 
@@ -71,14 +75,10 @@ def extract_github_details(repo_link:str)->(str, str):
 
 def get_repo_link(html: str)->(str):
     "Helper function to process HTML for quick text-extraction with BS4."
-    if html != None and len(html) > 0:
-        soup = BeautifulSoup(html, features='html.parser')
-        links = [node.get('href') for node in soup.find_all("a")]
-        if len(links) > 0 and str(links[0]).startswith('https://github.com/'):
-            print(links[0])
-            return links[0]
-        else:
-            return False
+    link = first_github_link(html)
+    if link is not None:
+        print(link)
+        return link
     else:
         return False
 
@@ -96,45 +96,24 @@ def get_github_readme(github_username:str, github_repo:str)->(str):
     Output:
     html_content (str): Contents of README.md, converted to HMTL
     """
-    # get content of README file
-    github_readme_url = f"https://raw.githubusercontent.com/learn-co-curriculum/{github_repo}/master/README.md"
-    print(github_readme_url)
-    git_resp = requests.get(github_readme_url)
-    
-    # 
-    if git_resp != 200:
-        github_readme_url = f"https://raw.githubusercontent.com/learn-co-curriculum/{github_repo}/main/README.md"
-        print(github_readme_url)
-        git_resp = requests.get(github_readme_url)
-        html_content = git_resp.text
-        # convert the GitHub README file content to HTML
-        markdown_content = markdown2.markdown(html_content)
-        return git_resp, html_content, markdown_content
-
+    # get content of README file, from master or else main
+    if mirror_helpers.enabled():
+        default_branch = mirror_helpers.get_default_branch(github_username, github_repo)
+        branch, git_resp = read_mirror_readme(github_username, github_repo,
+                                              candidate_branches(["master", "main"], default_branch))
     else:
-        html_content = git_resp.text
-        # convert the GitHub README file content to HTML
-        markdown_content = markdown2.markdown(html_content)
-        return git_resp, html_content, markdown_content
+        resolver = get_resolver()
+        branch, git_resp = resolver.resolve(github_username, github_repo, preference=["master", "main"])
+        # keep the winning branch for the next run (only written when it is new)
+        resolver.save()
+    print(git_resp.url)
+    html_content = git_resp.text
+    # convert the GitHub README file content to HTML
+    markdown_content = render_markdown(html_content)
+    return git_resp, html_content, markdown_content
 
 
 ## Canvas Functions
-def get_canvas():
-    """
-    Helper function to quickly connect to Canvas API.
-    Requires that .env file is configured with `CANVAS_TOKEN`.
-    
-    output:
-    canvas (Canvas): canvas instance
-    """
-    import os
-    from canvasapi import Canvas
-    canvas_api_key = os.environ.get('CANVAS_TOKEN')
-    canvas_instance = "https://learning.flatironschool.com"
-    canvas = Canvas(canvas_instance, canvas_api_key)
-    return canvas
-
-
 def get_lesson_links(course_number:int)->(list):
     """
     Helper function to quickly connect to Canvas API 
@@ -149,20 +128,19 @@ def get_lesson_links(course_number:int)->(list):
     """
     canvas = get_canvas()
     course = canvas.get_course(course_number)
-    pages = course.get_pages()
+    pages = course.get_pages(per_page=CANVAS_PER_PAGE)
     links = []
     for p in pages:
         links += [p.url]
     return links
 
 
-def build_github_assignment_df(links):   
-    # create dataframe from the lists
+def build_github_assignment_df(links, markdown=False):   
+    # create dataframe from the lists; README rendering only on request (`markdown=True`)
     columns = ["git_repo_link"]
     assignment_data = pd.DataFrame(links, columns=columns)
     
     html_content = []
-    markdown_content = []
     for url in links:
         if type(url) == str:
 #             url = url.replace("https://github.com/learn-co-curriculum/", "")
@@ -171,45 +149,39 @@ def build_github_assignment_df(links):
 
             github_repo, github_username = extract_github_details(url)
 #             github_solution_url = f"https://raw.githubusercontent.com/{github_username}/{github_repo}/solution/README.md"
-            github_curriculum_url = f"https://raw.githubusercontent.com/{github_username}/{github_repo}/curriculum/README.md"
+            github_curriculum_url = readme_url(github_username, github_repo, "curriculum")
             
 #             git_resp = requests.get(github_solution_url)
 #             html_content += [git_resp.text]
 #             markdown_content += [markdown2.markdown(git_resp.text)]
             
-            git_resp = requests.get(github_curriculum_url)
+            if mirror_helpers.enabled():
+                _, git_resp = read_mirror_readme(github_username, github_repo, ["curriculum"])
+            else:
+                git_resp = http_helpers.get(github_curriculum_url)
             html_content += [git_resp.text]
-            markdown_content += [markdown2.markdown(git_resp.text)]
             
         else:
             html_content += [False]
-            markdown_content += [False]
         
     assignment_data["html_content"] = html_content
-    assignment_data["markdown_content"] = markdown_content
+    if markdown:
+        assignment_data = with_markdown_column(assignment_data)
 
     return assignment_data
 
 
 def get_assignment_reading_times(assignment_data:pd.DataFrame)->(pd.DataFrame):
-    assignment_data["soup_raw_text"] = assignment_data["html_content"].apply(
-                                        lambda x: BeautifulSoup(x, 'html.parser') if x != False else False)
-    assignment_data["raw_text_blocks"] = assignment_data["soup_raw_text"].apply(
-                                        lambda x: list(x.find_all(string=True)) if x != False else False)
-    assignment_data["adjusted_blocks"] = assignment_data["raw_text_blocks"].apply(
-                                        lambda x: sum([len(n.split(" ")) for n in x]) if x != False else False)
-    assignment_data["assignment_word_reading_times"] = assignment_data["adjusted_blocks"].apply(
-                                                lambda x: round((x/200), 0) if x != False else False)
-    assignment_data["soup_raw_python"] = assignment_data["html_content"].apply(lambda x: list(re.findall('```python.*\n.*', x)) if x != False else False)
-    assignment_data["python_blocks_count"] = assignment_data["soup_raw_python"].apply(lambda x: len(x) if x != False else False)
-    assignment_data["python_words_per_block"] = assignment_data["soup_raw_python"].apply(
-                                        lambda x: [len(n.split(" ")) for n in x] if x != False else False)
-    assignment_data["python_total_words"] = assignment_data["python_words_per_block"].apply(
-                                        lambda x: sum(x) if x != False else False)
-    assignment_data["total_python_reading_times"] = assignment_data["python_total_words"].apply(lambda x: round(x*2/200, 0) + 5)
+    "Adds word/python block counts and reading times as nullable numeric columns."
+    stats = reading_stats_frame(assignment_data["html_content"])
+    assignment_data["adjusted_blocks"] = stats["text_words"]
+    assignment_data["assignment_word_reading_times"] = (stats["text_words"] / WORDS_PER_MINUTE).round(0)
+    assignment_data["python_blocks_count"] = stats["python_blocks"]
+    assignment_data["python_total_words"] = stats["python_words"]
+    assignment_data["total_python_reading_times"] = (stats["python_words"] * 2 / WORDS_PER_MINUTE).round(0) + 5
 
     assignment_data["total_text_reading_times"] = assignment_data["assignment_word_reading_times"] + assignment_data["total_python_reading_times"]
 
-    assignment_data.loc[assignment_data["python_blocks_count"] == 0, "total_text_reading_times"] = assignment_data["total_text_reading_times"] - 5
+    assignment_data.loc[(assignment_data["python_blocks_count"] == 0).fillna(False), "total_text_reading_times"] = assignment_data["total_text_reading_times"] - 5
 
     return assignment_data
@@ -1,20 +1,122 @@
 # <--- api stuff --->
-import os
 import requests
-from dotenv import load_dotenv
-load_dotenv()
 
 # <--- text processing stuff --->
 import re
-import markdown
-import markdown2
-from bs4 import BeautifulSoup
-
-# <--- data stuff --->
-import pandas as pd
 
 # <--- python stuff --->
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# <--- custom --->
+from src import http_helpers, mirror_helpers
+from src.client_helpers import getenv
+from src.link_helpers import first_github_link
+from src.render_helpers import render_markdown
+
+
+# Override with local stand-ins, e.g. `http://127.0.0.1:8001` (see benchmarks/standins.py).
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+GITHUB_RAW_URL = os.environ.get("GITHUB_RAW_URL", "https://raw.githubusercontent.com")
+# GitHub lists 30 branches per page unless asked for up to 100
+BRANCHES_PER_PAGE = 100
+
+GITHUB_REPO_PATTERN = re.compile(r"^(?:https?://|git@)?(?:www\.)?github\.com[/:]([^/\s?#]+)/([^/\s?#]+)", re.IGNORECASE)
+
+
+def parse_repo_key(repo_link: str) -> Optional[Tuple[str, str]]:
+    """
+    Parse the owner and repository name out of any GitHub link to a repository.
+
+    Handles `/blob/...` and `/tree/...` paths, trailing slashes, `.git`
+    suffixes, query strings, fragments and `git@github.com:` remotes.
+
+    Args:
+        repo_link (str): GitHub repository link.
+
+    Returns:
+        Optional[Tuple[str, str]]: (owner, repo_name) as written in the link,
+            or `None` if the link does not point into a repository.
+    """
+    match = GITHUB_REPO_PATTERN.match(repo_link.strip())
+    if match is None:
+        return None
+    owner, repo_name = match.groups()
+    if repo_name.lower().endswith(".git"):
+        repo_name = repo_name[:-4]
+    return owner, repo_name
+
+
+def repo_key(repo_link: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Canonical key for a repository: (owner, repo_name) lowercased, since
+    GitHub treats both case-insensitively.
+
+    Args:
+        repo_link (Optional[str]): GitHub repository link.
+
+    Returns:
+        Optional[Tuple[str, str]]: The key, or `None` if `repo_link` is not a
+            repository link.
+    """
+    if not isinstance(repo_link, str):
+        return None
+    parsed = parse_repo_key(repo_link)
+    return (parsed[0].lower(), parsed[1].lower()) if parsed else None
+
+
+def canonical_repo_url(repo_link: Optional[str]) -> Optional[str]:
+    """
+    Rewrite a link into a repository as `https://github.com/{owner}/{repo}`.
+
+    Args:
+        repo_link (Optional[str]): GitHub repository link.
+
+    Returns:
+        Optional[str]: The canonical URL, or `None` if `repo_link` is not a
+            repository link.
+    """
+    parsed = parse_repo_key(repo_link) if isinstance(repo_link, str) else None
+    return f"https://github.com/{parsed[0]}/{parsed[1]}" if parsed else None
+
+
+def fan_out(repo_links: List[Optional[str]], probe: Callable, max_workers: int = 1) -> list:
+    """
+    Run a repository-level probe once per unique repository and fan the
+    results back out to every link.
+
+    The probe receives the canonical `https://github.com/{owner}/{repo}` URL
+    of each repository. Links that are not repository links are passed to
+    the probe unchanged, one call per link.
+
+    Args:
+        repo_links (List[Optional[str]]): Repository links, possibly repeated.
+        probe (Callable): Function of a single URL.
+        max_workers (int): Unique repositories probed concurrently.
+
+    Returns:
+        list: Probe results aligned with `repo_links`.
+    """
+    repo_links = list(repo_links)
+    keys = [repo_key(link) for link in repo_links]
+
+    unique: Dict[Tuple[str, str], str] = {}
+    for link, key in zip(repo_links, keys):
+        if key is not None and key not in unique:
+            unique[key] = canonical_repo_url(link)
+    others = [n for n, key in enumerate(keys) if key is None]
+
+    calls = list(unique.values()) + [repo_links[n] for n in others]
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(probe, calls))
+    else:
+        results = [probe(url) for url in calls]
+
+    by_key = dict(zip(unique, results))
+    by_row = dict(zip(others, results[len(unique):]))
+    return [by_key[key] if key is not None else by_row[n] for n, key in enumerate(keys)]
 
 
 def get_github_details(repo_link: str) -> tuple[str, str]:
@@ -27,6 +129,10 @@ def get_github_details(repo_link: str) -> tuple[str, str]:
     Returns:
         tuple[str, str]: Tuple containing the repository name and username/owner.
     """
+    parsed = parse_repo_key(repo_link)
+    if parsed is not None:
+        owner, repo_name = parsed
+        return repo_name, owner
     user = repo_link.replace("https://github.com/", "")
     owner = re.sub("/.*$", "", user)
     repo_name = re.sub(".*/", "", repo_link)
@@ -35,7 +141,8 @@ def get_github_details(repo_link: str) -> tuple[str, str]:
 
 def get_branches(owner: str, repo: str, token: str) -> list:
     """
-    Get a list of all branches in a repository.
+    Get a list of all branches in a repository, following GitHub's
+    pagination.
 
     Args:
         owner (str): Owner of the repository or organization.
@@ -45,18 +152,22 @@ def get_branches(owner: str, repo: str, token: str) -> list:
     Returns:
         list: List of branch names.
     """
+    if mirror_helpers.enabled():
+        return mirror_helpers.get_branches(owner, repo)
     headers = {
         'Authorization': f'Token {token}',
         'Accept': 'application/vnd.github.v3+json'
     }
-    url = f'https://api.github.com/repos/{owner}/{repo}/branches'
-    response = requests.get(url, headers=headers)
-#     response.raise_for_status()
-    results = response.json()
-    if response != 200:
-        return False
-    else:
-        return [branch["name"] for branch in results]
+    url = f'{GITHUB_API_URL}/repos/{owner}/{repo}/branches?per_page={BRANCHES_PER_PAGE}'
+    branches = []
+    while url:
+        response = http_helpers.get(url, headers=headers)
+#         response.raise_for_status()
+        if response.status_code != 200:
+            return False
+        branches += [branch["name"] for branch in response.json()]
+        url = response.links.get("next", {}).get("url")
+    return branches
 
 
 def get_github_readme(owner:str, repo_name:str, branch:str)->(str):
@@ -72,15 +183,38 @@ def get_github_readme(owner:str, repo_name:str, branch:str)->(str):
     Output:
     html_content (str): Contents of README.md, converted to HMTL
     """
-    repo_url = f"{github_user}/{repo_name}/{branch}"
-    readme_url = f"https://raw.githubusercontent.com/{repo_url}/README.md"
-    print(readme_url)
-    git_resp = requests.get(readme_url)
+    if mirror_helpers.enabled():
+        _, git_resp = read_mirror_readme(owner, repo_name, [branch])
+    else:
+        git_resp = http_helpers.get(f"{GITHUB_RAW_URL}/{owner}/{repo_name}/{branch}/README.md")
     html_content = git_resp.text
-    markdown_content = markdown2.markdown(html_content)
+    markdown_content = render_markdown(html_content)
     return git_resp, html_content, markdown_content
 
 
+def read_mirror_readme(owner: str, repo_name: str, branches: Sequence[str]) -> Tuple[Optional[str], requests.Response]:
+    """
+    Read a README from the local mirror of a repository, answered like
+    raw.githubusercontent.com would for callers that expect a response.
+
+    Args:
+        owner (str): The owner of the GitHub repository.
+        repo_name (str): The name of the GitHub repository.
+        branches (Sequence[str]): Branches in order of preference.
+
+    Returns:
+        Tuple[Optional[str], requests.Response]: The first branch with a
+            README and a 200 response holding it, or `None` and a 404.
+    """
+    branch, text = mirror_helpers.read_first(owner, repo_name, branches, "README.md")
+    response = requests.Response()
+    response.url = f"{GITHUB_RAW_URL}/{owner}/{repo_name}/{branch or branches[-1]}/README.md"
+    response.status_code = 200 if branch is not None else 404
+    response._content = (text if branch is not None else "404: Not Found").encode("utf-8")
+    response.encoding = "utf-8"
+    return branch, response
+
+
 def get_git_repo_url(html: str) -> Optional[str]:
     """
     Retrieve the first url that starts with a specified string from the HTML content.
@@ -91,18 +225,7 @@ def get_git_repo_url(html: str) -> Optional[str]:
     Returns:
         Optional[str]: The first URL that starts with `https://github.com/`, or `None` if not found.
     """
-    if html is not None and len(html) > 0:
-        soup = BeautifulSoup(html, features="html.parser")
-        urls = [node.get("href") for node in soup.find_all("a")]
-        if len(urls) > 0 and str(urls[0]).startswith("https://github.com/"):
-            print(urls[0])
-            return urls[0]
-        else:
-            return None
-    else:
-        return None
-
-import requests
+    return first_github_link(html)
 
 
 def check_for_dot_canvas(repo_url: str, branch: str) -> bool:
@@ -116,15 +239,27 @@ def check_for_dot_canvas(repo_url: str, branch: str) -> bool:
     Returns:
         bool: True if the `.canvas` file is found, False otherwise.
     """
+    return check_for_dot_canvas_branches(repo_url, [branch])[0]
+
+
+def check_for_dot_canvas_branches(repo_url: str, branches: Sequence[str]) -> List[bool]:
+    """
+    Check several branches of a repository for a `.canvas` file, with one
+    lookup for all of them when reading from local mirrors.
+
+    Args:
+        repo_url (str): The URL of the repository.
+        branches (Sequence[str]): The branch names.
+
+    Returns:
+        List[bool]: Whether each branch has the `.canvas` file.
+    """
     repo_name, owner = get_github_details(repo_url)
+    if mirror_helpers.enabled():
+        return mirror_helpers.has_file(owner, repo_name, branches, ".canvas")
     repository = f"{owner}/{repo_name}"
-    branch_url = f"https://api.github.com/repos/{repository}/branches/{branch}"
-    dot_canvas_url = f"https://raw.githubusercontent.com/{repository}/{branch}/.canvas"
-    response = requests.get(dot_canvas_url)
-    if response.status_code == 200:
-        return True
-    else:
-        return False
+    return [http_helpers.get(f"{GITHUB_RAW_URL}/{repository}/{branch}/.canvas").status_code == 200
+            for branch in branches]
 
     
 def get_branch_updates(owner: str, repo_name: str, branch: str) -> str:
@@ -140,15 +275,22 @@ def get_branch_updates(owner: str, repo_name: str, branch: str) -> str:
         str: The last commit date for the specified branch in ISO 8601 format.
 
     Raises:
-        requests.exceptions.RequestException: If an error occurs while making the API request.
+        requests.exceptions.RequestException: If an error occurs while making the API request,
+            or with local mirrors, if the branch is not mirrored.
     """
-    url = f"https://api.github.com/repos/{owner}/{repo_name}"
+    if mirror_helpers.enabled():
+        last_commit_date = mirror_helpers.get_branch_updates(owner, repo_name, branch)
+        if last_commit_date is None:
+            raise requests.exceptions.RequestException(f"No mirror of branch '{branch}' of {owner}/{repo_name}")
+        return last_commit_date
+
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}"
     branch_url = f"{url}/branches/{branch}"
-    token = os.environ.get("GITHUB_TOKEN")
+    token = getenv("GITHUB_TOKEN")
     headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        response = requests.get(branch_url, headers=headers)
+        response = http_helpers.get(branch_url, headers=headers)
         response.raise_for_status()
 
         branch_data = response.json()
@@ -157,4 +299,50 @@ def get_branch_updates(owner: str, repo_name: str, branch: str) -> str:
         return last_commit_date
 
     except requests.exceptions.RequestException as e:
-        raise requests.exceptions.RequestException(f"Error occurred during API request: {e}")
\ No newline at end of file
+        raise requests.exceptions.RequestException(f"Error occurred during API request: {e}")
+
+def _get_repo(owner: str, repo_name: str) -> Optional[dict]:
+    # `GET /repos/{owner}/{repo}`, or None if the repository could not be read
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}"
+    token = getenv("GITHUB_TOKEN")
+    headers = {"Authorization": f"Bearer {token}"}
+    response = http_helpers.get(url, headers=headers)
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def get_default_branch(owner: str, repo_name: str) -> Optional[str]:
+    """
+    Retrieve the default branch of a GitHub repository.
+
+    Args:
+        owner (str): The owner of the GitHub repository.
+        repo_name (str): The name of the GitHub repository.
+
+    Returns:
+        Optional[str]: The branch name, or `None` if the repository could
+            not be read.
+    """
+    if mirror_helpers.enabled():
+        return mirror_helpers.get_default_branch(owner, repo_name)
+    repo = _get_repo(owner, repo_name)
+    return repo.get("default_branch") if repo is not None else None
+
+
+def get_repo_pushed_at(owner: str, repo_name: str) -> Optional[str]:
+    """
+    Retrieve the time of the most recent push to any branch of a GitHub repository.
+
+    Args:
+        owner (str): The owner of the GitHub repository.
+        repo_name (str): The name of the GitHub repository.
+
+    Returns:
+        Optional[str]: The `pushed_at` timestamp in ISO 8601 format, or `None`
+            if the repository could not be read.
+    """
+    if mirror_helpers.enabled():
+        return mirror_helpers.get_repo_pushed_at(owner, repo_name)
+    repo = _get_repo(owner, repo_name)
+    return repo.get("pushed_at") if repo is not None else None
@@ -0,0 +1,205 @@
+# <--- api stuff --->
+import os
+import requests
+
+# <--- python stuff --->
+from typing import Dict, List, Optional, Tuple
+
+# <--- custom --->
+from src import http_helpers
+from src.date_helpers import iso_utc
+from src.git_helpers import get_github_details
+
+
+# <--- github graphql --->
+# Override with a local stand-in endpoint, e.g. `http://127.0.0.1:8000/graphql`.
+GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+REFS_PAGE_SIZE = 100
+
+REFS_FIELDS = """
+    nodes { name target { ... on Commit { author { date } } } }
+    pageInfo { hasNextPage endCursor }
+"""
+
+REPO_FIELDS = f"""
+    refs(refPrefix: "refs/heads/", first: {REFS_PAGE_SIZE}) {{ {REFS_FIELDS} }}
+    master: object(expression: "master:.canvas") {{ __typename }}
+    main: object(expression: "main:.canvas") {{ __typename }}
+"""
+
+
+def build_probe_query(repos: List[Tuple[str, str]]) -> Tuple[str, Dict[str, str]]:
+    """
+    Build one GraphQL query that probes several repositories at once.
+
+    Each repository gets an aliased `repository` field (`r0`, `r1`, ...)
+    asking for its branches, each branch head's author date, and whether
+    `.canvas` exists on `master` and `main`.
+
+    Args:
+        repos (List[Tuple[str, str]]): (owner, repo_name) pairs.
+
+    Returns:
+        Tuple[str, Dict[str, str]]: The query and its variables.
+    """
+    params, fields, variables = [], [], {}
+    for n, (owner, repo_name) in enumerate(repos):
+        params.append(f"$o{n}: String!, $n{n}: String!")
+        fields.append(f"r{n}: repository(owner: $o{n}, name: $n{n}) {{ {REPO_FIELDS} }}")
+        variables[f"o{n}"] = owner
+        variables[f"n{n}"] = repo_name
+    query = f"query ({', '.join(params)}) {{ {' '.join(fields)} }}"
+    return query, variables
+
+
+def run_query(query: str, variables: dict, token: str, endpoint: Optional[str] = None) -> dict:
+    """
+    POST a GraphQL query and return its `data` object.
+
+    Per-field errors (e.g. a repository that does not exist) come back as
+    `null` entries in `data` and are left for the caller to handle.
+
+    Args:
+        query (str): GraphQL query.
+        variables (dict): Query variables.
+        token (str): GitHub personal access token.
+        endpoint (str): GraphQL endpoint, defaults to `GRAPHQL_URL`.
+
+    Returns:
+        dict: The `data` object of the response.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or the
+            response carries no data.
+    """
+    headers = {"Authorization": f"bearer {token}"}
+    try:
+        response = http_helpers.post(endpoint or GRAPHQL_URL, json={"query": query, "variables": variables},
+                                     headers=headers)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise requests.exceptions.RequestException(f"Error occurred during API request: {e}")
+
+    payload = response.json()
+    if payload.get("data") is None:
+        raise requests.exceptions.RequestException(f"GraphQL query failed: {payload.get('errors')}")
+    return payload["data"]
+
+
+def _more_refs(owner: str, repo_name: str, cursor: str, token: str, endpoint: Optional[str]) -> List[dict]:
+    """
+    Page through the remaining branches of a repository with more than
+    `REFS_PAGE_SIZE` branches.
+    """
+    query = f"""query ($owner: String!, $name: String!, $after: String!) {{
+        repository(owner: $owner, name: $name) {{
+            refs(refPrefix: "refs/heads/", first: {REFS_PAGE_SIZE}, after: $after) {{ {REFS_FIELDS} }}
+        }}
+    }}"""
+    nodes = []
+    while cursor:
+        variables = {"owner": owner, "name": repo_name, "after": cursor}
+        refs = run_query(query, variables, token, endpoint)["repository"]["refs"]
+        nodes += refs["nodes"]
+        cursor = refs["pageInfo"]["endCursor"] if refs["pageInfo"]["hasNextPage"] else None
+    return nodes
+
+
+def probe_repos(repos: List[Tuple[str, str]], token: str, batch_size: int = 25,
+                endpoint: Optional[str] = None) -> Dict[Tuple[str, str], dict]:
+    """
+    Probe repositories in batches of `batch_size` per GraphQL request.
+
+    Args:
+        repos (List[Tuple[str, str]]): (owner, repo_name) pairs.
+        token (str): GitHub personal access token.
+        batch_size (int): Repositories per request.
+        endpoint (str): GraphQL endpoint, defaults to `GRAPHQL_URL`.
+
+    Returns:
+        Dict[Tuple[str, str], dict]: For each lowercased (owner, repo_name), a dict with
+            `master` and `main` (`.canvas` present), `branches` (list of
+            names, or False if the repository could not be read) and
+            `updates` (branch name -> last commit date, in UTC as REST gives it).
+    """
+    # GitHub names are case-insensitive, so probe each repository once
+    unique = list({(owner.lower(), repo_name.lower()): (owner, repo_name) for owner, repo_name in repos}.values())
+    results = {}
+    for start in range(0, len(unique), batch_size):
+        batch = unique[start:start + batch_size]
+        query, variables = build_probe_query(batch)
+        data = run_query(query, variables, token, endpoint)
+
+        for n, (owner, repo_name) in enumerate(batch):
+            key = (owner.lower(), repo_name.lower())
+            repo = data.get(f"r{n}")
+            if repo is None:
+                results[key] = {"master": False, "main": False, "branches": False, "updates": {}}
+                continue
+
+            nodes = repo["refs"]["nodes"]
+            if repo["refs"]["pageInfo"]["hasNextPage"]:
+                nodes += _more_refs(owner, repo_name, repo["refs"]["pageInfo"]["endCursor"], token, endpoint)
+
+            updates = {}
+            for node in nodes:
+                author = (node.get("target") or {}).get("author") or {}
+                # a GitTimestamp keeps the author's UTC offset; REST reports UTC
+                updates[node["name"]] = iso_utc(author.get("date"))
+
+            results[key] = {
+                "master": repo["master"] is not None,
+                "main": repo["main"] is not None,
+                "branches": [node["name"] for node in nodes],
+                "updates": updates,
+            }
+    return results
+
+
+def graphql_process_repo_urls(repo_urls: List[Optional[str]], git_token: str, batch_size: int = 25,
+                              endpoint: Optional[str] = None) -> Tuple[List[bool], List[bool], List[List[str]], List[Dict[str, List[str]]]]:
+    """
+    GraphQL counterpart of `canvas_helpers.process_repo_urls`.
+
+    Args:
+        repo_urls (List[Optional[str]]): List of repository URLs.
+        git_token (str): GitHub personal access token.
+        batch_size (int): Repositories per GraphQL request.
+        endpoint (str): GraphQL endpoint, defaults to `GRAPHQL_URL`.
+
+    Returns:
+        Tuple[List[bool], List[bool], List[List[str]], List[Dict[str, List[str]]]]:
+            The same master/main/branches/updates lists as `process_repo_urls`.
+    """
+    # a lesson without a link is None, or NaN once it has been in a string column
+    repo_urls = [url if isinstance(url, str) else None for url in repo_urls]
+    keys = []
+    for url in repo_urls:
+        if url is not None:
+            repo_name, owner = get_github_details(url)
+            keys.append((owner, repo_name))
+        else:
+            keys.append(None)
+
+    probes = probe_repos([key for key in keys if key is not None], git_token, batch_size, endpoint)
+    keys = [(key[0].lower(), key[1].lower()) if key is not None else None for key in keys]
+
+    master, main, branches, updates = [], [], [], []
+    for url, key in zip(repo_urls, keys):
+        if key is None:
+            master.append(False)
+            main.append(False)
+            updates.append({False})
+            continue
+
+        probe = probes[key]
+        master.append(probe["master"])
+        main.append(probe["main"])
+        branches.append(probe["branches"])
+        if probe["branches"] != False:
+            updates.append(dict(probe["updates"]))
+            print(f"[*] {url} complete!")
+        else:
+            updates.append({False})
+
+    return master, main, branches, updates
@@ -0,0 +1,426 @@
+# <--- api stuff --->
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# <--- python stuff --->
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+# <--- custom --->
+from src import metrics_helpers
+from src.cache_helpers import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ResponseCache, cache_key
+
+
+# <--- client settings --->
+settings = {
+    # (connect, read) timeout in seconds, passed straight to `requests`
+    "timeout": (5.0, 30.0),
+    # retries after the first attempt for 5xx, secondary rate limits and dropped connections
+    "max_retries": 4,
+    # full-jitter exponential backoff: sleep ~ U(0, min(backoff_max, backoff_base * 2**attempt))
+    "backoff_base": 0.5,
+    "backoff_max": 30.0,
+    # keep-alive connections kept per host
+    "default_pool_size": 10,
+    "pool_sizes": {
+        "api.github.com": 16,
+        "raw.githubusercontent.com": 32,
+    },
+    # on-disk conditional-request cache for GET requests (see `configure_cache`)
+    "cache_enabled": not os.environ.get("DSC_NO_CACHE"),
+    "cache_path": os.environ.get("DSC_HTTP_CACHE", DEFAULT_CACHE_PATH),
+    "cache_max_bytes": DEFAULT_MAX_BYTES,
+    # seconds a cached response is served without revalidating; None always revalidates
+    "max_age": None,
+    # stop sending once a host's X-RateLimit-Remaining drops to this, until its reset time
+    "rate_limit_reserve": 10,
+    # longest single pause for a rate limit window, in seconds
+    "max_rate_limit_wait": 3600.0,
+}
+
+RETRY_STATUSES = {500, 502, 503, 504}
+CACHE_STATUSES = {200, 404}
+# headers of a 304 that must not overwrite the cached representation
+ENTITY_HEADERS = {"content-length", "content-encoding", "content-type", "transfer-encoding"}
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+_rate_limits: Dict[str, dict] = {}
+_rate_limits_lock = threading.Lock()
+
+
+def configure(timeout: Optional[Union[float, Tuple[float, float]]] = None,
+              max_retries: Optional[int] = None,
+              backoff_base: Optional[float] = None,
+              backoff_max: Optional[float] = None,
+              default_pool_size: Optional[int] = None,
+              pool_sizes: Optional[Dict[str, int]] = None) -> dict:
+    """
+    Update the shared HTTP client settings.
+
+    Pool size changes only apply to sessions created afterwards, so existing
+    sessions are closed and rebuilt lazily on the next request.
+
+    Args:
+        timeout (float | tuple): Request timeout, or a (connect, read) pair.
+        max_retries (int): Retries after the first attempt.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_max (float): Upper bound for a single backoff delay.
+        default_pool_size (int): Connections kept per host without an override.
+        pool_sizes (Dict[str, int]): Per-host connection pool sizes.
+
+    Returns:
+        dict: The updated settings.
+    """
+    updates = {
+        "timeout": timeout,
+        "max_retries": max_retries,
+        "backoff_base": backoff_base,
+        "backoff_max": backoff_max,
+        "default_pool_size": default_pool_size,
+    }
+    settings.update({key: value for key, value in updates.items() if value is not None})
+    if pool_sizes is not None:
+        settings["pool_sizes"] = {**settings["pool_sizes"], **pool_sizes}
+    close_sessions()
+    return settings
+
+
+def get_session(host: str) -> requests.Session:
+    """
+    Return the keep-alive session for a host, creating it on first use.
+
+    Sessions are shared by every caller (including threads), and the pool
+    blocks instead of opening throwaway connections once it is full.
+
+    Args:
+        host (str): Host name, e.g. `api.github.com`.
+
+    Returns:
+        requests.Session: Session with a pooled adapter sized for the host.
+    """
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        if host not in _sessions:
+            pool_size = settings["pool_sizes"].get(host, settings["default_pool_size"])
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return _sessions[host]
+
+
+def close_sessions() -> None:
+    """
+    Close and forget every pooled session.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def is_secondary_rate_limit(response: requests.Response) -> bool:
+    """
+    Check whether a response is GitHub's secondary (abuse) rate limit.
+
+    Args:
+        response (requests.Response): Response to inspect.
+
+    Returns:
+        bool: True for a 429, or a 403 carrying `Retry-After` or the
+            secondary rate limit message.
+    """
+    if response.status_code == 429:
+        return True
+    if response.status_code == 403:
+        return "Retry-After" in response.headers or "secondary rate limit" in response.text.lower()
+    return False
+
+
+def update_rate_limit(host: str, response: requests.Response) -> None:
+    """
+    Record a host's rate limit state from the `X-RateLimit-Remaining`,
+    `X-RateLimit-Reset` and `Retry-After` headers of a response.
+
+    Args:
+        host (str): Host the response came from.
+        response (requests.Response): Response to read the headers from.
+    """
+    remaining = response.headers.get("X-RateLimit-Remaining", "")
+    reset = response.headers.get("X-RateLimit-Reset", "")
+    retry_after = response.headers.get("Retry-After", "")
+    with _rate_limits_lock:
+        state = _rate_limits.setdefault(host, {"remaining": None, "reset": 0.0, "blocked_until": 0.0})
+        if remaining.isdigit():
+            state["remaining"] = int(remaining)
+        if reset.isdigit():
+            state["reset"] = float(reset)
+        if retry_after.isdigit():
+            state["blocked_until"] = max(state["blocked_until"], time.time() + int(retry_after))
+
+
+def rate_limit_wait(host: str) -> float:
+    """
+    Reserve one request against a host's rate limit and return how long to
+    wait before sending it.
+
+    Callers wait while a `Retry-After` is in force, or until the window
+    resets once `X-RateLimit-Remaining` has reached `rate_limit_reserve`.
+    The remaining count is decremented optimistically so concurrent callers
+    do not all spend the last few requests.
+
+    Args:
+        host (str): Host about to be requested.
+
+    Returns:
+        float: Seconds to wait, capped at `max_rate_limit_wait`.
+    """
+    now = time.time()
+    with _rate_limits_lock:
+        state = _rate_limits.get(host)
+        if state is None:
+            return 0.0
+        wait = state["blocked_until"] - now
+        if state["remaining"] is not None:
+            if state["remaining"] <= settings["rate_limit_reserve"] and state["reset"] > now:
+                wait = max(wait, state["reset"] - now)
+            elif state["reset"] <= now:
+                state["remaining"] = None
+            else:
+                state["remaining"] -= 1
+    return min(max(wait, 0.0), settings["max_rate_limit_wait"])
+
+
+def rate_limit_status(host: str) -> Optional[dict]:
+    """
+    Return the last known rate limit state for a host.
+
+    Args:
+        host (str): Host name.
+
+    Returns:
+        Optional[dict]: `remaining`, `reset` and `blocked_until`, or None if
+            the host has not sent rate limit headers.
+    """
+    with _rate_limits_lock:
+        state = _rate_limits.get(host)
+        return dict(state) if state is not None else None
+
+
+def is_primary_rate_limit(response: requests.Response) -> bool:
+    """
+    Check whether a response was refused because the rate limit window is used up.
+
+    Args:
+        response (requests.Response): Response to inspect.
+
+    Returns:
+        bool: True for a 403/429 with `X-RateLimit-Remaining: 0`.
+    """
+    return response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0"
+
+
+def backoff_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    """
+    Compute how long to wait before the next attempt.
+
+    Args:
+        attempt (int): Zero-based number of the attempt that just failed.
+        response (requests.Response): Failed response, if any. A numeric
+            `Retry-After` header takes precedence over the backoff schedule.
+
+    Returns:
+        float: Delay in seconds.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    cap = min(settings["backoff_max"], settings["backoff_base"] * 2 ** attempt)
+    return random.uniform(0, cap)
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request through the pooled session for the URL's host, retrying
+    server errors, secondary rate limits and dropped connections with
+    jittered exponential backoff.
+
+    Requests to a host pause before its rate limit is exhausted (see
+    `rate_limit_wait`), and a request refused by an exhausted window is
+    retried once the window resets.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Absolute URL.
+        **kwargs: Passed to `requests.Session.request`; `timeout` defaults
+            to the configured timeout.
+
+    Returns:
+        requests.Response: The final response (which may still be an error).
+
+    Raises:
+        requests.exceptions.RequestException: If the connection keeps failing
+            after the last retry.
+    """
+    kwargs.setdefault("timeout", settings["timeout"])
+    host = urlsplit(url).netloc
+    session = get_session(host)
+    max_retries = settings["max_retries"]
+
+    for attempt in range(max_retries + 1):
+        wait = rate_limit_wait(host)
+        if wait > 0:
+            print(f"[*] Rate limit reached for {host}, waiting {wait:.0f}s")
+            time.sleep(wait)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            metrics_helpers.record(url, 0, time.perf_counter() - start, 0)
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+        # a streamed body has not been read yet, so count its advertised size
+        size = int(response.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(response.content)
+        metrics_helpers.record(url, response.status_code, time.perf_counter() - start, size, response.headers)
+        update_rate_limit(host, response)
+
+        if is_primary_rate_limit(response) and attempt < max_retries:
+            # the next rate_limit_wait() sleeps until the window resets
+            response.close()
+            continue
+        retryable = response.status_code in RETRY_STATUSES or is_secondary_rate_limit(response)
+        if not retryable or attempt == max_retries:
+            return response
+        time.sleep(backoff_delay(attempt, response))
+        response.close()
+
+    return response
+
+
+def configure_cache(enabled: Optional[bool] = None, path: Optional[str] = None,
+                    max_bytes: Optional[int] = None, max_age: Optional[float] = None) -> dict:
+    """
+    Update the response cache settings (the `--no-cache`/`--max-age` overrides).
+
+    Args:
+        enabled (bool): Turn the cache on or off.
+        path (str): SQLite file to use.
+        max_bytes (int): Size bound before least recently used entries are evicted.
+        max_age (float): Serve entries younger than this many seconds without
+            contacting the server. A negative value resets it to None.
+
+    Returns:
+        dict: The updated settings.
+    """
+    global _cache
+    updates = {"cache_enabled": enabled, "cache_path": path, "cache_max_bytes": max_bytes}
+    settings.update({key: value for key, value in updates.items() if value is not None})
+    if max_age is not None:
+        settings["max_age"] = max_age if max_age >= 0 else None
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+    return settings
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """
+    Return the shared response cache, opening it on first use.
+
+    Returns:
+        Optional[ResponseCache]: The cache, or None when caching is disabled.
+    """
+    global _cache
+    if not settings["cache_enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(settings["cache_path"], settings["cache_max_bytes"])
+        return _cache
+
+
+def _cached_response(entry: dict, fresh_headers: Optional[dict] = None) -> requests.Response:
+    """
+    Rebuild a `requests.Response` from a cache entry.
+
+    Args:
+        entry (dict): Entry from `ResponseCache.get`.
+        fresh_headers (dict): Headers of a 304 revalidation, merged over the
+            cached ones (e.g. to pick up current rate limit headers).
+
+    Returns:
+        requests.Response: Response with `from_cache` set to True.
+    """
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response._content = entry["body"]
+    response.url = entry["url"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    for name, value in (fresh_headers or {}).items():
+        if name.lower() not in ENTITY_HEADERS:
+            response.headers[name] = value
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Send a GET request through the shared client. See `request`.
+
+    When the response cache is enabled, a cached entry younger than
+    `max_age` is returned without a request. Otherwise cached validators
+    are sent as `If-None-Match`/`If-Modified-Since`, and a 304 (which does
+    not count against GitHub's rate limit) is answered from the cache.
+    """
+    cache = get_cache()
+    if cache is None or kwargs.get("stream"):
+        return request("GET", url, **kwargs)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    full_url = requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+    lowered = {name.lower(): value for name, value in headers.items()}
+    key = cache_key("GET", full_url, lowered.get("accept"), lowered.get("authorization"))
+
+    entry = cache.get(key)
+    if entry is not None:
+        max_age = settings["max_age"]
+        if max_age is not None and time.time() - entry["stored_at"] <= max_age:
+            metrics_helpers.record_cache(full_url, "hit")
+            return _cached_response(entry)
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = request("GET", url, headers=headers, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        metrics_helpers.record_cache(full_url, "revalidated")
+        cache.refresh(key)
+        return _cached_response(entry, response.headers)
+    metrics_helpers.record_cache(full_url, "miss")
+    if response.status_code in CACHE_STATUSES:
+        cache.put(key, full_url, response.status_code, response.headers, response.content)
+    return response
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """
+    Send a POST request through the shared client. See `request`.
+    """
+    return request("POST", url, **kwargs)
@@ -0,0 +1,125 @@
+# <--- text processing stuff --->
+from html.parser import HTMLParser
+
+# <--- python stuff --->
+from typing import Iterable, List, Optional
+
+
+GITHUB_PREFIX = "https://github.com/"
+CHUNK_SIZE = 4096
+
+
+class _StopParsing(Exception):
+    """Raised from the tokenizer callback once the first anchor is seen."""
+
+
+class FirstAnchorParser(HTMLParser):
+    """
+    Tokenizer that stops at the first `<a>` start tag.
+
+    `BeautifulSoup(html, features="html.parser")` runs the same tokenizer,
+    so the anchor found here is the first element of `soup.find_all("a")`,
+    with the same entity-decoded `href` - but no tree is built and nothing
+    after the anchor is tokenized.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = False
+        self.href = None
+
+    def reset(self):
+        super().reset()
+        self.found = False
+        self.href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self.found = True
+            # duplicate attributes: the last one wins, as in BeautifulSoup
+            self.href = dict(attrs).get("href")
+            raise _StopParsing
+
+    def first_href(self, html: str) -> Optional[str]:
+        """
+        Return the `href` of the first anchor in `html`.
+
+        Args:
+            html (str): HTML content.
+
+        Returns:
+            Optional[str]: The `href` (None if there is no anchor or it has none).
+        """
+        return self.first_href_chunks(html[start:start + CHUNK_SIZE] for start in range(0, len(html), CHUNK_SIZE))
+
+    def first_href_chunks(self, chunks: Iterable[str]) -> Optional[str]:
+        """
+        `first_href` over a document read in chunks; no chunk after the one
+        holding the first anchor is read.
+
+        Args:
+            chunks (Iterable[str]): The HTML content, in order.
+
+        Returns:
+            Optional[str]: The `href` (None if there is no anchor or it has none).
+        """
+        self.reset()
+        try:
+            for chunk in chunks:
+                self.feed(chunk)
+            self.close()
+        except _StopParsing:
+            pass
+        return self.href
+
+
+def first_link(html: Optional[str]) -> Optional[str]:
+    """
+    Return the `href` of the first `<a>` tag in an HTML document.
+
+    Args:
+        html (Optional[str]): HTML content.
+
+    Returns:
+        Optional[str]: The first anchor's `href`, or `None`.
+    """
+    if not html:
+        return None
+    return FirstAnchorParser().first_href(html)
+
+
+def first_github_link(html: Optional[str], prefix: str = GITHUB_PREFIX) -> Optional[str]:
+    """
+    Return the first anchor's `href` if it starts with `prefix`.
+
+    Matches the rule used by `git_helpers.get_git_repo_url`: only the first
+    anchor counts, even if a later one points to GitHub.
+
+    Args:
+        html (Optional[str]): HTML content.
+        prefix (str): Required URL prefix.
+
+    Returns:
+        Optional[str]: The link, or `None`.
+    """
+    href = first_link(html)
+    return href if href is not None and href.startswith(prefix) else None
+
+
+def first_github_links(bodies: Iterable[Optional[str]], prefix: str = GITHUB_PREFIX) -> List[Optional[str]]:
+    """
+    Batch version of `first_github_link`, reusing one parser for every body.
+
+    Args:
+        bodies (Iterable[Optional[str]]): HTML documents.
+        prefix (str): Required URL prefix.
+
+    Returns:
+        List[Optional[str]]: One link (or `None`) per body.
+    """
+    parser = FirstAnchorParser()
+    links = []
+    for html in bodies:
+        href = parser.first_href(html) if html else None
+        links.append(href if href is not None and href.startswith(prefix) else None)
+    return links
@@ -1,8 +1,8 @@
 import re
-import markdown
-import markdown2
 from bs4 import BeautifulSoup
-from bs4 import Tag
+from bs4 import NavigableString, Tag
+
+from src.render_helpers import render_markdown
 
 
 def process_html(html: str) -> str:
@@ -23,7 +23,7 @@ def process_html(html: str) -> str:
     return text
 
 
-def convert_lesson_text(readme_content:tuple)->(str, str):
+def convert_lesson_text(readme_content:tuple, store=None)->(str, str):
     """
     Orchestrates conversion of lesson text into three types:
         - `html` -> (markdown) 
@@ -32,63 +32,46 @@ def convert_lesson_text(readme_content:tuple)->(str, str):
 
     Input:
     readme_content (str): raw HTML string of lesson README page
+    store (ContentStore): if given, `readme_content` is the content hash
+        of the README in this store
 
     Output:
     html (str): 
     text (str):
     doc (Doc): 
     """
-    markdown2_text = markdown2.markdown(readme_content)
+    if store is not None:
+        # `readme_content` is a content hash; read the README from the store
+        readme_content = store.read_text(readme_content)
+    markdown2_text = render_markdown(readme_content)
     plain_text = process_html(markdown2_text)
     return markdown2_text, plain_text
 
 
 def extract_text_from_element(element: Tag) -> str:
     """
-    Extracts text content from an HTML element.
+    Converts a single HTML element (and everything nested in it) to Markdown.
 
     Args:
-        element (bs4.Tag): HTML element to extract text from.
+        element (bs4.Tag): HTML element to convert.
 
     Returns:
-        str: Extracted text content.
+        str: Markdown for the element; empty for anything that is not a tag
+            (text between block elements, comments), as before.
     """
-    text = ""
     if isinstance(element, Tag):
-        if element.name == "h3":
-            text += f"## {str(element.string)}\n\n"
-        elif element.name == "h4":
-            text += f"### {str(element.string)}\n\n"
-        else:
-            if element.name in ["p"]:
-                text += str(element.string) + "\n\n"
-            elif element.name in  ["em", "strong"]:
-                text += f"**{str(element.string)}** \n\n"
-            elif element.name == "ul":
-                text += "".join([extract_text_from_element(li) for li in element.find_all("li")])
-            elif element.name == "ol":
-                text += "".join([extract_text_from_element(li) for li in element.find_all("li")])
-            elif element.name == "li":
-                if element.find("code"):
-                    text += "- `" + str(element.find("code").string) + "`\n"
-                else:
-                    text += "- " + str(element.string) + "\n"
-            elif element.name == "code":
-                text += f"`{str(element.string)}`"
-            else:
-                element_ = str(element).replace("None", "")
-                text += str(element_) + "\n\n"
-
-        if element.next_sibling and element.next_sibling.name not in ["h3", "h4"]:
-            text += extract_text_from_element(element.next_sibling)
-
-    return text
+        return _block_markdown(element)
+    return ""
 
 
 def convert_to_markdown(title: str, html_page: str) -> str:
     """
     Converts an HTML page to Markdown format.
 
+    Each `<h3>` starts a section that runs until the next `<h3>` sibling.
+    Every node is visited once, without recursion, so time is linear in
+    the size of the page.
+
     Args:
         title (str): Title of the Markdown document.
         html_page (str): HTML content to be converted.
@@ -96,14 +79,104 @@ def convert_to_markdown(title: str, html_page: str) -> str:
     Returns:
         str: Markdown representation of the HTML page.
     """
-    markdown = f"# {title}\n\n"
+    parts = [f"# {title}\n\n"]
     soup = BeautifulSoup(html_page, "html.parser")
-    sections = soup.find_all("h3")
-    for section in sections:
-        cleaned_text = f"## {str(section.string)}\n\n"
+    for section in soup.find_all("h3"):
+        parts.append(f"## {_inline_markdown(section)}\n\n")
         next_element = section.next_sibling
-        while next_element and next_element.name != "h3":
-            cleaned_text += extract_text_from_element(next_element)
+        while next_element is not None and next_element.name != "h3":
+            parts.append(extract_text_from_element(next_element))
             next_element = next_element.next_sibling
-        markdown += cleaned_text + "\n"
-    return markdown
+        parts.append("\n")
+    return "".join(parts)
+
+
+# <--- markdown rendering --->
+HEADING_LEVELS = {"h3": "##", "h4": "###", "h5": "####", "h6": "#####"}
+INLINE_MARKERS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+LIST_TAGS = {"ul", "ol"}
+LIST_INDENT = "    "
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _block_markdown(element: Tag) -> str:
+    """
+    Render one block-level element. Elements with no Markdown counterpart
+    (tables, images, divs, ...) are kept as HTML.
+    """
+    if element.name in HEADING_LEVELS:
+        return f"{HEADING_LEVELS[element.name]} {_inline_markdown(element)}\n\n"
+    if element.name == "p":
+        return f"{_inline_markdown(element)}\n\n"
+    if element.name in ["em", "strong"]:
+        return f"**{_inline_markdown(element)}** \n\n"
+    if element.name in LIST_TAGS:
+        return _list_markdown(element)
+    if element.name == "li":
+        return f"- {_inline_markdown(element)}\n"
+    if element.name == "code":
+        return f"`{element.get_text()}`"
+    if element.name == "pre":
+        code = element.find("code")
+        classes = code.get("class", []) if code is not None else []
+        language = next((c[len("language-"):] for c in classes if c.startswith("language-")), "")
+        return f"```{language}\n{element.get_text().strip(chr(10))}\n```\n\n"
+    return str(element) + "\n\n"
+
+
+def _inline_markdown(element: Tag) -> str:
+    """
+    Render the inline content of an element (text, code, emphasis, links)
+    on one line. Nested lists are left to `_list_markdown`.
+    """
+    out = []
+    # nodes still to visit, and 1-tuples of literal text to emit, in reverse order
+    stack = list(reversed(element.contents))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, tuple):
+            out.append(node[0])
+        elif type(node) is NavigableString:
+            text = WHITESPACE_PATTERN.sub(" ", node)
+            if text.startswith(" ") and (not out or out[-1].endswith(" ")):
+                text = text[1:]
+            out.append(text)
+        elif not isinstance(node, Tag) or node.name in LIST_TAGS:
+            continue
+        elif node.name == "code":
+            out.append(f"`{node.get_text()}`")
+        elif node.name == "br":
+            out.append("<br>")
+        elif node.name == "img":
+            out.append(f"![{node.get('alt', '')}]({node.get('src', '')})")
+        elif node.name in INLINE_MARKERS:
+            marker = INLINE_MARKERS[node.name]
+            stack += [(marker,)] + list(reversed(node.contents)) + [(marker,)]
+        elif node.name == "a" and node.get("href"):
+            stack += [(f"]({node['href']})",)] + list(reversed(node.contents)) + [("[",)]
+        else:
+            stack += list(reversed(node.contents))
+    return "".join(out).strip()
+
+
+def _list_markdown(element: Tag) -> str:
+    """
+    Render a `<ul>`/`<ol>` and the lists nested in its items, indenting
+    each nesting level.
+    """
+    lines = []
+    # (item, depth, marker) entries still to render, in reverse order
+    stack = []
+
+    def push_items(list_tag, depth):
+        items = list_tag.find_all("li", recursive=False)
+        markers = [f"{n}. " if list_tag.name == "ol" else "- " for n in range(1, len(items) + 1)]
+        stack.extend(reversed([(item, depth, marker) for item, marker in zip(items, markers)]))
+
+    push_items(element, 0)
+    while stack:
+        item, depth, marker = stack.pop()
+        lines.append(f"{LIST_INDENT * depth}{marker}{_inline_markdown(item)}\n")
+        for nested in reversed(item.find_all(list(LIST_TAGS), recursive=False)):
+            push_items(nested, depth + 1)
+    return "".join(lines) + "\n"
@@ -0,0 +1,236 @@
+# <--- data stuff --->
+import json
+
+# <--- python stuff --->
+import functools
+import math
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Write each run's summary to this file as well as printing it
+DEFAULT_EXPORT_PATH = os.environ.get("DSC_METRICS_JSON")
+PERCENTILES = (50, 95, 99)
+RATE_LIMIT_HEADERS = ("X-RateLimit-Remaining", "X-Rate-Limit-Remaining")
+
+_lock = threading.Lock()
+_endpoints: Dict[Tuple[str, str], dict] = {}
+
+
+def endpoint_class(url: str) -> Tuple[str, str]:
+    """
+    Classify a request URL by service and endpoint, dropping the parts that
+    name a particular course, item, repository or branch.
+
+    Args:
+        url (str): Request URL.
+
+    Returns:
+        Tuple[str, str]: Host, and an endpoint class such as
+            `canvas:courses/pages`, `github:branch` or `raw:README.md`.
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment]
+    if segments[:2] == ["api", "v1"]:
+        # /api/v1/courses/:id/pages[/:id]: collection names sit at even offsets
+        names = segments[2::2]
+        item = len(segments) > 3 and len(segments) % 2 == 0
+        return parts.netloc, "canvas:" + "/".join(names) + ("/item" if item else "")
+    if segments[-1:] == ["graphql"]:
+        return parts.netloc, "github:graphql"
+    if segments[:1] == ["repos"]:
+        # /repos/:owner/:repo[/branches[/:branch]]
+        rest = segments[3:]
+        if not rest:
+            return parts.netloc, "github:repo"
+        if rest[0] == "branches":
+            return parts.netloc, "github:branches" if len(rest) == 1 else "github:branch"
+        return parts.netloc, "github:" + rest[0]
+    if len(segments) >= 4:
+        # raw content: /owner/repo/branch/path
+        return parts.netloc, "raw:" + segments[-1]
+    return parts.netloc, "other"
+
+
+def _stats(host: str, endpoint: str) -> dict:
+    return _endpoints.setdefault((host, endpoint), {
+        "latencies": [], "statuses": {}, "bytes": 0,
+        "cache_hits": 0, "cache_revalidated": 0, "cache_misses": 0,
+        "rate_limit_remaining": None,
+    })
+
+
+def rate_limit_remaining(headers) -> Optional[float]:
+    """
+    Remaining rate limit advertised by GitHub or Canvas response headers.
+    """
+    for name in RATE_LIMIT_HEADERS:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def record(url: str, status: int, latency: float, size: int, headers=None) -> None:
+    """
+    Record one request sent over the network.
+
+    Args:
+        url (str): Request URL.
+        status (int): Response status code, 0 if no response arrived.
+        latency (float): Seconds from sending the request to having the response.
+        size (int): Response body size in bytes.
+        headers: Response headers, read for the remaining rate limit.
+    """
+    host, endpoint = endpoint_class(url)
+    remaining = rate_limit_remaining(headers) if headers is not None else None
+    with _lock:
+        stats = _stats(host, endpoint)
+        stats["latencies"].append(latency)
+        stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+        stats["bytes"] += size
+        if remaining is not None:
+            stats["rate_limit_remaining"] = remaining
+
+
+def record_cache(url: str, outcome: str) -> None:
+    """
+    Record a response cache lookup.
+
+    Args:
+        url (str): Request URL.
+        outcome (str): "hit" (served without a request), "revalidated" (a
+            304 answered from the cache) or "miss".
+    """
+    with _lock:
+        stats = _stats(*endpoint_class(url))
+        stats[{"hit": "cache_hits", "revalidated": "cache_revalidated", "miss": "cache_misses"}[outcome]] += 1
+
+
+def response_hook(response, *args, **kwargs):
+    """
+    `requests` response hook recording a response, for sessions that do not
+    go through `http_helpers` (e.g. the canvasapi client's).
+    """
+    size = int(response.headers.get("Content-Length") or 0) or len(response.content)
+    record(response.url, response.status_code, response.elapsed.total_seconds(), size, response.headers)
+    return response
+
+
+def instrument_session(session) -> None:
+    """
+    Record every response of a `requests.Session`.
+    """
+    if response_hook not in session.hooks["response"]:
+        session.hooks["response"].append(response_hook)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a list of values (None if it is empty).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summary() -> List[dict]:
+    """
+    Summarize the requests recorded since the last `reset`, per host and
+    endpoint class.
+
+    Returns:
+        List[dict]: One entry per endpoint, busiest first, with request,
+            error (no response or 5xx) and rate limited (403/429) counts, p50/p95/p99 latency in milliseconds, bytes received,
+            the last remaining rate limit seen and the cache hit rate (hits
+            and revalidations over lookups, None without lookups).
+    """
+    with _lock:
+        items = [(key, dict(stats, latencies=list(stats["latencies"]), statuses=dict(stats["statuses"])))
+                 for key, stats in _endpoints.items()]
+
+    rows = []
+    for (host, endpoint), stats in items:
+        latencies = stats["latencies"]
+        lookups = stats["cache_hits"] + stats["cache_revalidated"] + stats["cache_misses"]
+        row = {
+            "host": host,
+            "endpoint": endpoint,
+            "requests": len(latencies),
+            # status 0 is a request that got no response (connection error or timeout);
+            # 404s are ordinary answers here (no `.canvas`, no README on a branch)
+            "errors": sum(count for status, count in stats["statuses"].items() if status == 0 or status >= 500),
+            "rate_limited": sum(count for status, count in stats["statuses"].items() if status in (403, 429)),
+            "statuses": {str(status): count for status, count in sorted(stats["statuses"].items())},
+            "bytes": stats["bytes"],
+            "rate_limit_remaining": stats["rate_limit_remaining"],
+            "cache_lookups": lookups,
+            "cache_hits": stats["cache_hits"],
+            "cache_revalidated": stats["cache_revalidated"],
+            "cache_hit_rate": (stats["cache_hits"] + stats["cache_revalidated"]) / lookups if lookups else None,
+        }
+        for q in PERCENTILES:
+            value = percentile(latencies, q)
+            row[f"p{q}_ms"] = round(value * 1000, 1) if value is not None else None
+        rows.append(row)
+    return sorted(rows, key=lambda row: (-row["requests"], row["host"], row["endpoint"]))
+
+
+def print_summary(rows: List[dict]) -> None:
+    """
+    Print a summary from `summary`, one line per endpoint.
+    """
+    print("[*] Network summary")
+    for row in rows:
+        latency = " / ".join(f"{row[f'p{q}_ms']:.0f}" if row[f"p{q}_ms"] is not None else "-" for q in PERCENTILES)
+        cache = f", cache {row['cache_hit_rate']:.0%} of {row['cache_lookups']}" if row["cache_lookups"] else ""
+        remaining = f", {row['rate_limit_remaining']:.0f} left" if row["rate_limit_remaining"] is not None else ""
+        print(f"    {row['host']} {row['endpoint']}: {row['requests']} requests, {row['errors']} errors, "
+              f"{row['rate_limited']} rate limited, "
+              f"p50/p95/p99 {latency} ms, {row['bytes'] / 1e6:.1f} MB{cache}{remaining}")
+
+
+def export_json(rows: List[dict], path: str) -> None:
+    """
+    Write a summary from `summary` to a JSON file.
+
+    Args:
+        rows (List[dict]): The summary.
+        path (str): Output path.
+    """
+    with open(path, "w") as f:
+        json.dump({"endpoints": rows}, f, indent=2)
+
+
+def reset() -> None:
+    """
+    Forget every recorded request.
+    """
+    with _lock:
+        _endpoints.clear()
+
+
+def report_metrics(fn: Callable) -> Callable:
+    """
+    Decorate a report run: record its requests from scratch and, when it
+    ends (even with an error), print their summary and export it to
+    `DSC_METRICS_JSON` if set.
+    """
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        reset()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            rows = summary()
+            if rows:
+                print_summary(rows)
+                if DEFAULT_EXPORT_PATH:
+                    export_json(rows, DEFAULT_EXPORT_PATH)
+    return run
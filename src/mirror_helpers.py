@@ -0,0 +1,231 @@
+# <--- python stuff --->
+import functools
+import os
+import subprocess
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# <--- custom --->
+from src.date_helpers import iso_utc
+
+
+# <--- mirror settings --->
+# Directory of bare or mirror clones (`git clone --mirror`) to read repositories
+# from instead of GitHub, laid out as `{owner}/{repo}.git` or just `{repo}.git`
+settings = {
+    "mirror_dir": os.environ.get("DSC_GIT_MIRRORS") or None,
+}
+
+
+def configure_mirrors(mirror_dir: Optional[str]) -> dict:
+    """
+    Read repositories from local git mirrors, or from GitHub again.
+
+    While a mirror directory is set, `git_helpers.get_branches`,
+    `get_branch_updates`, `get_repo_pushed_at`, `get_default_branch`,
+    `check_for_dot_canvas` and README retrieval answer from it without any
+    HTTP request, and a repository without a mirror is treated like one
+    GitHub does not have.
+
+    Args:
+        mirror_dir (Optional[str]): The directory, or None for GitHub.
+
+    Returns:
+        dict: The updated settings.
+    """
+    settings["mirror_dir"] = mirror_dir or None
+    _index.cache_clear()
+    _heads.cache_clear()
+    return settings
+
+
+def enabled() -> bool:
+    """
+    Whether repositories are read from local mirrors.
+    """
+    return settings["mirror_dir"] is not None
+
+
+def _is_git_dir(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "HEAD")) and os.path.isdir(os.path.join(path, "objects"))
+
+
+@functools.lru_cache(maxsize=8)
+def _index(root: str) -> Dict[Tuple[Optional[str], str], str]:
+    # (owner, repo) and (None, repo) -> git dir, lowercased like `git_helpers.repo_key`
+    index = {}
+    for entry in sorted(os.scandir(root), key=lambda entry: entry.name):
+        if not entry.is_dir():
+            continue
+        name = entry.name[:-4] if entry.name.lower().endswith(".git") else entry.name
+        if _is_git_dir(entry.path):
+            index.setdefault((None, name.lower()), entry.path)
+            continue
+        for repo in sorted(os.scandir(entry.path), key=lambda repo: repo.name):
+            if repo.is_dir() and _is_git_dir(repo.path):
+                repo_name = repo.name[:-4] if repo.name.lower().endswith(".git") else repo.name
+                index.setdefault((name.lower(), repo_name.lower()), repo.path)
+                index.setdefault((None, repo_name.lower()), repo.path)
+    return index
+
+
+def find_mirror(owner: str, repo_name: str) -> Optional[str]:
+    """
+    Locate the mirror of a repository, matching names case-insensitively
+    as GitHub does.
+
+    Args:
+        owner (str): The owner of the GitHub repository.
+        repo_name (str): The name of the GitHub repository.
+
+    Returns:
+        Optional[str]: Path of its git directory, or `None` if there is no
+            mirror of it (or mirrors are not enabled).
+    """
+    if not enabled():
+        return None
+    index = _index(os.path.abspath(settings["mirror_dir"]))
+    return index.get((owner.lower(), repo_name.lower())) or index.get((None, repo_name.lower()))
+
+
+def _git(git_dir: str, *args: str, input: Optional[bytes] = None) -> bytes:
+    result = subprocess.run(["git", f"--git-dir={git_dir}", *args], input=input,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
+
+
+@functools.lru_cache(maxsize=4096)
+def _heads(git_dir: str) -> Dict[str, Tuple[int, int]]:
+    # branch -> (author, committer) time of its last commit, in one `for-each-ref`
+    output = _git(git_dir, "for-each-ref", "--format=%(refname)%00%(authordate:raw)%00%(committerdate:raw)",
+                  "refs/heads").decode("utf-8", "surrogateescape")
+    heads = {}
+    for line in output.splitlines():
+        refname, authored, committed = line.split("\0")
+        heads[refname[len("refs/heads/"):]] = int(authored.split()[0]), int(committed.split()[0])
+    return heads
+
+
+def read_objects(git_dir: str, names: Sequence[str]) -> List[Optional[bytes]]:
+    """
+    Read several blobs with a single `git cat-file --batch`.
+
+    Args:
+        git_dir (str): Repository to read from.
+        names (Sequence[str]): Object names, e.g. `refs/heads/main:README.md`.
+
+    Returns:
+        List[Optional[bytes]]: Content of each blob, or `None` where the
+            name does not resolve to a blob.
+    """
+    if not names:
+        return []
+    output = _git(git_dir, "cat-file", "--batch", input="".join(f"{name}\n" for name in names).encode("utf-8"))
+    blobs, offset = [], 0
+    for _ in names:
+        end = output.index(b"\n", offset)
+        header = output[offset:end].split()
+        offset = end + 1
+        if len(header) != 3:
+            # "<name> missing" or "<name> ambiguous"
+            blobs.append(None)
+            continue
+        size = int(header[2])
+        blobs.append(output[offset:offset + size] if header[1] == b"blob" else None)
+        offset += size + 1
+    return blobs
+
+
+def get_branches(owner: str, repo_name: str):
+    """
+    `git_helpers.get_branches` from a mirror.
+
+    Returns:
+        list or bool: Branch names in GitHub's (name) order, or False if
+            there is no mirror of the repository.
+    """
+    git_dir = find_mirror(owner, repo_name)
+    return list(_heads(git_dir)) if git_dir is not None else False
+
+
+def get_default_branch(owner: str, repo_name: str) -> Optional[str]:
+    """
+    `git_helpers.get_default_branch` from a mirror: the branch its `HEAD`
+    points to, as `git clone --mirror` copies it from GitHub.
+
+    Returns:
+        Optional[str]: The branch name, or `None` if the repository is not
+            mirrored or `HEAD` is not a branch.
+    """
+    git_dir = find_mirror(owner, repo_name)
+    if git_dir is None:
+        return None
+    try:
+        ref = _git(git_dir, "symbolic-ref", "-q", "HEAD").decode("utf-8", "surrogateescape").strip()
+    except subprocess.CalledProcessError:
+        return None
+    return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else None
+
+
+def get_branch_updates(owner: str, repo_name: str, branch: str) -> Optional[str]:
+    """
+    `git_helpers.get_branch_updates` from a mirror: the author date of the
+    branch's last commit.
+
+    Returns:
+        Optional[str]: The date in ISO 8601 format (UTC), or `None` if the
+            repository or branch is not mirrored.
+    """
+    git_dir = find_mirror(owner, repo_name)
+    dates = _heads(git_dir).get(branch) if git_dir is not None else None
+    return iso_utc(dates[0]) if dates is not None else None
+
+
+def get_repo_pushed_at(owner: str, repo_name: str) -> Optional[str]:
+    """
+    `git_helpers.get_repo_pushed_at` from a mirror. A mirror does not record
+    pushes, so this is the latest commit date of any branch, which a push
+    can only move forward.
+
+    Returns:
+        Optional[str]: The date in ISO 8601 format (UTC), or `None` if the
+            repository is not mirrored or has no branches.
+    """
+    git_dir = find_mirror(owner, repo_name)
+    heads = _heads(git_dir) if git_dir is not None else {}
+    return iso_utc(max(committed for _, committed in heads.values())) if heads else None
+
+
+def has_file(owner: str, repo_name: str, branches: Sequence[str], path: str) -> List[bool]:
+    """
+    Whether each of several branches of a mirrored repository has a file at
+    `path`, looked up with a single `git cat-file`.
+    """
+    git_dir = find_mirror(owner, repo_name)
+    if git_dir is None:
+        return [False] * len(branches)
+    return [blob is not None for blob in read_objects(git_dir, [f"refs/heads/{branch}:{path}" for branch in branches])]
+
+
+def read_first(owner: str, repo_name: str, branches: Sequence[str], path: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read a file from the first of several branches that has it, looking all
+    of them up at once.
+
+    Args:
+        owner (str): The owner of the GitHub repository.
+        repo_name (str): The name of the GitHub repository.
+        branches (Sequence[str]): Branches in order of preference.
+        path (str): File path in the repository, e.g. "README.md".
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The branch and the file's text,
+            or `(None, None)` if no branch has it.
+    """
+    git_dir = find_mirror(owner, repo_name)
+    if git_dir is None:
+        return None, None
+    blobs = read_objects(git_dir, [f"refs/heads/{branch}:{path}" for branch in branches])
+    for branch, blob in zip(branches, blobs):
+        if blob is not None:
+            return branch, blob.decode("utf-8", "replace")
+    return None, None
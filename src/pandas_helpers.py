@@ -1,30 +1,88 @@
 import pandas as pd
 
-def extract_dict_values(data: pd.DataFrame, original_column: str) -> pd.DataFrame:
+from typing import Dict, List, Tuple
+
+LAYOUTS = ("wide", "sparse", "long")
+
+
+def _collect_dict_values(series: pd.Series) -> Dict[object, Tuple[List[int], List[object]]]:
+    # one pass over the rows: positions and values per key, in first-seen key order
+    columns = {}
+    for position, value in enumerate(series):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                positions, values = columns.setdefault(key, ([], []))
+                positions.append(position)
+                values.append(item)
+    return columns
+
+
+def _typed_values(values: List[object], parse_dates: bool) -> pd.Series:
+    if parse_dates:
+        return pd.Series(pd.to_datetime(values, utc=True, errors="coerce"))
+    return pd.Series(values).infer_objects()
+
+
+def extract_dict_values(data: pd.DataFrame, original_column: str, layout: str = "wide",
+                        parse_dates: bool = False) -> pd.DataFrame:
     """
     Extract unique keys from a Pandas Series containing dictionaries and create columns for each key.
 
+    The dictionaries are read in a single pass. Values that are not
+    dictionaries (e.g. `{False}` for a repository that could not be read)
+    add no keys, and rows without a key hold a null (NaN/NaT) in its column.
+
     Args:
-        series (pd.Series): Pandas Series containing dictionaries.
+        data (pd.DataFrame): DataFrame holding the dictionaries.
+        original_column (str): Column of dictionaries to expand.
+        layout (str): "wide" adds a dense column per key, in the order the
+            keys are first seen; "sparse" adds the same columns as sparse
+            arrays, storing only the rows that have the key (timestamps as
+            naive UTC). Values without a numeric or datetime type, such as the
+            date strings when `parse_dates` is False, give `Sparse[object]`
+            columns, which save little memory. "long" returns one row per
+            (row, key) pair instead, rows in order and each row's keys in its
+            dict's order, with `key` and `value` columns and the index of
+            `data`.
+        parse_dates (bool): Convert the values to UTC timestamps (e.g. the
+            ISO 8601 dates of branch updates); unparsable values become NaT.
 
     Returns:
-        pd.DataFrame: DataFrame with extracted dictionary values as columns along with the original series.
-    """
-    # Select the series to apply the function
-    series = data[original_column]
-    
-    # Create an empty DataFrame to store the extracted values
-    extracted_data = pd.DataFrame()
+        pd.DataFrame: `data` with extracted dictionary values as columns, or
+            the long frame of keys and values.
 
-    # Extract unique keys from the dictionaries in the Series
-    unique_keys = set().union(*series)
+    Raises:
+        ValueError: If `layout` is not one of `LAYOUTS`.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {', '.join(LAYOUTS)}")
 
-    # Create a column for each unique key and populate it with the corresponding dictionary values
-    for key in unique_keys:
-        extracted_data[key] = series.apply(lambda x: x.get(key) if isinstance(x, dict) else "not avail")
+    if layout == "long":
+        # one pass, so the rows of `data` stay in order and each row's keys in its dict's order
+        positions, keys, values = [], [], []
+        for position, value in enumerate(data[original_column]):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    positions.append(position)
+                    keys.append(key)
+                    values.append(item)
+        long = pd.DataFrame({"key": keys, "value": _typed_values(values, parse_dates)})
+        long.index = data.index[positions]
+        return long
 
-    # Add the original series as a column in the extracted DataFrame
-    
-    df = pd.concat([data, extracted_data], axis=1)
+    columns = _collect_dict_values(data[original_column])
+    extracted = {}
+    for key, (positions, values) in columns.items():
+        typed = _typed_values(values, parse_dates)
+        typed.index = positions
+        column = typed.reindex(range(len(data)))
+        if layout == "sparse":
+            # densify one column at a time, so peak memory is a single column;
+            # sparse arrays need a numpy dtype, so timestamps stay UTC but lose the tz
+            if isinstance(column.dtype, pd.DatetimeTZDtype):
+                column = column.dt.tz_convert(None)
+            column = column.astype(pd.SparseDtype(column.dtype))
+        extracted[key] = column.array
 
-    return df
\ No newline at end of file
+    extracted_data = pd.DataFrame(extracted, index=data.index)
+    return pd.concat([data, extracted_data], axis=1)
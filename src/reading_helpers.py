@@ -0,0 +1,304 @@
+# <--- text processing stuff --->
+import re
+from html.entities import name2codepoint
+from html.parser import HTMLParser
+
+# <--- data stuff --->
+import pandas as pd
+
+# <--- python stuff --->
+from typing import Iterable, Optional, Tuple
+
+
+WORDS_PER_MINUTE = 200
+PYTHON_BLOCK_PATTERN = re.compile("```python.*\n.*")
+
+# BeautifulSoup collapses strings made only of these characters ...
+ASCII_SPACES = " \n\t\x0c\r"
+# ... except inside these tags
+PRESERVE_WHITESPACE_TAGS = {"pre", "textarea"}
+# tags closed as soon as they are opened
+VOID_TAGS = {"area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+             "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+             "spacer", "track", "wbr"}
+
+
+class TextNodeCounter(HTMLParser):
+    """
+    Count words in the text nodes of an HTML document without building a tree.
+
+    Produces the same total as
+    `sum(len(n.split(" ")) for n in BeautifulSoup(html, "html.parser").find_all(string=True))`.
+    It mirrors how BeautifulSoup's `html.parser` builder cuts text into nodes:
+    at every tag, comment, declaration and processing instruction. Outside
+    `<pre>`/`<textarea>`, a whitespace-only node collapses to a single space
+    or newline. Since `len(s.split(" "))` is `s.count(" ") + 1`, only a
+    running total and the open tag names are kept, not the text itself.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.words = 0
+        self._data = []
+        self._open = []
+        self._preserve = 0
+        self._closed_void = []
+
+    def reset(self):
+        super().reset()
+        self.words = 0
+        self._data = []
+        self._open = []
+        self._preserve = 0
+        self._closed_void = []
+
+    def _end_data(self):
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data = []
+        if not self._preserve and all(c in ASCII_SPACES for c in data):
+            data = "\n" if "\n" in data else " "
+        if data:
+            # `find_all(string=True)` skips empty strings
+            self.words += data.count(" ") + 1
+
+    def _pop_to(self, tag):
+        if tag not in self._open:
+            return
+        while self._open:
+            name = self._open.pop()
+            if name in PRESERVE_WHITESPACE_TAGS:
+                self._preserve -= 1
+            if name == tag:
+                break
+
+    def _start(self, tag):
+        self._end_data()
+        self._open.append(tag)
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve += 1
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag)
+        if tag in VOID_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            self._closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self._closed_void:
+            # explicit end tag of a void element that was already closed
+            self._closed_void.remove(tag)
+            return
+        self._end_data()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        try:
+            self._data.append(chr(int(name[1:], 16) if name[:1] in "xX" else int(name)))
+        except (ValueError, OverflowError):
+            self._data.append(name)
+
+    def handle_entityref(self, name):
+        codepoint = name2codepoint.get(name)
+        self._data.append(chr(codepoint) if codepoint is not None else f"&{name}")
+
+    def _special(self, data):
+        self._end_data()
+        self._data.append(data)
+        self._end_data()
+
+    def handle_comment(self, data):
+        self._special(data)
+
+    def handle_decl(self, decl):
+        self._special(decl[len("DOCTYPE "):])
+
+    def unknown_decl(self, data):
+        self._special(data[len("CDATA["):] if data.upper().startswith("CDATA[") else data)
+
+    def handle_pi(self, data):
+        self._special(data)
+
+    def count(self, chunks: Iterable[str]) -> int:
+        """
+        Count the words of a document fed in one or more chunks.
+
+        Args:
+            chunks (Iterable[str]): The document, in order.
+
+        Returns:
+            int: Total words over all text nodes.
+        """
+        self.reset()
+        for chunk in chunks:
+            self.feed(chunk)
+        return self.finish()
+
+    def finish(self) -> int:
+        """
+        Flush the last text node of a document fed with `feed`.
+
+        Returns:
+            int: Total words over all text nodes.
+        """
+        self.close()
+        self._end_data()
+        return self.words
+
+
+def count_text_words(html: str) -> int:
+    """
+    Count words over the text nodes of an HTML (or markdown) document.
+
+    Args:
+        html (str): Document content.
+
+    Returns:
+        int: Word count, as `get_reading_times` defines it.
+    """
+    return TextNodeCounter().count([html])
+
+
+def count_python_blocks(text: str) -> Tuple[int, int]:
+    """
+    Count fenced ```python blocks and the words on their first two lines.
+
+    Args:
+        text (str): Markdown content.
+
+    Returns:
+        Tuple[int, int]: Number of blocks and their total word count.
+    """
+    blocks, words = 0, 0
+    for match in PYTHON_BLOCK_PATTERN.finditer(text):
+        blocks += 1
+        words += match.group().count(" ") + 1
+    return blocks, words
+
+
+class PythonBlockCounter:
+    """
+    Streaming version of `count_python_blocks`.
+
+    `PYTHON_BLOCK_PATTERN` matches from "```python" to the end of the next
+    line, so the text is split into lines as it arrives and only the
+    current incomplete line is buffered.
+    """
+
+    def __init__(self):
+        self.blocks = 0
+        self.words = 0
+        self._buffer = ""
+        # spaces in the part of the opening line a match covers, until its next line arrives
+        self._open = None
+
+    def _line(self, line: str, complete: bool) -> None:
+        if self._open is not None:
+            self.blocks += 1
+            self.words += self._open + line.count(" ") + 1
+            self._open = None
+        elif complete:
+            start = line.find("```python")
+            if start >= 0:
+                self._open = line.count(" ", start)
+
+    def feed(self, chunk: str) -> None:
+        *lines, self._buffer = (self._buffer + chunk).split("\n")
+        for line in lines:
+            self._line(line, complete=True)
+
+    def close(self) -> Tuple[int, int]:
+        """
+        Finish the document.
+
+        Returns:
+            Tuple[int, int]: Number of blocks and their total word count.
+        """
+        self._line(self._buffer, complete=False)
+        self._buffer = ""
+        return self.blocks, self.words
+
+
+def reading_stats_stream(chunks: Iterable[str]) -> Tuple[int, int, int]:
+    """
+    `reading_stats` over a document read in chunks, in a single pass and
+    without holding the whole document.
+
+    Args:
+        chunks (Iterable[str]): The document, in order.
+
+    Returns:
+        Tuple[int, int, int]: Text words, python blocks and python words.
+    """
+    counter, blocks = TextNodeCounter(), PythonBlockCounter()
+    counter.reset()
+    for chunk in chunks:
+        counter.feed(chunk)
+        blocks.feed(chunk)
+    python_blocks, python_words = blocks.close()
+    return counter.finish(), python_blocks, python_words
+
+
+def reading_stats(html) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """
+    Compute the counts behind a reading time estimate in one pass per document.
+
+    Args:
+        html (str or False): README content, or False/None if there is none.
+
+    Returns:
+        Tuple[Optional[int], Optional[int], Optional[int]]: Text words,
+            python blocks and python words, or Nones for a missing document.
+    """
+    if not isinstance(html, str):
+        return None, None, None
+    blocks, python_words = count_python_blocks(html)
+    return count_text_words(html), blocks, python_words
+
+
+def reading_stats_frame(documents: pd.Series, store=None) -> pd.DataFrame:
+    """
+    Compute `reading_stats` for a column of documents.
+
+    Args:
+        documents (pd.Series): README contents (False/None where missing),
+            or with `store`, their content hashes.
+        store (store_helpers.ContentStore): Store to stream the documents
+            from, one chunk at a time.
+
+    Returns:
+        pd.DataFrame: `text_words`, `python_blocks` and `python_words` as
+            nullable Int64 columns, indexed like `documents`.
+    """
+    if store is not None:
+        rows = [reading_stats_stream(store.iter_text(digest)) if isinstance(digest, str) else (None, None, None)
+                for digest in documents]
+    else:
+        rows = [reading_stats(html) for html in documents]
+    return stats_frame(rows, documents.index)
+
+
+def stats_frame(rows: Iterable[tuple], index=None) -> pd.DataFrame:
+    """
+    Collect `reading_stats` results, one per document, into the frame
+    `reading_stats_frame` returns.
+
+    Args:
+        rows (Iterable[tuple]): (text words, python blocks, python words)
+            per document, Nones where it is missing.
+        index: Index of the frame.
+
+    Returns:
+        pd.DataFrame: `text_words`, `python_blocks` and `python_words` as
+            nullable Int64 columns.
+    """
+    stats = pd.DataFrame(list(rows), index=index, columns=["text_words", "python_blocks", "python_words"])
+    return stats.astype("Int64")
@@ -0,0 +1,242 @@
+# <--- api stuff --->
+import requests
+
+# <--- data stuff --->
+import json
+
+# <--- python stuff --->
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# <--- custom --->
+from src import git_helpers, http_helpers, mirror_helpers
+from src.cache_helpers import DEFAULT_CACHE_PATH
+
+
+# Branches holding a lesson's README, most preferred first
+README_BRANCHES = ("curriculum", "master", "main", "solution")
+DEFAULT_MEMO_PATH = os.environ.get(
+    "DSC_README_MEMO", os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "readme_branches.json"))
+
+
+def readme_url(owner: str, repo_name: str, branch: str) -> str:
+    """
+    URL of the raw README of a branch.
+    """
+    return f"{git_helpers.GITHUB_RAW_URL}/{owner}/{repo_name}/{branch}/README.md"
+
+
+def candidate_branches(preference: Sequence[str], default_branch: Optional[str] = None,
+                       branches: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    List the branches worth checking for a README, most preferred first.
+
+    Args:
+        preference (Sequence[str]): Branches in order of preference.
+        default_branch (Optional[str]): The repository's default branch, if
+            known; tried last when it is not already in `preference`.
+        branches (Optional[Iterable[str]]): The repository's branches, if
+            known; candidates that do not exist are dropped.
+
+    Returns:
+        List[str]: Branches to check.
+    """
+    candidates = list(preference)
+    if default_branch and default_branch not in candidates:
+        candidates.append(default_branch)
+    if branches is not None:
+        existing = set(branches)
+        candidates = [branch for branch in candidates if branch in existing]
+    return candidates
+
+
+class ReadmeResolver:
+    """
+    Find which branch of a repository holds its README.
+
+    Candidate branches are requested concurrently and the most preferred
+    one that has a README wins, so a repository costs one round trip
+    instead of one per branch tried. The winning branch is remembered per
+    repository and order of preference (and saved to `path`), so later runs
+    with the same preference try it alone first when the branch list is not
+    known. When no preferred branch has a README and the default branch was
+    not given, it is looked up and tried last.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_MEMO_PATH, max_workers: int = 4):
+        """
+        Args:
+            path (Optional[str]): JSON file remembering winning branches, or
+                None to keep them in memory only.
+            max_workers (int): Branches requested concurrently per repository.
+        """
+        self.path = path
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._winners: Optional[Dict[str, str]] = None
+        self._dirty = False
+
+    def _memo(self) -> Dict[str, str]:
+        if self._winners is None:
+            winners = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        winners = json.load(f)
+                except (OSError, ValueError):
+                    winners = {}
+            self._winners = winners
+        return self._winners
+
+    @staticmethod
+    def _key(owner: str, repo_name: str, preference: Sequence[str]) -> str:
+        # the winner depends on the order branches were preferred in
+        return f"{owner}/{repo_name}".lower() + ":" + ",".join(preference)
+
+    def remembered(self, owner: str, repo_name: str,
+                   preference: Sequence[str] = README_BRANCHES) -> Optional[str]:
+        """
+        Return the branch that held the repository's README last time it was
+        resolved with this order of preference.
+        """
+        with self._lock:
+            return self._memo().get(self._key(owner, repo_name, preference))
+
+    def remember(self, owner: str, repo_name: str, branch: Optional[str],
+                 preference: Sequence[str] = README_BRANCHES) -> None:
+        """
+        Record (or, with `branch=None`, forget) the repository's README branch
+        for an order of preference.
+        """
+        key = self._key(owner, repo_name, preference)
+        with self._lock:
+            memo = self._memo()
+            if memo.get(key) != branch:
+                if branch is None:
+                    memo.pop(key, None)
+                else:
+                    memo[key] = branch
+                self._dirty = True
+
+    def save(self) -> None:
+        """
+        Write the remembered branches to `path`, if any changed.
+        """
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self._winners, f, sort_keys=True)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+
+    def _race(self, owner: str, repo_name: str,
+              candidates: List[str]) -> Tuple[Optional[str], Optional[requests.Response]]:
+        # request every candidate at once, then take the first hit in preference order
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(candidates))))
+        try:
+            futures = [pool.submit(http_helpers.get, readme_url(owner, repo_name, branch)) for branch in candidates]
+            response = None
+            for branch, future in zip(candidates, futures):
+                response = future.result()
+                if response.status_code == 200:
+                    return branch, response
+            return None, response
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def resolve(self, owner: str, repo_name: str, preference: Sequence[str] = README_BRANCHES,
+                default_branch: Optional[str] = None,
+                branches: Optional[Iterable[str]] = None) -> Tuple[Optional[str], Optional[requests.Response]]:
+        """
+        Find the most preferred branch with a README.
+
+        Args:
+            owner (str): The owner of the GitHub repository.
+            repo_name (str): The name of the GitHub repository.
+            preference (Sequence[str]): Branches in order of preference.
+            default_branch (Optional[str]): The default branch, if known;
+                otherwise looked up if no preferred branch has a README.
+            branches (Optional[Iterable[str]]): All branch names, if known.
+
+        Returns:
+            Tuple[Optional[str], Optional[requests.Response]]: The winning
+                branch and its README response, or `None` and the response
+                of the last branch tried (`None` if no branch was tried).
+
+        Raises:
+            requests.exceptions.RequestException: If a request fails after retries.
+        """
+        preference = tuple(preference)
+        branches = list(branches) if branches is not None else None
+        candidates = candidate_branches(preference, default_branch, branches)
+        tried = set(candidates)
+        branch, response = None, None
+
+        remembered = self.remembered(owner, repo_name, preference)
+        # without a branch list, a higher-preference branch may have appeared
+        # since, but the remembered one is by far the most likely hit; it may
+        # also be a default branch that was looked up last time
+        if branches is None and remembered is not None and (remembered in tried or default_branch is None):
+            response = http_helpers.get(readme_url(owner, repo_name, remembered))
+            if response.status_code == 200:
+                return remembered, response
+            tried.add(remembered)
+            candidates = [candidate for candidate in candidates if candidate != remembered]
+
+        if candidates:
+            branch, response = self._race(owner, repo_name, candidates)
+        if branch is None and default_branch is None:
+            default_branch = git_helpers.get_default_branch(owner, repo_name)
+            if default_branch is not None and default_branch not in tried and (
+                    branches is None or default_branch in branches):
+                branch, response = self._race(owner, repo_name, [default_branch])
+        self.remember(owner, repo_name, branch, preference)
+        return branch, response
+
+
+_resolver: Optional[ReadmeResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> ReadmeResolver:
+    """
+    Return the shared resolver. Winning branches are saved alongside the
+    HTTP cache, and kept in memory only when the cache is disabled.
+    """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            path = DEFAULT_MEMO_PATH if http_helpers.settings["cache_enabled"] else None
+            _resolver = ReadmeResolver(path)
+        return _resolver
+
+
+def fetch_readme_text(owner: str, repo_name: str, preference: Sequence[str] = README_BRANCHES,
+                      default_branch: Optional[str] = None,
+                      branches: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Fetch the README of the most preferred branch that has one.
+
+    Args:
+        owner (str): The owner of the GitHub repository.
+        repo_name (str): The name of the GitHub repository.
+        preference (Sequence[str]): Branches in order of preference.
+        default_branch (Optional[str]): The default branch, if known;
+            otherwise looked up if no preferred branch has a README.
+        branches (Optional[Iterable[str]]): All branch names, if known.
+
+    Returns:
+        Optional[str]: README text, or `None` if no candidate branch has one.
+    """
+    if mirror_helpers.enabled():
+        # a mirror knows its default branch without a request, so it always joins the lookup
+        default_branch = default_branch or mirror_helpers.get_default_branch(owner, repo_name)
+        return mirror_helpers.read_first(owner, repo_name, candidate_branches(preference, default_branch, branches),
+                                         "README.md")[1]
+    branch, response = get_resolver().resolve(owner, repo_name, preference, default_branch, branches)
+    return response.text if branch is not None else None
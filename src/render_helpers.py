@@ -0,0 +1,150 @@
+# <--- python stuff --->
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+
+RENDER_CACHE_SIZE = 4096
+# below this many documents to render, a process pool costs more than it saves
+MIN_PARALLEL = 16
+
+_rendered: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    """
+    SHA-256 hex digest of a document, used as its cache key.
+    """
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _render(text: str) -> str:
+    import markdown2
+    return str(markdown2.markdown(text))
+
+
+def _cached(key: str) -> Optional[str]:
+    with _lock:
+        html = _rendered.get(key)
+        if html is not None:
+            _rendered.move_to_end(key)
+        return html
+
+
+def _store(key: str, html: str) -> None:
+    with _lock:
+        _rendered[key] = html
+        _rendered.move_to_end(key)
+        while len(_rendered) > RENDER_CACHE_SIZE:
+            _rendered.popitem(last=False)
+
+
+def render_markdown(text: str) -> str:
+    """
+    Render Markdown to HTML with markdown2, reusing the result for any
+    document with the same content.
+
+    Args:
+        text (str): Markdown source.
+
+    Returns:
+        str: Rendered HTML.
+    """
+    key = content_hash(text)
+    html = _cached(key)
+    if html is None:
+        html = _render(text)
+        _store(key, html)
+    return html
+
+
+@contextmanager
+def render_pool(processes: Optional[int] = None) -> Iterator[Optional[Executor]]:
+    """
+    A process pool to share between `render_markdown_many` calls, so that a
+    run rendering in batches starts its workers once. The workers are only
+    started once something is rendered in them.
+
+    Args:
+        processes (Optional[int]): Worker processes (default: one per core).
+
+    Yields:
+        Optional[Executor]: The pool, or None for a single process.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        yield pool
+
+
+def render_markdown_many(documents: Iterable, processes: Optional[int] = None, chunksize: int = 4,
+                         executor: Optional[Executor] = None) -> List:
+    """
+    Render many documents, each distinct one once, across a process pool.
+
+    Args:
+        documents (Iterable): Markdown sources; anything that is not a
+            string (False, None, NaN) is passed through as False.
+        processes (Optional[int]): Worker processes (default: one per core);
+            1 renders in this process. Ignored with `executor`.
+        chunksize (int): Documents sent to a worker at a time.
+        executor (Optional[Executor]): Pool to render in, e.g. from
+            `render_pool`, instead of one started for this call.
+
+    Returns:
+        List: Rendered HTML (or False) per document.
+    """
+    documents = list(documents)
+    keys = [content_hash(text) if isinstance(text, str) else None for text in documents]
+
+    pending = {}
+    for key, text in zip(keys, documents):
+        if key is not None and key not in pending and _cached(key) is None:
+            pending[key] = text
+
+    processes = processes or os.cpu_count() or 1
+    if executor is not None and len(pending) >= MIN_PARALLEL:
+        rendered = list(executor.map(_render, pending.values(), chunksize=chunksize))
+    elif executor is None and processes > 1 and len(pending) >= MIN_PARALLEL:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            rendered = list(pool.map(_render, pending.values(), chunksize=chunksize))
+    else:
+        rendered = [_render(text) for text in pending.values()]
+
+    # keep this batch's results even if it is larger than the cache
+    results = dict(zip(pending, rendered))
+    for key, html in results.items():
+        _store(key, html)
+    rows = []
+    for key, text in zip(keys, documents):
+        if key is None:
+            rows.append(False)
+        else:
+            html = results.get(key)
+            rows.append(html if html is not None else render_markdown(text))
+    return rows
+
+
+def with_markdown_column(df, source: str = "html_content", target: str = "markdown_content",
+                         processes: Optional[int] = None):
+    """
+    Add the rendered HTML of a column of README sources, on request.
+
+    Args:
+        df (pd.DataFrame): DataFrame with a `source` column.
+        source (str): Column of Markdown sources (False where missing).
+        target (str): Column to write the rendered HTML (or False) to.
+        processes (Optional[int]): Worker processes, see `render_markdown_many`.
+
+    Returns:
+        pd.DataFrame: `df`, with `target` added.
+    """
+    df[target] = render_markdown_many(df[source], processes=processes)
+    return df
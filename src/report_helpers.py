@@ -0,0 +1,308 @@
+# <--- data stuff --->
+import pandas as pd
+from datetime import datetime, timezone
+
+# <--- python stuff --->
+import ast
+import contextlib
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# <--- custom --->
+from src.date_helpers import ISO_FORMAT
+
+
+# <--- report schemas --->
+PARQUET_COMPRESSION = "zstd"
+REPORT_FORMATS = ("csv", "parquet")
+
+# (column, type) pairs; types are resolved to pyarrow types by `_arrow_type`
+CANVAS_REPORT_FIELDS = [
+    ("phase", "int64"),
+    ("course_number", "int64"),
+    ("canvas_page_id", "int64"),
+    ("canvas_page_title", "string"),
+    ("canvas_page_url", "string"),
+    ("canvas_updated_at", "timestamp"),
+    ("git_url", "string"),
+    ("git_master_branch_dot_canvas", "bool"),
+    ("git_main_branch_dot_canvas", "bool"),
+    ("git_repo_all_branches_updates", "branch_updates"),
+]
+
+READING_TIME_FIELDS = [
+    ("git_repo_link", "string"),
+    ("html_content", "string"),
+    ("markdown_content", "string"),
+    ("adjusted_text_blocks", "int64"),
+    ("text_reading_times", "float64"),
+    ("raw_python_blocks", "int64"),
+    ("adjusted_python_blocks", "int64"),
+    ("python_reading_times", "float64"),
+    ("total_reading_times", "float64"),
+]
+
+# with a content store, README bodies are replaced by their hashes
+READING_TIME_STORE_FIELDS = [("git_repo_link", "string"), ("readme_hash", "string"), ("markdown_hash", "string")] \
+    + READING_TIME_FIELDS[3:]
+
+
+def require_pyarrow():
+    """
+    Import pyarrow, which is only needed for Parquet reports.
+
+    Returns:
+        module: The `pyarrow` module.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet reports require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def check_format(output_format: str) -> None:
+    """
+    Validate a report format, and for Parquet that pyarrow is available,
+    before any work is done.
+
+    Raises:
+        ValueError: If the format is not one of `REPORT_FORMATS`.
+        ImportError: If the format is Parquet and pyarrow is not installed.
+    """
+    if output_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{output_format}', expected one of {REPORT_FORMATS}")
+    if output_format == "parquet":
+        require_pyarrow()
+
+
+def _arrow_type(name: str):
+    pa = require_pyarrow()
+    timestamp = pa.timestamp("ms", tz="UTC")
+    return {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "string": pa.string(),
+        "timestamp": timestamp,
+        "branch_updates": pa.map_(pa.string(), timestamp),
+    }[name]
+
+
+def report_schema(fields: List[tuple]):
+    """
+    Build the pyarrow schema of a report.
+
+    Args:
+        fields (List[tuple]): `CANVAS_REPORT_FIELDS` or `READING_TIME_FIELDS`.
+
+    Returns:
+        pyarrow.Schema: The schema, every column nullable.
+    """
+    pa = require_pyarrow()
+    return pa.schema([pa.field(name, _arrow_type(kind)) for name, kind in fields])
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if value is None or value is False or (isinstance(value, float) and pd.isna(value)):
+        return None
+    stamp = pd.to_datetime(value, utc=True, errors="coerce")
+    return None if pd.isna(stamp) else stamp.to_pydatetime().replace(microsecond=0)
+
+
+def _branch_updates(value) -> Optional[list]:
+    # `{False}` (no repository) and anything unparsable become null
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return None
+    if not isinstance(value, dict):
+        return None
+    return [(str(branch), _timestamp(date)) for branch, date in value.items()]
+
+
+def _typed_column(series: pd.Series, kind: str) -> list:
+    # pyarrow takes None, not pd.NA, for a missing value
+    if kind == "int64":
+        return [None if value is pd.NA else value for value in pd.to_numeric(series, errors="coerce").astype("Int64")]
+    if kind == "float64":
+        return [None if value is pd.NA else value
+                for value in pd.to_numeric(series, errors="coerce").astype("Float64")]
+    if kind == "bool":
+        return [value is True or value == "True" for value in series]
+    if kind == "string":
+        # `False` (and "False" read back from a CSV) marks a missing value
+        return [None if value is False or value == "False" or value == "" or pd.isna(value) else str(value)
+                for value in series]
+    if kind == "timestamp":
+        return [_timestamp(value) for value in series]
+    return [_branch_updates(value) for value in series]
+
+
+def to_table(df: pd.DataFrame, fields: List[tuple]):
+    """
+    Convert a report DataFrame to a pyarrow Table with a fixed schema.
+
+    Columns not in `fields` (e.g. the per-branch columns added by
+    `extract_dict_values`, which the `git_repo_all_branches_updates` map
+    already holds) are dropped.
+
+    Args:
+        df (pd.DataFrame): Report as built for the CSV output.
+        fields (List[tuple]): `CANVAS_REPORT_FIELDS` or `READING_TIME_FIELDS`.
+
+    Returns:
+        pyarrow.Table: The typed report.
+    """
+    pa = require_pyarrow()
+    columns = [pa.array(_typed_column(df[name], kind), type=_arrow_type(kind)) for name, kind in fields]
+    return pa.Table.from_arrays(columns, schema=report_schema(fields))
+
+
+def write_parquet(df: pd.DataFrame, path: str, fields: List[tuple], compression: str = PARQUET_COMPRESSION) -> None:
+    """
+    Write a report DataFrame as a compressed Parquet file.
+
+    Args:
+        df (pd.DataFrame): The report.
+        path (str): Output path.
+        fields (List[tuple]): `CANVAS_REPORT_FIELDS` or `READING_TIME_FIELDS`.
+        compression (str): Parquet compression codec.
+    """
+    require_pyarrow().parquet.write_table(to_table(df, fields), path, compression=compression)
+
+
+def write_parquet_chunks(chunks: Iterable[pd.DataFrame], path: str, fields: List[tuple],
+                         compression: str = PARQUET_COMPRESSION) -> None:
+    """
+    Write a report one DataFrame chunk (row group) at a time.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Consecutive slices of the report.
+        path (str): Output path.
+        fields (List[tuple]): `CANVAS_REPORT_FIELDS` or `READING_TIME_FIELDS`.
+        compression (str): Parquet compression codec.
+    """
+    pq = require_pyarrow().parquet
+    with pq.ParquetWriter(path, report_schema(fields), compression=compression) as writer:
+        for chunk in chunks:
+            writer.write_table(to_table(chunk, fields))
+
+
+@contextlib.contextmanager
+def chunk_writer(path: str, output_format: str, fields: List[tuple],
+                 compression: str = PARQUET_COMPRESSION) -> Iterator[Callable[[pd.DataFrame], None]]:
+    """
+    Write a report as its chunks become available, producing the same file
+    as writing the whole report at once (with one Parquet row group per
+    chunk).
+
+    Args:
+        path (str): Output path.
+        output_format (str): "csv" or "parquet".
+        fields (List[tuple]): Parquet schema, `CANVAS_REPORT_FIELDS` or
+            `READING_TIME_FIELDS`.
+        compression (str): Parquet compression codec.
+
+    Yields:
+        Callable[[pd.DataFrame], None]: Writes the next chunk; the first
+            one written (even if empty) provides the CSV header.
+    """
+    if output_format == "parquet":
+        pq = require_pyarrow().parquet
+        with pq.ParquetWriter(path, report_schema(fields), compression=compression) as writer:
+            yield lambda chunk: writer.write_table(to_table(chunk, fields))
+        return
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        written = []
+
+        def write(chunk: pd.DataFrame) -> None:
+            chunk.to_csv(f, header=not written, index=False)
+            written.append(len(chunk))
+        yield write
+
+
+def read_report(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a CSV or Parquet report, optionally only some of its columns.
+
+    With Parquet, only the requested columns are read from disk.
+
+    Args:
+        path (str): Report path; the format is taken from the extension.
+        columns (List[str]): Columns to load, or None for all of them.
+
+    Returns:
+        pd.DataFrame: The report.
+    """
+    if path.endswith(".parquet"):
+        pq = require_pyarrow().parquet
+        return pq.read_table(path, columns=columns).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def read_canvas_report(path: str) -> pd.DataFrame:
+    """
+    Read a Canvas report with the values its CSV form would hold, as
+    incremental reports expect: ISO 8601 date strings, `False` for a
+    missing page URL and the branch updates as a dict literal (`"{False}"`
+    if the repository could not be read).
+
+    Args:
+        path (str): Path of a `.csv` or `.parquet` Canvas report.
+
+    Returns:
+        pd.DataFrame: The report.
+    """
+    df = read_report(path)
+    # a CSV holds the missing page URL as the text "False", a Parquet file as null
+    urls = df["canvas_page_url"].astype(object)
+    df["canvas_page_url"] = urls.where(urls.notna() & (urls != "False"), False)
+    if not path.endswith(".parquet"):
+        return df
+
+    def iso(stamp):
+        return stamp.astimezone(timezone.utc).strftime(ISO_FORMAT) if stamp is not None and not pd.isna(stamp) else None
+
+    df["canvas_updated_at"] = [iso(stamp) for stamp in df["canvas_updated_at"]]
+    df["git_repo_all_branches_updates"] = [
+        str({branch: iso(date) for branch, date in updates}) if updates is not None else str({False})
+        for updates in df["git_repo_all_branches_updates"]
+    ]
+    return df
+
+
+def branch_names(updates) -> Optional[List[str]]:
+    """
+    Branch names from a report's `git_repo_all_branches_updates` value.
+
+    Args:
+        updates: A dict, its CSV literal, or a Parquet map (list of pairs).
+
+    Returns:
+        Optional[List[str]]: The branches, or None where the repository
+            could not be read.
+    """
+    if isinstance(updates, str):
+        try:
+            updates = ast.literal_eval(updates)
+        except (ValueError, SyntaxError):
+            return None
+    if isinstance(updates, dict):
+        return [str(branch) for branch in updates]
+    if isinstance(updates, list):
+        return [str(branch) for branch, _ in updates]
+    return None
+
+
+def report_extension(output_format: str) -> str:
+    """
+    File extension for a report format.
+    """
+    return {"csv": ".csv", "parquet": ".parquet"}[output_format]
+
@@ -1,41 +1,60 @@
 # <--- api stuff --->
 import os
-import requests
-from dotenv import load_dotenv
-load_dotenv()
 
-# <--- text processing stuff --->
-import re
-import markdown
-import markdown2
-from bs4 import BeautifulSoup
+# <--- python stuff --->
+import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # <--- data stuff --->
 import pandas as pd
-import csv
 from datetime import datetime
 
-# <--- canvas stuff --->
-from canvasapi import Canvas
-from canvas_helpers import *
+# <--- custom --->
+from src.git_helpers import canonical_repo_url, fan_out, get_github_details, repo_key
+from src.metrics_helpers import report_metrics
+from src.readme_helpers import fetch_readme_text, get_resolver
+from src.render_helpers import render_markdown, render_markdown_many, render_pool, with_markdown_column
+from src.reading_helpers import WORDS_PER_MINUTE, reading_stats, reading_stats_frame, stats_frame
+from src.report_helpers import (READING_TIME_FIELDS, READING_TIME_STORE_FIELDS, branch_names, check_format,
+                                chunk_writer, read_report, report_extension, write_parquet)
+from src.shard_helpers import ROW_COLUMN, check_shards, shard_path, shard_rows
+from src.store_helpers import get_store
 
-# <--- canvas credentials --->
-canvas_token = os.environ.get('CANVAS_TOKEN')
-canvas_instance = "https://learning.flatironschool.com"
-canvas = Canvas(canvas_instance, canvas_token)
-headers = {"Authorization": f"Bearer {canvas_token}"}
+# READMEs loaded from the content store per rendering batch
+RENDER_BATCH_SIZE = 64
+# Lessons each bounded queue between the pipeline's stages holds
+PIPELINE_QUEUE_SIZE = 64
+# Lessons the pipeline's writer stage estimates and writes at a time
+PIPELINE_BATCH_SIZE = 256
+
+
+def __getattr__(name):
+    # the Canvas client used to be built at import time
+    if name == "canvas":
+        from src.client_helpers import get_canvas
+        return get_canvas()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# <--- custom --->
-from markdown_helpers import *
-from git_helpers import *
-from pandas_helpers import *
 
-def build_github_df(links):
+def build_github_df(links, max_workers=1, branches=None, markdown=False, store=None):
     """
     Build a DataFrame with GitHub assignment details including HTML and Markdown content.
 
+    Each unique repository's README is fetched once and shared by every
+    link that points at it. READMEs are only rendered (`markdown_content`)
+    when `markdown` is set, after every fetch is done; the rendering can
+    also be requested later with `render_helpers.with_markdown_column`.
+
     Args:
         links (list): List of GitHub repository links.
+        max_workers (int): Repositories fetched concurrently.
+        branches (dict): Known branch names by `repo_key`, from the Canvas
+            report; branches a repository does not have are not tried.
+        markdown (bool): Add the rendered `markdown_content` column.
+        store (store_helpers.ContentStore): Save READMEs (and rendered
+            markdown) to this store as they arrive, and keep only their
+            hashes, in `readme_hash` (and `markdown_hash`).
 
     Returns:
         pd.DataFrame: DataFrame with assignment details.
@@ -46,91 +65,411 @@ def build_github_df(links):
     columns = ["git_repo_link"]
     df = pd.DataFrame(links, columns=columns)
 
-    html_content = []
-    markdown_content = []
-
-    for url in links:
-        if isinstance(url, str):
-            url = url.replace("/blob/main/README.md", "")
-            url = url.replace("/blob/master/README.md", "")
-            github_repo, github_username = get_github_details(url)
-
-            # Check for curriculum branch
-            github_curriculum_url = f"https://raw.githubusercontent.com/{github_username}/{github_repo}/curriculum/README.md"
-            response = requests.get(github_curriculum_url)
-
-            if response.status_code == 200:
-                html_content.append(response.text)
-                markdown_content.append(markdown2.markdown(response.text))
-                continue  # Move on to the next repo
-
-            # Check for other common branches
-            branches = ["master", "main", "solution"]
-            for branch in branches:
-                github_branch_url = f"https://raw.githubusercontent.com/{github_username}/{github_repo}/{branch}/README.md"
-                response = requests.get(github_branch_url)
-                if response.status_code == 200:
-                    html_content.append(response.text)
-                    markdown_content.append(markdown2.markdown(response.text))
-                    break  # Found a valid branch, stop checking other branches
-
-            else:
-                # No branch found, append False values
-                html_content.append(False)
-                markdown_content.append(False)
-        else:
-            html_content.append(False)
-            markdown_content.append(False)
-
-    df["html_content"] = html_content
-    df["markdown_content"] = markdown_content
+    branches = branches or {}
+
+    def fetch(url):
+        readme = fetch_readme(url, branches.get(repo_key(url)))
+        return store.put(readme) if store is not None and readme is not None else readme
+
+    readmes = fan_out([url if isinstance(url, str) else None for url in links], fetch, max_workers)
+    get_resolver().save()
+
+    if store is not None:
+        df["readme_hash"] = readmes
+        if markdown:
+            df["markdown_hash"] = store_markdown(readmes, store)
+        return df
+
+    df["html_content"] = [readme if readme is not None else False for readme in readmes]
+    if markdown:
+        df = with_markdown_column(df)
 
     return df
 
 
-def get_reading_times(df:pd.DataFrame)->(pd.DataFrame):
-    df["soup_raw_text"] = df["html_content"].apply(
-                                        lambda x: BeautifulSoup(x, 'html.parser') if x != False else False)
-    df["raw_text_blocks"] = df["soup_raw_text"].apply(
-                                        lambda x: list(x.find_all(string=True)) if x != False else False)
-    df["adjusted_text_blocks"] = df["raw_text_blocks"].apply(
-                                        lambda x: sum([len(n.split(" ")) for n in x]) if x != False else False)
-    df["text_reading_times"] = df["adjusted_text_blocks"].apply(
-                                                lambda x: round((x/200), 0) if x != False else False)
-    df["soup_raw_python"] = df["html_content"].apply(lambda x: list(re.findall('```python.*\n.*', x)) if x != False else False)
-    df["raw_python_blocks"] = df["soup_raw_python"].apply(lambda x: len(x) if x != False else False)
-    df["adjusted_python_blocks"] = df["soup_raw_python"].apply(
-                                        lambda x: sum([len(n.split(" ")) for n in x]) if x != False else False)
-    df["python_reading_times"] = df["adjusted_python_blocks"].apply(lambda x: round(x*2/200, 0) + 5)
-    df["total_reading_times"] = df["text_reading_times"] + df["python_reading_times"]
-    df["total_reading_times"] = df["total_reading_times"].apply(lambda x: x -5 if x in [0, False] else x)
+def store_markdown(digests, store):
+    """
+    Render stored READMEs and store the results, a batch at a time, in one
+    process pool for all the batches.
+
+    Args:
+        digests (list): README hashes (None where missing).
+        store (store_helpers.ContentStore): Content store.
+
+    Returns:
+        list: Hash of each rendered README (None where missing).
+    """
+    unique = list(dict.fromkeys(digest for digest in digests if digest is not None))
+    rendered = {}
+    with render_pool() as pool:
+        for start in range(0, len(unique), RENDER_BATCH_SIZE):
+            batch = unique[start:start + RENDER_BATCH_SIZE]
+            htmls = render_markdown_many((store.read_text(digest) for digest in batch), executor=pool)
+            rendered.update((digest, store.put(html)) for digest, html in zip(batch, htmls))
+    return [rendered.get(digest) for digest in digests]
+
+
+def fetch_readme(url, branches=None):
+    """
+    Fetch the raw README of a repository from the first of the `curriculum`,
+    `master`, `main` and `solution` branches that has one.
+
+    Args:
+        url (str): GitHub repository link.
+        branches (list): The repository's branch names, if known.
+
+    Returns:
+        str or None: README text, or `None` if no branch has one.
+    """
+    if url is None:
+        return None
+    github_repo, github_username = get_github_details(url)
+    return fetch_readme_text(github_username, github_repo, branches=branches)
+
+
+def get_reading_times(df:pd.DataFrame, store=None)->(pd.DataFrame):
+    """
+    Estimate reading times from the README content in `html_content`, or
+    with a content store, from the READMEs `readme_hash` points to, each
+    streamed from disk in chunks.
+
+    Word and python block counts are computed in one pass per document, and
+    only the numeric results are kept, as nullable Int64/Float64 columns
+    (missing where a repo has no README).
+
+    Args:
+        df (pd.DataFrame): DataFrame from `build_github_df`.
+        store (store_helpers.ContentStore): The store `df` was built with.
+
+    Returns:
+        pd.DataFrame: Rows with README content, with reading time columns added.
+    """
+    content = "readme_hash" if store is not None else "html_content"
+    return add_reading_times(df, reading_stats_frame(df[content], store=store), store=store)
+
+
+def add_reading_times(df, stats, store=None):
+    """
+    Add the reading time columns computed from a `reading_stats_frame` to a
+    `build_github_df` frame, and keep the rows with README content.
+
+    Args:
+        df (pd.DataFrame): DataFrame from `build_github_df`.
+        stats (pd.DataFrame): Counts per row of `df`, indexed like it.
+        store (store_helpers.ContentStore): The store `df` was built with.
+
+    Returns:
+        pd.DataFrame: Rows with README content, with reading time columns added.
+    """
+    df["adjusted_text_blocks"] = stats["text_words"]
+    df["text_reading_times"] = (stats["text_words"] / WORDS_PER_MINUTE).round(0)
+    df["raw_python_blocks"] = stats["python_blocks"]
+    df["adjusted_python_blocks"] = stats["python_words"]
+    df["python_reading_times"] = (stats["python_words"] * 2 / WORDS_PER_MINUTE).round(0) + 5
+    total = df["text_reading_times"] + df["python_reading_times"]
+    df["total_reading_times"] = total.mask((total == 0).fillna(False), total - 5)
     df = df.dropna(subset=['git_repo_link'])
+    if store is not None:
+        return df.dropna(subset=['readme_hash'])
     df = df[df['html_content'] != False]
     return df
 
-def generate_reading_time_reports():
+
+def parse_readme(readme):
+    """
+    Render a README and count the words behind its reading time.
+
+    Args:
+        readme (str): README text.
+
+    Returns:
+        tuple: Rendered HTML, and the `reading_stats` of the README.
+    """
+    return render_markdown(readme), reading_stats(readme)
+
+
+async def _once(results, uses, key, compute):
+    # the first row of a repository computes its result, later rows await it;
+    # it is dropped once the repository's last row has it
+    future = results.get(key)
+    if future is None:
+        future = results[key] = asyncio.get_running_loop().create_future()
+        try:
+            future.set_result(await compute())
+        except Exception as e:
+            future.set_exception(e)
+    try:
+        return await future
+    finally:
+        uses[key] -= 1
+        if not uses[key]:
+            del results[key]
+
+
+async def _stage(worker, workers, inbox, outbox, downstream):
+    # run a stage's workers until the input runs out, then tell the next stage's workers
+    await asyncio.gather(*(worker(inbox, outbox) for _ in range(workers)))
+    for _ in range(downstream):
+        await outbox.put(None)
+
+
+async def reading_time_pipeline(links, write, branches=None, store=None, fetch_workers=8, parse_workers=1,
+                                queue_size=PIPELINE_QUEUE_SIZE, batch_size=PIPELINE_BATCH_SIZE):
+    """
+    Estimate reading times with the fetch, parse and write stages running
+    concurrently, connected by bounded queues.
+
+    The fetch stage downloads READMEs on `fetch_workers` threads while the
+    parse stage renders them and counts their words (in a thread, or with
+    `parse_workers` > 1, across that many processes), and the writer puts
+    the rows back in order and estimates and writes them `batch_size` at a
+    time. At most `2 * queue_size + fetch_workers + parse_workers` lessons
+    are in flight, so a slow stage holds the others back instead of rows
+    piling up in memory.
+
+    Each repository is fetched and parsed once for all of its links, and
+    the rows written are those `get_reading_times(build_github_df(...))`
+    would return, in the same order.
+
+    Args:
+        links (list): GitHub repository links (None where a lesson has none).
+        write (Callable): Called with each batch of estimated rows, as from
+            `report_helpers.chunk_writer`; always called at least once.
+        branches (dict): Known branch names by `repo_key`.
+        store (store_helpers.ContentStore): Save READMEs and rendered
+            markdown to this store and write only their hashes.
+        fetch_workers (int): READMEs fetched concurrently.
+        parse_workers (int): READMEs parsed concurrently.
+        queue_size (int): Lessons each queue between two stages holds.
+        batch_size (int): Lessons estimated and written at a time.
+
+    Returns:
+        float: Total reading time of the lessons written, in minutes.
+    """
+    loop = asyncio.get_running_loop()
+    branches = branches or {}
+    links = [url if isinstance(url, str) else None for url in links]
+    # links that are not repository links are fetched once per lesson, like `fan_out` does
+    keys = [repo_key(url) or (position,) for position, url in enumerate(links)]
+    uses = {"fetch": Counter(keys), "parse": Counter(keys)}
+    results = {"fetch": {}, "parse": {}}
+
+    todo = asyncio.Queue(queue_size)
+    fetched = asyncio.Queue(queue_size)
+    parsed = asyncio.Queue(queue_size)
+    window = asyncio.Semaphore(2 * queue_size + fetch_workers + parse_workers)
+    total = [0.0]
+
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 1 else ThreadPoolExecutor(1)
+    write_pool = ThreadPoolExecutor(1)
+
+    async def feed():
+        for position, url in enumerate(links):
+            await window.acquire()
+            await todo.put(position)
+        for _ in range(fetch_workers):
+            await todo.put(None)
+
+    def download(position):
+        url = links[position]
+        readme = fetch_readme(canonical_repo_url(url) or url, branches.get(repo_key(url)))
+        return readme, store.put(readme) if store is not None and readme is not None else None
+
+    async def fetch(inbox, outbox):
+        while (position := await inbox.get()) is not None:
+            readme = (None, None)
+            if links[position] is not None:
+                readme = await _once(results["fetch"], uses["fetch"], keys[position],
+                                     lambda: loop.run_in_executor(fetch_pool, download, position))
+            await outbox.put((position, readme))
+
+    async def parse_once(text):
+        html, stats = await loop.run_in_executor(parse_pool, parse_readme, text)
+        if store is not None:
+            html = await loop.run_in_executor(fetch_pool, store.put, html)
+        return html, stats
+
+    async def parse(inbox, outbox):
+        while (item := await inbox.get()) is not None:
+            position, (text, digest) = item
+            missing = None if store is not None else False
+            row = (links[position], missing, missing, (None, None, None))
+            if text is not None:
+                html, stats = await _once(results["parse"], uses["parse"], keys[position], lambda: parse_once(text))
+                row = (links[position], digest if store is not None else text, html, stats)
+            elif links[position] is not None:
+                uses["parse"][keys[position]] -= 1
+            await outbox.put((position, row))
+
+    def estimate(positions, rows):
+        content = ["readme_hash", "markdown_hash"] if store is not None else ["html_content", "markdown_content"]
+        df = pd.DataFrame([row[:3] for row in rows], index=positions, columns=["git_repo_link", *content])
+        df = add_reading_times(df, stats_frame((row[3] for row in rows), index=positions), store=store)
+        write(df)
+        return df["total_reading_times"].sum()
+
+    async def flush(positions, rows):
+        total[0] += await loop.run_in_executor(write_pool, estimate, positions, rows)
+
+    async def writer():
+        pending, positions, rows = {}, [], []
+        done = 0
+        while done < len(links):
+            position, row = await parsed.get()
+            pending[position] = row
+            while done in pending:
+                positions.append(done)
+                rows.append(pending.pop(done))
+                done += 1
+                window.release()
+                if len(rows) == batch_size:
+                    await flush(positions, rows)
+                    positions, rows = [], []
+        if rows or not done:
+            await flush(positions, rows)
+
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in (
+        feed(),
+        _stage(fetch, fetch_workers, todo, fetched, parse_workers),
+        _stage(parse, parse_workers, fetched, parsed, 0),
+        writer(),
+    )]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        for pool in (fetch_pool, parse_pool, write_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
+        get_resolver().save()
+    return total[0]
+
+@report_metrics
+def generate_reading_time_reports(input_filename="./canvas_reports/canvas_report_202306221.csv", output_format="csv",
+                                  content_store=False, shard=None, max_workers=1, pipeline=False, parse_workers=1,
+                                  queue_size=PIPELINE_QUEUE_SIZE):
+    """
+    Estimate reading times for the lessons of a Canvas report and save them.
+
+    Args:
+        input_filename (str): Canvas report, `.csv` or `.parquet`. Only its
+            `git_url` and `git_repo_all_branches_updates` columns are read.
+        output_format (str): "csv", or "parquet" for a compressed file with
+            the fixed schema of `report_helpers.READING_TIME_FIELDS`
+            (requires pyarrow).
+        content_store (bool): Keep README bodies in the shared content
+            store (`store_helpers.get_store`) and write only their hashes,
+            `readme_hash` and `markdown_hash`, to the report.
+        shard (tuple): (i, n) to only estimate the lessons of the i-th of n
+            partitions of the repositories (see `shard_helpers.shard_of`),
+            writing a partial CSV report for `merge_reading_time_reports`.
+        max_workers (int): Repositories fetched concurrently.
+        pipeline (bool): Fetch, parse and write concurrently, with bounded
+            queues between the stages (see `reading_time_pipeline`),
+            instead of one stage after the other. The report is the same.
+        parse_workers (int): With `pipeline`, READMEs parsed concurrently.
+        queue_size (int): With `pipeline`, lessons each queue holds.
+
+    Returns:
+        str: Path of the reading time report.
+    """
+    check_format(output_format)
+
     # Step 0: Check and create 'reading_time_reports' directory if it doesn't exist
     reports_dir = "reading_time_reports"
     if not os.path.exists(reports_dir):
         os.makedirs(reports_dir)
 
-    input_filename = "./canvas_reports/canvas_report_202306221.csv"
-    output_filename = f"reading_time_estimates_{datetime.now().strftime('%Y%m%d%H%M%S')[:12]}.csv"
+    output_filename = (f"reading_time_estimates_{datetime.now().strftime('%Y%m%d%H%M%S')[:12]}"
+                       f"{report_extension(output_format)}")
+
+    lessons = read_report(input_filename, columns=["git_url", "git_repo_all_branches_updates"])
+    links = [url if isinstance(url, str) else None for url in lessons["git_url"]]
+    branches = {}
+    for url, updates in zip(links, lessons["git_repo_all_branches_updates"]):
+        names = branch_names(updates)
+        if url is not None and names is not None:
+            branches[repo_key(url)] = names
 
-    lessons = pd.read_csv(input_filename)
-    links = list(lessons["git_url"])
+    positions = None
+    if shard is not None:
+        positions = shard_rows(links, shard)
+        links = [links[position] for position in positions]
+        output_filename = os.path.basename(shard_path(reports_dir, "reading_time_estimates", shard))
+        print(f"[*] Shard {shard[0]}/{shard[1]}: {len(links)} lessons")
 
-    df = build_github_df(links)
-    reading_times = get_reading_times(df)
+    store = get_store() if content_store else None
+    output_filepath = os.path.join(reports_dir, output_filename)
+    fields = READING_TIME_STORE_FIELDS if store else READING_TIME_FIELDS
+
+    def with_positions(reading_times):
+        if positions is not None:
+            # position in the Canvas report, for `merge_reading_time_reports` to restore the order
+            reading_times[ROW_COLUMN] = [positions[n] for n in reading_times.index]
+        return reading_times
+
+    if pipeline:
+        with chunk_writer(output_filepath, output_format if shard is None else "csv", fields) as write:
+            reading_minutes = asyncio.run(reading_time_pipeline(
+                links, lambda chunk: write(with_positions(chunk)), branches=branches, store=store,
+                fetch_workers=max_workers, parse_workers=parse_workers, queue_size=queue_size))
+    else:
+        df = build_github_df(links, max_workers=max_workers, branches=branches, markdown=True, store=store)
+        reading_times = with_positions(get_reading_times(df, store=store))
+        reading_minutes = reading_times["total_reading_times"].sum()
 
-    reading_minutes = reading_times["total_reading_times"].sum()
     reading_hours = round(reading_minutes / 60, 1)
 
     print(f"\nTotal Reading Time: {reading_hours} minutes\n")
 
-    output_filepath = os.path.join(reports_dir, output_filename)
-    reading_times.to_csv(output_filepath, index=False)
+    # the pipeline has written its rows already
+    if not pipeline and output_format == "parquet" and shard is None:
+        write_parquet(reading_times, output_filepath, fields)
+    elif not pipeline:
+        reading_times.to_csv(output_filepath, index=False)
 
     print(f"Reading Times saved to {output_filepath}")
     
-    return output_filepath
\ No newline at end of file
+    return output_filepath
+
+
+def merge_reading_time_reports(paths, output_format="csv", reports_dir="reading_time_reports"):
+    """
+    Combine the partial reports of every shard into one reading time
+    report, with the rows in the order of the Canvas report.
+
+    Args:
+        paths (list): One partial report per shard, from
+            `generate_reading_time_reports(shard=...)`, in any order.
+        output_format (str): "csv" or "parquet".
+        reports_dir (str): Directory the report is written to.
+
+    Returns:
+        str: Path of the merged report.
+
+    Raises:
+        ValueError: If the shards are incomplete (see `shard_helpers.check_shards`).
+    """
+    check_format(output_format)
+    paths = check_shards(paths)
+
+    # read as text, so values are written back exactly as each shard wrote them
+    df = pd.concat([pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths], ignore_index=True)
+    df = df.sort_values(ROW_COLUMN, key=lambda rows: rows.astype(int), kind="stable")
+    df = df.drop(columns=ROW_COLUMN).reset_index(drop=True)
+
+    reading_minutes = pd.to_numeric(df["total_reading_times"], errors="coerce").sum()
+    print(f"\nTotal Reading Time: {round(reading_minutes / 60, 1)} minutes\n")
+
+    os.makedirs(reports_dir, exist_ok=True)
+    output_filepath = os.path.join(reports_dir, f"reading_time_estimates_{datetime.now().strftime('%Y%m%d%H%M%S')[:12]}"
+                                                f"{report_extension(output_format)}")
+    if output_format == "parquet":
+        fields = READING_TIME_STORE_FIELDS if "readme_hash" in df.columns else READING_TIME_FIELDS
+        write_parquet(df, output_filepath, fields)
+    else:
+        df.to_csv(output_filepath, index=False)
+
+    print(f"Reading Times merged from {len(paths)} shards to {output_filepath}")
+    return output_filepath
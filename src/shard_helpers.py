@@ -0,0 +1,112 @@
+# <--- text processing stuff --->
+import re
+
+# <--- python stuff --->
+import os
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+# <--- custom --->
+from src.git_helpers import repo_key
+
+
+# Column of a shard's partial report holding each row's position in the full report
+ROW_COLUMN = "report_row"
+SHARD_PATTERN = re.compile(r"\.shard-(\d+)-of-(\d+)\.")
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """
+    Parse a `--shard i/n` argument.
+
+    Args:
+        text (str): Shard number and count, e.g. "2/4" (shards count from 1).
+
+    Returns:
+        Tuple[int, int]: (i, n).
+
+    Raises:
+        ValueError: If `text` is not of the form i/n with 1 <= i <= n.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", text)
+    if match is None or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard '{text}', expected i/n with 1 <= i <= n (e.g. 2/4)")
+    return int(match.group(1)), int(match.group(2))
+
+
+def shard_of(url: Optional[str], count: int) -> int:
+    """
+    The shard a lesson belongs to: the CRC-32 of its repository's canonical
+    key, so every link to a repository lands in the same shard on every
+    machine. Lessons without a repository go to shard 1.
+
+    Args:
+        url (Optional[str]): The lesson's GitHub link.
+        count (int): Number of shards.
+
+    Returns:
+        int: Shard number, from 1 to `count`.
+    """
+    key = repo_key(url)
+    if key is None:
+        return 1
+    return 1 + zlib.crc32("/".join(key).encode("utf-8")) % count
+
+
+def shard_rows(urls: Sequence[Optional[str]], shard: Tuple[int, int]) -> List[int]:
+    """
+    Positions of the lessons that belong to a shard.
+
+    Args:
+        urls (Sequence[Optional[str]]): GitHub link per lesson.
+        shard (Tuple[int, int]): (i, n), as from `parse_shard`.
+
+    Returns:
+        List[int]: The positions, in order.
+    """
+    index, count = shard
+    return [position for position, url in enumerate(urls)
+            if shard_of(url if isinstance(url, str) else None, count) == index]
+
+
+def shard_path(reports_dir: str, stem: str, shard: Tuple[int, int]) -> str:
+    """
+    Path of a shard's partial report, e.g. `canvas_reports/canvas_report.shard-2-of-4.csv`.
+    """
+    return os.path.join(reports_dir, f"{stem}.shard-{shard[0]}-of-{shard[1]}.csv")
+
+
+def check_shards(paths: Sequence[str]) -> List[str]:
+    """
+    Order a set of partial reports by shard, checking that it is complete.
+
+    Args:
+        paths (Sequence[str]): Partial reports named by `shard_path`.
+
+    Returns:
+        List[str]: The paths, from shard 1 to n.
+
+    Raises:
+        ValueError: If a name carries no shard number, the shard counts
+            differ, or a shard is missing or given twice.
+    """
+    if not paths:
+        raise ValueError("No shard reports given")
+    shards = {}
+    counts = set()
+    for path in paths:
+        match = SHARD_PATTERN.search(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"'{path}' is not a shard report (expected a name like *.shard-1-of-4.csv)")
+        index, count = int(match.group(1)), int(match.group(2))
+        if index in shards:
+            raise ValueError(f"Shard {index} given twice: '{shards[index]}' and '{path}'")
+        shards[index] = path
+        counts.add(count)
+    if len(counts) != 1:
+        raise ValueError(f"Shard reports come from different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - set(shards))
+    if missing:
+        raise ValueError(f"Missing shard(s) {', '.join(map(str, missing))} of {count}")
+    return [shards[index] for index in sorted(shards)]
@@ -0,0 +1,129 @@
+# <--- data stuff --->
+import codecs
+import mmap
+import zlib
+
+# <--- python stuff --->
+import os
+import tempfile
+from typing import Iterator, Optional
+
+# <--- custom --->
+from src.cache_helpers import DEFAULT_CACHE_PATH
+from src.render_helpers import content_hash
+
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "DSC_CONTENT_STORE", os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "content"))
+CHUNK_SIZE = 64 * 1024
+
+
+class ContentStore:
+    """
+    Content-addressed store of zlib-compressed documents.
+
+    Each document is saved once under the SHA-256 of its text
+    (`objects/ab/cdef...`), however many lessons, branches or phases share
+    it, so reports only need to keep the hash. Documents are read back
+    through a memory map and decompressed chunk by chunk, so a reader never
+    needs the whole document in memory at once.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_PATH, level: int = 6):
+        """
+        Args:
+            root (str): Directory of the store, created on first write.
+            level (int): zlib compression level.
+        """
+        self.root = root
+        self.level = level
+
+    def path(self, digest: str) -> str:
+        """
+        Path of the compressed document with hash `digest`.
+        """
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, text: str) -> str:
+        """
+        Store a document, unless the same content is already stored.
+
+        Args:
+            text (str): Document text.
+
+        Returns:
+            str: Its content hash.
+        """
+        digest = content_hash(text)
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(text.encode("utf-8", "surrogatepass"), self.level))
+            # concurrent writers of the same content produce the same file
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return digest
+
+    def iter_text(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """
+        Stream a stored document.
+
+        Args:
+            digest (str): Content hash returned by `put`.
+            chunk_size (int): Compressed bytes decompressed per step.
+
+        Yields:
+            str: Consecutive pieces of the document.
+
+        Raises:
+            KeyError: If no document has this hash.
+        """
+        try:
+            f = open(self.path(digest), "rb")
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            inflate = zlib.decompressobj()
+            decoder = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+            for start in range(0, len(data), chunk_size):
+                text = decoder.decode(inflate.decompress(data[start:start + chunk_size]))
+                if text:
+                    yield text
+            text = decoder.decode(inflate.flush(), final=True)
+            if text:
+                yield text
+
+    def read_text(self, digest: str) -> str:
+        """
+        Read a whole stored document.
+
+        Args:
+            digest (str): Content hash returned by `put`.
+
+        Returns:
+            str: The document.
+        """
+        return "".join(self.iter_text(digest))
+
+
+_store: Optional[ContentStore] = None
+
+
+def get_store() -> ContentStore:
+    """
+    Return the shared store at `DEFAULT_STORE_PATH`.
+    """
+    global _store
+    if _store is None:
+        _store = ContentStore()
+    return _store
@@ -1,23 +1,86 @@
-from math import radians, cos, sin, asin, sqrt
-def haversine(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371 # Radius of earth in kilometers
+
+
+def haversine(lon1, lat1, lon2, lat2):
     """
-    Calculate the great circle distance between two points on the 
+    Calculate the great circle distance between two points on the
     earth (specified in decimal degrees), returns the distance in
-    meters.
-    All arguments must be of equal length.
+    kilometers.
+    Arguments may be scalars, or arrays/Series of equal length (or
+    broadcastable shapes), in which case distances are computed
+    element-wise in one vectorized pass.
     :param lon1: longitude of first place
     :param lat1: latitude of first place
     :param lon2: longitude of second place
     :param lat2: latitude of second place
-    :return: distance in meters between the two sets of coordinates
+    :return: distance in kilometers between the two sets of coordinates;
+        a float for scalar arguments, a Series (indexed like the first
+        Series argument) if any argument is a Series, otherwise an array
     """
+    index = next((arg.index for arg in (lon1, lat1, lon2, lat2) if isinstance(arg, pd.Series)), None)
+
     # Convert decimal degrees to radians
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(arg, dtype=np.float64)) for arg in (lon1, lat1, lon2, lat2))
 
     # Haversine formula
     dlon = lon2 - lon1
     dlat = lat2 - lat1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    r = 6371 # Radius of earth in kilometers
-    return c * r
\ No newline at end of file
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    # rounding can push `a` just past 1 for antipodal points
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    distance = c * EARTH_RADIUS_KM
+
+    if index is not None:
+        return pd.Series(distance, index=index)
+    return float(distance) if distance.ndim == 0 else distance
+
+
+def iter_haversine_matrix(lon1, lat1, lon2=None, lat2=None,
+                          chunk_size: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield the pairwise distance matrix between two point sets in blocks of
+    rows, so that only `chunk_size` x m distances are in memory at a time.
+    :param lon1: longitudes of the n first places
+    :param lat1: latitudes of the n first places
+    :param lon2: longitudes of the m second places (default: the first places)
+    :param lat2: latitudes of the m second places (default: the first places)
+    :param chunk_size: rows per block
+    :return: iterator of (first row, block) pairs, where block[i, j] is the
+        distance in kilometers between first place `first row + i` and
+        second place j
+    """
+    lon1, lat1 = np.asarray(lon1, dtype=np.float64), np.asarray(lat1, dtype=np.float64)
+    if lon2 is None or lat2 is None:
+        lon2, lat2 = lon1, lat1
+    lon2, lat2 = np.asarray(lon2, dtype=np.float64), np.asarray(lat2, dtype=np.float64)
+
+    for start in range(0, len(lon1), chunk_size):
+        stop = start + chunk_size
+        yield start, haversine(lon1[start:stop, None], lat1[start:stop, None], lon2[None, :], lat2[None, :])
+
+
+def haversine_matrix(lon1, lat1, lon2=None, lat2=None, chunk_size: int = 1024,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Calculate the pairwise distance matrix (in kilometers) between two
+    point sets, a block of rows at a time (see `iter_haversine_matrix`).
+    :param lon1: longitudes of the n first places
+    :param lat1: latitudes of the n first places
+    :param lon2: longitudes of the m second places (default: the first places)
+    :param lat2: latitudes of the m second places (default: the first places)
+    :param chunk_size: rows per block
+    :param out: n x m array to fill, e.g. an `np.memmap` for matrices
+        that do not fit in memory
+    :return: the n x m distance matrix (`out` if given)
+    """
+    n = len(lon1)
+    m = n if lon2 is None else len(lon2)
+    if out is None:
+        out = np.empty((n, m), dtype=np.float64)
+    for start, block in iter_haversine_matrix(lon1, lat1, lon2, lat2, chunk_size):
+        out[start:start + len(block)] = block
+    return out
@@ -0,0 +1,69 @@
+# <--- python stuff --->
+import glob
+import os
+import subprocess
+import sys
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from benchmarks import standins
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Lessons the stand-ins serve: three courses of twenty
+LESSONS = 60
+COURSES = ["1", "2", "3"]
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """
+    The corpus the stand-ins serve.
+    """
+    return standins.Corpus(LESSONS)
+
+
+@pytest.fixture(scope="session")
+def standin_urls():
+    """
+    Canvas, GitHub REST (with GraphQL) and raw content stand-ins, by role.
+    """
+    process, urls = standins.start(LESSONS)
+    yield urls
+    process.terminate()
+    process.join()
+
+
+@pytest.fixture(scope="session")
+def run_cli(standin_urls, tmp_path_factory):
+    """
+    Run `dsc-report` against the stand-ins in a directory of its own, with
+    the HTTP cache off, and return the path of the report it writes.
+    `setup`, if given, is called with that directory before the run.
+    """
+    memo = str(tmp_path_factory.mktemp("memo") / "readme_branches.json")
+    env = dict(os.environ, **standins.environment(standin_urls), DSC_NO_CACHE="1", DSC_README_MEMO=memo,
+               PYTHONPATH=ROOT, PYTHONWARNINGS="ignore")
+
+    def run(name, *args, setup=None):
+        cwd = tmp_path_factory.mktemp(name)
+        if setup is not None:
+            setup(cwd)
+        result = subprocess.run([sys.executable, "-m", "src.cli", *args], cwd=cwd, env=env,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr[-2000:]
+        reports = glob.glob(os.path.join(cwd, "*_reports", "*.*"))
+        assert len(reports) == 1, reports
+        return reports[0]
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def canvas_report(run_cli):
+    """
+    A Canvas report of the stand-in courses, probed over REST.
+    """
+    return run_cli("canvas", "canvas-report", "--courses", *COURSES)
@@ -0,0 +1,88 @@
+# <--- python stuff --->
+import ast
+from datetime import datetime, timezone
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from benchmarks import standins
+from src import canvas_helpers, client_helpers
+from src.report_helpers import CANVAS_REPORT_FIELDS, read_canvas_report, read_report, write_parquet
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def previous_report(request, canvas_report, tmp_path):
+    """
+    The stand-in Canvas report as a `.csv` or `.parquet` file.
+    """
+    if request.param == "csv":
+        return canvas_report
+    path = str(tmp_path / "canvas_report.parquet")
+    write_parquet(read_report(canvas_report), path, CANVAS_REPORT_FIELDS)
+    return path
+
+
+def test_reprobe_only_changed_rows(previous_report, canvas_report, monkeypatch):
+    expected = read_report(canvas_report)
+    previous = read_canvas_report(previous_report)
+    df = previous[["course_number", "canvas_page_id", "canvas_updated_at", "git_url"]].copy()
+    linked = [n for n, url in enumerate(df["git_url"]) if isinstance(url, str)]
+    edited, pushed = linked[0], linked[1]
+    df.loc[edited, "canvas_updated_at"] = "2030-01-01T00:00:00Z"
+    pushed_repo = canvas_helpers.get_github_details(df["git_url"].iloc[pushed])[0]
+
+    def get_repo_pushed_at(owner, repo_name):
+        return "2030-01-01T00:00:00Z" if repo_name == pushed_repo else "2020-01-01T00:00:00Z"
+
+    probed = []
+
+    def process_repo_urls(urls, owner, git_token, use_graphql=False, max_workers=1):
+        probed.extend(urls)
+        return [True] * len(urls), [True] * len(urls), [[] for _ in urls], [{"probed": None} for _ in urls]
+
+    monkeypatch.setattr(canvas_helpers, "get_repo_pushed_at", get_repo_pushed_at)
+    monkeypatch.setattr(canvas_helpers, "process_repo_urls", process_repo_urls)
+    since = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    master, main, updates = canvas_helpers.reprobe_changed_rows(df, previous, since, "owner", "token")
+
+    stale = {n for n in linked
+             if n == edited or canvas_helpers.get_github_details(df["git_url"].iloc[n])[0] == pushed_repo}
+    assert probed == [df["git_url"].iloc[n] for n in sorted(stale)]
+    for n, row in enumerate(expected.itertuples(index=False)):
+        if n in stale:
+            assert (master[n], main[n], updates[n]) == (True, True, {"probed": None})
+        else:
+            assert master[n] == row.git_master_branch_dot_canvas
+            assert main[n] == row.git_main_branch_dot_canvas
+            assert updates[n] == ast.literal_eval(row.git_repo_all_branches_updates)
+
+
+@pytest.fixture
+def canvas(standin_urls, monkeypatch):
+    monkeypatch.setattr(client_helpers, "CANVAS_INSTANCE", standin_urls["canvas"])
+    monkeypatch.setenv("CANVAS_TOKEN", "standin")
+    client_helpers.set_canvas(None)
+    yield
+    client_helpers.set_canvas(None)
+
+
+@pytest.mark.filterwarnings("ignore:Canvas may respond unexpectedly")
+def test_export_content_has_the_api_dtypes(corpus, canvas, canvas_report, tmp_path):
+    exports = {}
+    for course_number in (1, 2):
+        exports[course_number] = str(tmp_path / f"course_{course_number}.imscc")
+        standins.write_export(corpus, course_number, exports[course_number])
+    from_api = canvas_helpers.get_course_content(list(exports))
+    fresh = canvas_helpers.get_export_content(exports)
+    known = canvas_helpers.get_export_content(exports, previous=read_canvas_report(canvas_report))
+
+    assert fresh["canvas_page_id"].isna().all() and fresh["canvas_updated_at"].isna().all()
+    assert fresh["canvas_page_id"].dtype == known["canvas_page_id"].dtype == "Int64"
+    assert fresh["canvas_updated_at"].dtype == known["canvas_updated_at"].dtype == from_api["canvas_updated_at"].dtype
+    # the export lists pages by title; ids and dates come from the previous report
+    by_title = from_api.set_index("canvas_page_title")
+    assert known.set_index("canvas_page_title")["canvas_page_id"].tolist() == \
+        by_title.loc[known["canvas_page_title"], "canvas_page_id"].tolist()
+    assert known.set_index("canvas_page_title")["canvas_updated_at"].tolist() == \
+        by_title.loc[known["canvas_page_title"], "canvas_updated_at"].tolist()
@@ -0,0 +1,36 @@
+# <--- testing stuff --->
+import pytest
+
+# <--- api stuff --->
+import canvasapi
+
+# <--- custom --->
+from src import client_helpers
+from src.metrics_helpers import response_hook
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    monkeypatch.setenv("CANVAS_TOKEN", "token")
+    client_helpers.set_canvas(None)
+    yield
+    client_helpers.set_canvas(None)
+
+
+def test_canvas_session_is_instrumented(fresh_client):
+    # canvasapi has no public way to pass a session in; this pins the private
+    # requester session that get_canvas instruments to the installed canvasapi
+    canvas = client_helpers.get_canvas()
+    session = canvas._Canvas__requester._session
+    assert response_hook in session.hooks["response"]
+    assert client_helpers.get_canvas() is canvas
+
+
+def test_missing_session_is_reported(fresh_client, monkeypatch, capsys):
+    class Canvas:
+        def __init__(self, base_url, access_token):
+            pass
+
+    monkeypatch.setattr(canvasapi, "Canvas", Canvas)
+    assert isinstance(client_helpers.get_canvas(), Canvas)
+    assert "[!] canvasapi's requester session not found" in capsys.readouterr().out
@@ -0,0 +1,46 @@
+# <--- python stuff --->
+import zipfile
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from benchmarks import standins
+from src.export_helpers import MANIFEST, read_course_export
+from src.link_helpers import first_github_link
+
+
+@pytest.mark.parametrize("course_id", [1, 2, 3])
+def test_export_matches_course(corpus, tmp_path, course_id):
+    path = tmp_path / f"course_{course_id}.imscc"
+    standins.write_export(corpus, course_id, str(path))
+    pages, assignments = read_course_export(str(path))
+
+    course = corpus.courses[course_id]
+    expected_pages = sorted(course["pages"], key=lambda page: page["title"].casefold())
+    assert pages == [{"url": page["url"], "title": page["title"], "git_url": first_github_link(page["body"])}
+                     for page in expected_pages]
+    assert assignments == [{"title": assignment["name"], "git_url": first_github_link(assignment["description"])}
+                           for assignment in course["assignments"]]
+
+
+def test_export_without_assignment_groups(tmp_path):
+    path = tmp_path / "pages_only.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("wiki_content/intro.html", '<html><head><title>Intro &amp; setup</title></head>'
+                                                    '<body><a href="https://github.com/o/r">repo</a></body></html>')
+        archive.writestr(MANIFEST, '<manifest xmlns="http://www.imsglobal.org/xsd/imsccv1p1/imscp_v1p1"><resources>'
+                                   '<resource identifier="a" type="webcontent" href="wiki_content/intro.html">'
+                                   '<file href="wiki_content/intro.html"/></resource></resources></manifest>')
+    assert read_course_export(str(path)) == ([{"url": "intro", "title": "Intro & setup",
+                                               "git_url": "https://github.com/o/r"}], [])
+
+
+def test_not_an_export(tmp_path):
+    not_zip = tmp_path / "notes.txt"
+    not_zip.write_text("not an archive")
+    no_manifest = tmp_path / "empty.zip"
+    zipfile.ZipFile(no_manifest, "w").close()
+    for path in (not_zip, no_manifest):
+        with pytest.raises(ValueError):
+            read_course_export(str(path))
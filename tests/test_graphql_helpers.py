@@ -0,0 +1,22 @@
+# <--- custom --->
+from benchmarks import standins
+from src.graphql_helpers import graphql_process_repo_urls, probe_repos
+
+
+def test_probe_reports_utc_dates(corpus, standin_urls):
+    endpoint = f"{standin_urls['api']}/graphql"
+    names = [name for name, repo in corpus.repos.items() if not repo["missing"]]
+    probes = probe_repos([(standins.OWNER, name) for name in names], "token", batch_size=7, endpoint=endpoint)
+    for name in names:
+        repo, probe = corpus.repos[name], probes[(standins.OWNER, name.lower())]
+        assert probe["branches"] == sorted(repo["branches"])
+        assert probe["updates"] == repo["branches"]
+        assert (probe["master"], probe["main"]) == ("master" in repo["dot_canvas"], "main" in repo["dot_canvas"])
+
+
+def test_links_that_are_not_strings_are_skipped(standin_urls):
+    url = f"https://github.com/{standins.OWNER}/dsc-lesson-0"
+    master, main, branches, updates = graphql_process_repo_urls([float("nan"), None, url], "token",
+                                                               endpoint=f"{standin_urls['api']}/graphql")
+    assert (master[:2], main[:2], updates[:2]) == ([False, False], [False, False], [{False}, {False}])
+    assert len(branches) == 1
@@ -0,0 +1,113 @@
+# <--- python stuff --->
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# <--- testing stuff --->
+import pytest
+
+# <--- api stuff --->
+import requests
+
+# <--- custom --->
+from src import cache_helpers, http_helpers
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """
+    `/etag` answers 304 to its own ETag; `/limited` refuses its first request
+    with a 429 and `Retry-After: 1`.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        seen = self.server.seen.setdefault(self.path, [])
+        seen.append(dict(self.headers))
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self.reply(304, b"", {"ETag": '"v1"'})
+            return self.reply(200, b"hello", {"ETag": '"v1"'})
+        if self.path == "/limited" and len(seen) == 1:
+            return self.reply(429, b"slow down", {"Retry-After": "1"})
+        return self.reply(200, b"ok")
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.seen = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    previous = dict(http_helpers.settings)
+    yield http_helpers.configure_cache(enabled=True, path=str(tmp_path / "http_cache.sqlite"), max_age=-1)
+    http_helpers.configure_cache(enabled=previous["cache_enabled"], path=previous["cache_path"],
+                                 max_age=previous["max_age"] if previous["max_age"] is not None else -1)
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_revalidated_response_comes_from_cache(server, cache):
+    first = http_helpers.get(url(server, "/etag"))
+    second = http_helpers.get(url(server, "/etag"))
+    assert (first.status_code, first.text) == (200, "hello")
+    assert (second.status_code, second.text) == (200, "hello")
+    assert [headers.get("If-None-Match") for headers in server.seen["/etag"]] == [None, '"v1"']
+
+
+def test_fresh_entry_skips_the_request(server, cache):
+    http_helpers.configure_cache(max_age=60)
+    assert http_helpers.get(url(server, "/etag")).text == "hello"
+    assert http_helpers.get(url(server, "/etag")).text == "hello"
+    assert len(server.seen["/etag"]) == 1
+
+
+def test_entries_are_not_shared_across_tokens(server, cache):
+    http_helpers.configure_cache(max_age=60)
+    for token in ("one", "two", "one"):
+        http_helpers.get(url(server, "/etag"), headers={"Authorization": f"token {token}"})
+    assert [headers.get("Authorization") for headers in server.seen["/etag"]] == ["token one", "token two"]
+    assert cache_helpers.cache_key("GET", "u", authorization="token one") != cache_helpers.cache_key("GET", "u")
+
+
+def test_disabled_cache_sends_no_validators(server, cache):
+    http_helpers.configure_cache(enabled=False)
+    http_helpers.get(url(server, "/etag"))
+    http_helpers.get(url(server, "/etag"))
+    assert [headers.get("If-None-Match") for headers in server.seen["/etag"]] == [None, None]
+
+
+def test_retry_after_is_waited_out(server):
+    start = time.time()
+    response = http_helpers.get(url(server, "/limited"))
+    assert (response.status_code, response.text) == (200, "ok")
+    assert len(server.seen["/limited"]) == 2
+    assert time.time() - start >= 1
+    assert http_helpers.rate_limit_status(f"127.0.0.1:{server.server_address[1]}")["blocked_until"] > start
+
+
+def test_backoff_delay_prefers_retry_after():
+    response = requests.Response()
+    response.headers["Retry-After"] = "7"
+    assert http_helpers.backoff_delay(0, response) == 7.0
+    assert 0 <= http_helpers.backoff_delay(3) <= min(http_helpers.settings["backoff_max"],
+                                                      http_helpers.settings["backoff_base"] * 2 ** 3)
@@ -0,0 +1,53 @@
+# <--- python stuff --->
+import random
+
+# <--- testing stuff --->
+import pytest
+
+# <--- text processing stuff --->
+from bs4 import BeautifulSoup
+
+# <--- custom --->
+from benchmarks.bench_markdown import (lesson_page, recursive_convert_to_markdown,
+                                       recursive_extract_text_from_element)
+from src.markdown_helpers import convert_to_markdown, extract_text_from_element
+
+
+def element(html):
+    return BeautifulSoup(html, "html.parser").contents[0]
+
+
+@pytest.mark.parametrize("html", [
+    "<p>plain paragraph</p>",
+    "<h4>Sub heading</h4>",
+    "<em>emphasis</em>",
+    "<strong>bold</strong>",
+    "<code>x = 1</code>",
+    "<li><code>df.head()</code></li>",
+    "<table><tr><td>a</td></tr></table>",
+    "<div><span>box</span></div>",
+    "loose text between blocks",
+    "<!-- a comment -->",
+])
+def test_element_matches_the_recursive_version(html):
+    assert extract_text_from_element(element(html)) == recursive_extract_text_from_element(element(html))
+
+
+@pytest.mark.parametrize("html, markdown", [
+    # the recursive version rendered these as "None"
+    ("<p>run <code>pip</code> then <em>wait</em> for <a href='https://x.org'>it</a></p>",
+     "run `pip` then *wait* for [it](https://x.org)\n\n"),
+    ("<ul><li>one<ul><li>nested <b>two</b></li></ul></li><li><code>three</code></li></ul>",
+     "- one\n    - nested **two**\n- `three`\n\n"),
+    ("<ol><li>first</li><li>second</li></ol>", "1. first\n2. second\n\n"),
+])
+def test_mixed_content_is_rendered(html, markdown):
+    assert extract_text_from_element(element(html)) == markdown
+
+
+def test_page_matches_the_recursive_version():
+    pages = ["<h3>Intro</h3>\nloose text\n<p>para</p>\n<!-- note -->\n<h4>More</h4>\n<em>e</em>\n<h3>Next</h3>\ntail"]
+    rng = random.Random(0)
+    pages += [lesson_page(rng, rng.randint(1, 300), separator="\n", section=50) for _ in range(20)]
+    for page in pages:
+        assert convert_to_markdown("T", page) == recursive_convert_to_markdown("T", page)
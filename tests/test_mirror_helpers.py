@@ -0,0 +1,99 @@
+# <--- python stuff --->
+import os
+import subprocess
+
+# <--- testing stuff --->
+import pytest
+
+# <--- api stuff --->
+import requests
+
+# <--- custom --->
+from benchmarks import standins
+from src import git_canvas_rt, git_helpers, http_helpers, mirror_helpers, readme_helpers
+
+
+@pytest.fixture(scope="module")
+def mirrors(corpus, tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("mirrors"))
+    standins.write_mirrors(corpus, root)
+    # a branch whose author and committer wrote from other time zones
+    git_dir = os.path.join(root, standins.OWNER, "offsets.git")
+    subprocess.run(["git", "init", "--bare", "--quiet", git_dir], check=True)
+    stream = (b"commit refs/heads/main\n"
+              b"author A <a@example.com> 1704067200 +0200\n"
+              b"committer C <c@example.com> 1704153600 -0500\n"
+              b"data 3\nmsg\n\n")
+    subprocess.run(["git", f"--git-dir={git_dir}", "fast-import", "--quiet"], input=stream, check=True)
+    mirror_helpers.configure_mirrors(root)
+    yield root
+    mirror_helpers.configure_mirrors(None)
+
+
+def repos(corpus, missing=False):
+    return [(name, repo) for name, repo in corpus.repos.items() if repo["missing"] == missing]
+
+
+def test_branches_and_dates_match_github(corpus, mirrors):
+    for name, repo in repos(corpus):
+        assert git_helpers.get_branches(standins.OWNER, name, "token") == sorted(repo["branches"])
+        for branch, date in repo["branches"].items():
+            assert git_helpers.get_branch_updates(standins.OWNER, name, branch) == date
+        assert git_helpers.get_repo_pushed_at(standins.OWNER, name) == max(repo["branches"].values())
+        assert git_helpers.get_default_branch(standins.OWNER, name) == repo["default_branch"]
+
+
+def test_dates_are_converted_to_utc(mirrors):
+    assert git_helpers.get_branch_updates(standins.OWNER, "offsets", "main") == "2024-01-01T00:00:00Z"
+    assert git_helpers.get_repo_pushed_at(standins.OWNER, "offsets") == "2024-01-02T00:00:00Z"
+
+
+def test_names_match_case_insensitively(corpus, mirrors):
+    name, repo = repos(corpus)[0]
+    assert git_helpers.get_branches(standins.OWNER.upper(), name.upper(), "token") == sorted(repo["branches"])
+
+
+def test_missing_repositories(corpus, mirrors):
+    for name in [name for name, _ in repos(corpus, missing=True)] + ["no-such-repo"]:
+        assert git_helpers.get_branches(standins.OWNER, name, "token") is False
+        assert git_helpers.get_repo_pushed_at(standins.OWNER, name) is None
+        with pytest.raises(requests.exceptions.RequestException):
+            git_helpers.get_branch_updates(standins.OWNER, name, "main")
+
+
+def test_files_and_readmes(corpus, mirrors):
+    for name, repo in repos(corpus):
+        url = f"https://github.com/{standins.OWNER}/{name}"
+        assert git_helpers.check_for_dot_canvas(url, "master") == ("master" in repo["dot_canvas"])
+        assert git_helpers.check_for_dot_canvas(url, "main") == ("main" in repo["dot_canvas"])
+        assert git_helpers.check_for_dot_canvas_branches(url, ["main", "nope", "master"]) == [
+            "main" in repo["dot_canvas"], False, "master" in repo["dot_canvas"]]
+        # the stand-ins give every branch but `solution` the README
+        assert readme_helpers.fetch_readme_text(standins.OWNER, name) == repo["readme"]
+        assert mirror_helpers.read_first(standins.OWNER, name, ["solution"], "README.md") == (None, None)
+
+
+def test_readme_responses_come_from_the_mirror(corpus, mirrors, monkeypatch):
+    def no_requests(*args, **kwargs):
+        raise AssertionError("requested while mirrors are enabled")
+    monkeypatch.setattr(http_helpers, "get", no_requests)
+    for name, repo in repos(corpus):
+        branch = "master" if "master" in repo["branches"] else "main"
+        git_resp, text, _ = git_helpers.get_github_readme(standins.OWNER, name, branch)
+        assert (git_resp.status_code, text) == (200, repo["readme"])
+        assert git_helpers.get_github_readme(standins.OWNER, name, "solution")[0].status_code == 404
+        git_resp, text, _ = git_canvas_rt.get_github_readme(standins.OWNER, name)
+        assert (git_resp.status_code, text) == (200, repo["readme"])
+        assert git_resp.url.endswith(f"/{name}/{branch}/README.md")
+        curriculum = git_canvas_rt.build_github_assignment_df([f"https://github.com/{standins.OWNER}/{name}"])
+        expected = repo["readme"] if "curriculum" in repo["branches"] else "404: Not Found"
+        assert curriculum["html_content"].tolist() == [expected]
+
+
+def test_read_objects_keeps_order(corpus, mirrors):
+    name, repo = repos(corpus)[0]
+    git_dir = mirror_helpers.find_mirror(standins.OWNER, name)
+    default = repo["default_branch"]
+    blobs = mirror_helpers.read_objects(git_dir, [f"refs/heads/{default}:README.md", "refs/heads/nope:README.md",
+                                                  f"refs/heads/{default}", f"refs/heads/{default}:README.md"])
+    assert blobs == [repo["readme"].encode(), None, None, repo["readme"].encode()]
@@ -0,0 +1,70 @@
+# <--- data stuff --->
+import pandas as pd
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from src.pandas_helpers import extract_dict_values
+
+
+@pytest.fixture
+def updates():
+    # the second row lists its keys in another order than they were first seen
+    return pd.DataFrame({"updates": [
+        {"main": "2024-01-01T00:00:00Z"},
+        {False},
+        {"solution": "2024-03-01T02:00:00+02:00", "main": "not a date"},
+    ]}, index=[10, 11, 12])
+
+
+def missing(values):
+    return [None if pd.isna(value) else value for value in values]
+
+
+def test_wide_layout(updates):
+    wide = extract_dict_values(updates, "updates")
+    assert list(wide.columns) == ["updates", "main", "solution"]
+    assert wide.index.equals(updates.index)
+    assert missing(wide["main"]) == ["2024-01-01T00:00:00Z", None, "not a date"]
+    assert missing(wide["solution"]) == [None, None, "2024-03-01T02:00:00+02:00"]
+    assert pd.api.types.is_string_dtype(wide["main"])
+
+    dates = extract_dict_values(updates, "updates", parse_dates=True)
+    assert isinstance(dates["main"].dtype, pd.DatetimeTZDtype) and str(dates["main"].dt.tz) == "UTC"
+    assert missing(dates["main"]) == [pd.Timestamp("2024-01-01", tz="UTC"), None, None]
+    assert missing(dates["solution"]) == [None, None, pd.Timestamp("2024-03-01", tz="UTC")]
+
+
+def test_sparse_layout(updates):
+    dense = extract_dict_values(updates, "updates", parse_dates=True)
+    sparse = extract_dict_values(updates, "updates", layout="sparse", parse_dates=True)
+    assert list(sparse.columns) == list(dense.columns)
+    for key in ("main", "solution"):
+        assert isinstance(sparse[key].dtype, pd.SparseDtype)
+        assert pd.api.types.is_datetime64_dtype(sparse[key].dtype.subtype)
+        assert sparse[key].sparse.density == pytest.approx(dense[key].notna().mean())
+        pd.testing.assert_series_equal(sparse[key].sparse.to_dense(), dense[key].dt.tz_convert(None))
+
+    # without parse_dates the values have no numpy type to store sparsely
+    strings = extract_dict_values(updates, "updates", layout="sparse")
+    assert strings["main"].dtype == pd.SparseDtype(object)
+    assert missing(strings["main"].sparse.to_dense()) == ["2024-01-01T00:00:00Z", None, "not a date"]
+
+
+def test_long_layout(updates):
+    long = extract_dict_values(updates, "updates", layout="long")
+    assert list(long.index) == [10, 12, 12]
+    assert list(long["key"]) == ["main", "solution", "main"]
+    assert list(long["value"]) == ["2024-01-01T00:00:00Z", "2024-03-01T02:00:00+02:00", "not a date"]
+
+    dates = extract_dict_values(updates, "updates", layout="long", parse_dates=True)
+    assert list(dates["key"]) == ["main", "solution", "main"]
+    assert isinstance(dates["value"].dtype, pd.DatetimeTZDtype)
+    assert missing(dates["value"]) == [pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-03-01", tz="UTC"),
+                                       None]
+
+
+def test_unknown_layout(updates):
+    with pytest.raises(ValueError):
+        extract_dict_values(updates, "updates", layout="tall")
@@ -0,0 +1,54 @@
+# <--- testing stuff --->
+import pytest
+
+# <--- text processing stuff --->
+from bs4 import BeautifulSoup
+
+# <--- custom --->
+from benchmarks.bench_link_extractor import fixture_corpus, soup_first_github_link
+from src.link_helpers import FirstAnchorParser, first_github_links
+from src.reading_helpers import TextNodeCounter, count_text_words
+
+
+# markup where BeautifulSoup's text nodes are easy to get wrong
+TRICKY = [
+    "",
+    "plain text, no tags",
+    "<p>one <b>two</b> three</p>",
+    "<p>  </p>\n\n<p>\t</p>",
+    "<pre>  keep   these  </pre><textarea>\n  and these </textarea>",
+    "<!-- a comment --><!DOCTYPE html><?xml version='1.0'?><![CDATA[x y]]>",
+    "<p>caf&eacute; &amp; &#233;t&#xe9; &notanentity; &amp</p>",
+    "<br/><img src=x><p>unclosed <li>items <li>more",
+    "<table><tr><td>a b</td></tr></table></p></div>stray closers",
+    "<script>var s = '<a href=\"x\">';</script><style>p { color: red }</style>text",
+]
+
+
+@pytest.fixture(scope="module")
+def bodies():
+    return [html for html in fixture_corpus(60) if html is not None] + TRICKY
+
+
+def test_first_github_links_match_beautifulsoup():
+    corpus = fixture_corpus(60)
+    assert first_github_links(corpus) == [soup_first_github_link(html) for html in corpus]
+
+
+def test_first_href_chunks_matches_whole_document(bodies):
+    parser = FirstAnchorParser()
+    for html in bodies:
+        whole = parser.first_href(html)
+        assert parser.first_href_chunks(html[start:start + 7] for start in range(0, len(html), 7)) == whole
+
+
+def test_text_node_counter_matches_beautifulsoup(bodies):
+    for html in bodies:
+        soup = BeautifulSoup(html, "html.parser")
+        assert count_text_words(html) == sum(len(node.split(" ")) for node in soup.find_all(string=True)), html[:80]
+
+
+def test_text_node_counter_in_chunks(bodies):
+    counter = TextNodeCounter()
+    for html in bodies:
+        assert counter.count(html[start:start + 5] for start in range(0, len(html), 5)) == count_text_words(html)
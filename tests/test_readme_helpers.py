@@ -0,0 +1,57 @@
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from benchmarks import standins
+from src import git_canvas_rt, git_helpers, http_helpers, readme_helpers
+
+
+@pytest.fixture
+def github(standin_urls, monkeypatch):
+    monkeypatch.setattr(git_helpers, "GITHUB_API_URL", standin_urls["api"])
+    monkeypatch.setattr(git_helpers, "GITHUB_RAW_URL", standin_urls["raw"])
+    monkeypatch.setattr(git_helpers, "BRANCHES_PER_PAGE", 1)
+    monkeypatch.setitem(http_helpers.settings, "cache_enabled", False)
+    http_helpers.configure_cache()
+
+
+def test_candidate_branches():
+    assert readme_helpers.candidate_branches(["master", "main"], "dev") == ["master", "main", "dev"]
+    assert readme_helpers.candidate_branches(["master", "main"], "main", ["main", "x"]) == ["main"]
+
+
+def test_branches_are_read_past_the_first_page(corpus, github):
+    for name, repo in corpus.repos.items():
+        if not repo["missing"]:
+            assert git_helpers.get_branches(standins.OWNER, name, "token") == sorted(repo["branches"])
+
+
+def test_memo_is_kept_per_preference(corpus, github, tmp_path):
+    resolver = readme_helpers.ReadmeResolver(str(tmp_path / "readme_branches.json"))
+    for name, repo in corpus.repos.items():
+        if repo["missing"]:
+            continue
+        master_first = resolver.resolve(standins.OWNER, name, ["master", "main"])[0]
+        assert master_first == ("master" if "master" in repo["branches"] else "main")
+        assert resolver.resolve(standins.OWNER, name)[0] == readme_helpers.ReadmeResolver(None).resolve(
+            standins.OWNER, name)[0]
+    resolver.save()
+    reloaded = readme_helpers.ReadmeResolver(resolver.path)
+    name = next(name for name, repo in corpus.repos.items() if "curriculum" in repo.get("branches", {}))
+    assert reloaded.remembered(standins.OWNER, name) == "curriculum"
+
+
+def test_default_branch_is_tried_last(corpus, github):
+    name, repo = next((name, repo) for name, repo in corpus.repos.items() if not repo["missing"])
+    branch, response = readme_helpers.ReadmeResolver(None).resolve(standins.OWNER, name, ["solution"])
+    assert branch == repo["default_branch"]
+    assert response.text == repo["readme"]
+
+
+def test_git_canvas_rt_saves_the_memo(corpus, github, tmp_path, monkeypatch):
+    resolver = readme_helpers.ReadmeResolver(str(tmp_path / "readme_branches.json"))
+    monkeypatch.setattr(readme_helpers, "_resolver", resolver)
+    name, repo = next((name, repo) for name, repo in corpus.repos.items() if not repo["missing"])
+    git_canvas_rt.get_github_readme(standins.OWNER, name)
+    assert readme_helpers.ReadmeResolver(resolver.path).remembered(standins.OWNER, name, ["master", "main"]) \
+        == ("master" if "master" in repo["branches"] else "main")
@@ -0,0 +1,19 @@
+# <--- custom --->
+from src import render_helpers
+
+
+def test_shared_pool_renders_like_a_single_process():
+    documents = [f"# Lesson {n}\n\nSome *emphasis* and `code` {n}." for n in range(2 * render_helpers.MIN_PARALLEL)]
+    expected = render_helpers.render_markdown_many(documents + [None, float("nan")], processes=1)
+    render_helpers._rendered.clear()
+    with render_helpers.render_pool(2) as pool:
+        half = len(documents) // 2
+        rendered = (render_helpers.render_markdown_many(documents[:half], executor=pool)
+                    + render_helpers.render_markdown_many(documents[half:] + [None, float("nan")], executor=pool))
+    assert rendered == expected
+    assert expected[-2:] == [False, False]
+
+
+def test_single_process_pool_is_none():
+    with render_helpers.render_pool(1) as pool:
+        assert pool is None
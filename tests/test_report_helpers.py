@@ -0,0 +1,34 @@
+# <--- data stuff --->
+import pandas as pd
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from src.report_helpers import (CANVAS_REPORT_FIELDS, READING_TIME_FIELDS, read_canvas_report, report_schema,
+                                require_pyarrow)
+from tests.conftest import COURSES
+
+
+@pytest.fixture(scope="module")
+def parquet_report(run_cli):
+    return run_cli("parquet", "canvas-report", "--courses", *COURSES, "--format", "parquet")
+
+
+def test_parquet_reports_have_the_report_schema(run_cli, canvas_report, parquet_report):
+    pq = require_pyarrow().parquet
+    assert pq.read_schema(parquet_report).remove_metadata() == report_schema(CANVAS_REPORT_FIELDS)
+    reading_times = run_cli("reading-parquet", "reading-times", canvas_report, "--format", "parquet")
+    assert pq.read_schema(reading_times).remove_metadata() == report_schema(READING_TIME_FIELDS)
+
+
+def test_parquet_report_reads_back_like_the_csv(canvas_report, parquet_report):
+    from_csv, from_parquet = read_canvas_report(canvas_report), read_canvas_report(parquet_report)
+    assert len(from_csv) == len(from_parquet)
+    for name, _ in CANVAS_REPORT_FIELDS:
+        # NaN (CSV) and None (Parquet) both mark a missing link
+        expected = from_csv[name].astype(object).where(from_csv[name].notna(), None)
+        actual = from_parquet[name].astype(object).where(from_parquet[name].notna(), None)
+        assert expected.tolist() == actual.tolist(), name
+    assert "{False}" in from_parquet["git_repo_all_branches_updates"].tolist()
+    assert pd.api.types.is_integer_dtype(from_parquet["canvas_page_id"])
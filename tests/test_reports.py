@@ -0,0 +1,67 @@
+# <--- python stuff --->
+import csv
+import filecmp
+import io
+import itertools
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from src.canvas_helpers import COURSE_CONTENT_COLUMNS, PARTIAL_REPORT, PROBE_COLUMNS
+from tests.conftest import COURSES
+
+
+def same_bytes(a: str, b: str) -> bool:
+    return filecmp.cmp(a, b, shallow=False)
+
+
+@pytest.fixture(scope="module")
+def reading_time_report(run_cli, canvas_report):
+    return run_cli("reading-times", "reading-times", canvas_report)
+
+
+def test_graphql_report_matches_rest(run_cli, canvas_report):
+    # the stand-in answers GraphQL with commit dates in a non-UTC offset
+    assert same_bytes(run_cli("graphql", "canvas-report", "--courses", *COURSES, "--graphql"), canvas_report)
+
+
+def test_streamed_report_matches(run_cli, canvas_report):
+    assert same_bytes(run_cli("stream", "canvas-report", "--courses", *COURSES, "--stream"), canvas_report)
+
+
+def test_resumed_report_matches(run_cli, canvas_report):
+    # what an interrupted --stream run leaves: ten whole rows, then one cut
+    # off inside its branch updates that still has every column
+    width = len(COURSE_CONTENT_COLUMNS + PROBE_COLUMNS)
+    with open(canvas_report, newline="") as f:
+        rows = [row[:width] for row in itertools.islice(csv.reader(f), 12)]
+    partial = io.StringIO()
+    csv.writer(partial, lineterminator="\n").writerows(rows)
+    text = partial.getvalue()[:-4]
+    assert len(list(csv.reader(io.StringIO(text)))[-1]) == width
+
+    def interrupted(cwd):
+        (cwd / "canvas_reports").mkdir()
+        (cwd / "canvas_reports" / PARTIAL_REPORT).write_text(text)
+
+    resumed = run_cli("resume", "canvas-report", "--courses", *COURSES, "--stream", "--resume", setup=interrupted)
+    assert same_bytes(resumed, canvas_report)
+
+
+def test_merged_canvas_shards_match(run_cli, canvas_report):
+    shards = [run_cli(f"canvas-shard-{i}", "canvas-report", "--courses", *COURSES, "--shard", f"{i}/2")
+              for i in (1, 2)]
+    assert same_bytes(run_cli("canvas-merge", "merge", "canvas-report", *reversed(shards)), canvas_report)
+
+
+def test_merged_reading_time_shards_match(run_cli, canvas_report, reading_time_report):
+    shards = [run_cli(f"reading-shard-{i}", "reading-times", canvas_report, "--shard", f"{i}/3") for i in (1, 2, 3)]
+    assert same_bytes(run_cli("reading-merge", "merge", "reading-times", *shards), reading_time_report)
+
+
+def test_pipelined_reading_times_match(run_cli, canvas_report, reading_time_report):
+    # one lesson per queue and READMEs parsed in two processes
+    pipelined = run_cli("reading-pipeline", "reading-times", canvas_report, "--pipeline", "--workers", "4",
+                        "--parse-workers", "2", "--queue-size", "1")
+    assert same_bytes(pipelined, reading_time_report)
@@ -0,0 +1,34 @@
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from src.render_helpers import content_hash
+from src.store_helpers import ContentStore
+
+
+DOCUMENTS = ["", "# README\n\nplain text", "café ✓ 数据 " * 5000, "\ud800 lone surrogate"]
+
+
+def test_put_and_read_back(tmp_path):
+    store = ContentStore(str(tmp_path / "store"))
+    for text in DOCUMENTS:
+        digest = store.put(text)
+        assert digest == content_hash(text) and digest in store
+        assert store.read_text(digest) == text
+        # pieces split mid-character still decode to the document
+        assert "".join(store.iter_text(digest, chunk_size=7)) == text
+        assert store.put(text) == digest
+
+
+def test_documents_survive_reopening(tmp_path):
+    digests = [ContentStore(str(tmp_path / "store")).put(text) for text in DOCUMENTS]
+    reopened = ContentStore(str(tmp_path / "store"))
+    assert [reopened.read_text(digest) for digest in digests] == DOCUMENTS
+
+
+def test_missing_document(tmp_path):
+    store = ContentStore(str(tmp_path / "store"))
+    digest = content_hash("never stored")
+    assert digest not in store
+    with pytest.raises(KeyError):
+        store.read_text(digest)
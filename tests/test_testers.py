@@ -0,0 +1,61 @@
+# <--- data stuff --->
+import numpy as np
+import pandas as pd
+
+# <--- testing stuff --->
+import pytest
+
+# <--- custom --->
+from benchmarks.bench_haversine import scalar_haversine
+from src.testers import EARTH_RADIUS_KM, haversine, haversine_matrix, iter_haversine_matrix
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(-180, 180, size=(2, 50))
+    lat = rng.uniform(-90, 90, size=(2, 50))
+    return lon[0], lat[0], lon[1], lat[1]
+
+
+def scalar_distances(lon1, lat1, lon2, lat2):
+    return np.array([scalar_haversine(*args) for args in zip(lon1, lat1, lon2, lat2)])
+
+
+def test_scalars_match_the_scalar_formula(points):
+    for args in zip(*points):
+        distance = haversine(*args)
+        assert isinstance(distance, float)
+        assert distance == pytest.approx(scalar_haversine(*args), rel=1e-12)
+    assert haversine(0, 0, 180, 0) == pytest.approx(np.pi * EARTH_RADIUS_KM)
+
+
+def test_arrays_and_series_match_the_scalar_formula(points):
+    expected = scalar_distances(*points)
+    np.testing.assert_allclose(haversine(*points), expected, rtol=1e-12)
+
+    index = pd.Index([f"place {n}" for n in range(len(expected))])
+    lon1, lat1, lon2, lat2 = points
+    distances = haversine(pd.Series(lon1, index=index), pd.Series(lat1, index=index), lon2, lat2)
+    assert isinstance(distances, pd.Series) and distances.index.equals(index)
+    np.testing.assert_allclose(distances.to_numpy(), expected, rtol=1e-12)
+
+
+def test_matrix_matches_the_scalar_formula(points):
+    lon1, lat1, lon2, lat2 = points
+    expected = np.array([[scalar_haversine(a, b, c, d) for c, d in zip(lon2[:20], lat2[:20])]
+                         for a, b in zip(lon1, lat1)])
+    np.testing.assert_allclose(haversine_matrix(lon1, lat1, lon2[:20], lat2[:20], chunk_size=7), expected, rtol=1e-12)
+    blocks = list(iter_haversine_matrix(lon1, lat1, lon2[:20], lat2[:20], chunk_size=7))
+    assert [start for start, _ in blocks] == list(range(0, len(lon1), 7))
+    np.testing.assert_allclose(np.vstack([block for _, block in blocks]), expected, rtol=1e-12)
+
+
+def test_matrix_of_one_point_set(points):
+    lon, lat = points[0], points[1]
+    distances = haversine_matrix(lon, lat, chunk_size=16)
+    assert distances.shape == (len(lon), len(lon))
+    np.testing.assert_allclose(distances, distances.T, rtol=1e-12)
+    np.testing.assert_allclose(np.diag(distances), 0, atol=1e-9)
+    np.testing.assert_allclose(distances[3], scalar_distances(np.full(len(lon), lon[3]), np.full(len(lon), lat[3]),
+                                                              lon, lat), rtol=1e-12, atol=1e-9)
@@ -1,7 +0,0 @@
-import mymath
- 
-print("5+6 is equal to:\n")
-print(mymath.basic.add(5,6))
- 
-print("\n\nThe mean of 4,5,6 is equal to:\n")
-print(mymath.stats.mean([4,5,6]))
\ No newline at end of file